@@ -12,7 +12,7 @@ setup(
     author_email="nourdinebah@gmail.com",
     packages=find_packages(),
     include_package_data=True,
-    install_requires=["click"],
+    install_requires=["click", "tifffile"],
     entry_points={
         "console_scripts": [
             "synthetic_coordinates = slideseq_tools.scripts.synthetic_coordinates:main",
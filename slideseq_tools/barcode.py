@@ -0,0 +1,397 @@
+"""
+Matches observed bead barcodes against a puck whitelist.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from itertools import combinations
+from pathlib import Path
+from typing import List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from slideseq_tools.utils.sequence import (
+    BASES_PER_WORD,
+    LOW_BITS,
+    encode,
+    popcount,
+    to_byte_matrix,
+)
+
+PUCK_COLUMNS = ["Barcode", "x", "y"]
+
+# largest segment keys indexed with a direct lookup table
+MAX_TABLE_BITS = 20
+
+
+def read_puck(path: str) -> pd.DataFrame:
+    """\
+    Returns puck beads as a data frame with `Barcode`, `x` and `y` columns.
+
+    Function raises a `FileNotFoundError` if puck file doesn't exist.
+
+    Parameters
+    ----------
+    path
+        Path of the puck `CSV` file, without header.
+    """
+    path = Path(path)
+
+    if not path.exists():
+        raise FileNotFoundError(f"Puck {path} doesn't exist.")
+
+    return pd.read_csv(
+        path,
+        header=None,
+        names=PUCK_COLUMNS,
+        dtype={"Barcode": str, "x": np.float64, "y": np.float64},
+    )
+
+
+def _append(keys: np.ndarray, piece: np.ndarray, n_bases: int) -> np.ndarray:
+    """Returns `keys` followed by a `piece` of `n_bases` packed bases."""
+    # keys only filter candidates, bases past a word can be dropped
+    if n_bases >= BASES_PER_WORD:
+        return piece
+    return (keys << np.uint64(2 * n_bases)) | piece
+
+
+# pylint: disable=too-many-locals,too-many-instance-attributes
+class BarcodeMatcher:
+    """\
+    Error-tolerant barcode matcher.
+
+    Barcodes are split in `n_segments` segments. Two barcodes within the
+    Hamming radius share at least `n_segments - radius` identical segments
+    (pigeonhole principle), so every combination of that many segments is
+    indexed as packed keys. Keys of all combinations are stacked in a single
+    sorted array, tagged with their combination, so a query looks up all its
+    keys at once and verifies the few candidates found with packed Hamming
+    distances, there is no all-vs-all comparison.
+
+    `N` bases are mismatches.
+    """
+
+    radius: int
+    length: int
+    n_barcodes: int
+    segments: List
+    combinations: List
+    segment_masks: np.ndarray
+    combination_bits: np.ndarray
+    checked_bits: np.ndarray
+    word_codes: np.ndarray
+    word_n_mask: np.ndarray
+    bases: np.ndarray
+    keys: np.ndarray
+    order: np.ndarray
+    offsets: np.ndarray
+    exact: Tuple
+
+    def __init__(self, barcodes, radius: int = 2, n_segments: int = None) -> None:
+        """\
+        Constructor of BarcodeMatcher class.
+
+        Raises a `ValueError` if barcodes don't have same length or if the
+        radius is too large for the barcode length.
+
+        Parameters
+        ----------
+        barcodes
+            Whitelist barcodes as `str`, or as a `uint8` matrix of ASCII codes.
+        radius
+            Maximum Hamming distance of a match.
+        n_segments
+            Number of segments barcodes are split in. Defaults to
+            `radius + 3`.
+        """
+        matrix = to_byte_matrix(barcodes)
+        self.n_barcodes, self.length = matrix.shape
+
+        if n_segments is None:
+            n_segments = min(radius + 3, self.length)
+
+        if not radius < n_segments <= self.length:
+            raise ValueError(
+                f"Cannot split {self.length}-base barcodes in {n_segments} "
+                f"segments for radius {radius}."
+            )
+
+        self.radius = radius
+        self.codes, self.n_mask = encode(matrix)
+        self.word_codes = np.ascontiguousarray(self.codes.T)
+        self.word_n_mask = np.ascontiguousarray(self.n_mask.T)
+
+        # segments are read from packed words as (word, shift, n_bases) pieces
+        bounds = np.linspace(0, self.length, n_segments + 1).astype(int)
+        self.segments = []
+        masks = np.full((n_segments, self.length), ord("A"), dtype=np.uint8)
+
+        for num, (start, end) in enumerate(zip(bounds, bounds[1:])):
+            masks[num, start:end] = ord("N")
+            pieces = []
+            for low in range(start, end, BASES_PER_WORD):
+                high = min(end, (low // BASES_PER_WORD + 1) * BASES_PER_WORD)
+                shift = 2 * (BASES_PER_WORD - 1 - (high - 1) % BASES_PER_WORD)
+                pieces.append((low // BASES_PER_WORD, np.uint64(shift), high - low))
+            self.segments.append((pieces, end - start))
+
+        self.segment_masks = encode(masks)[1]
+        self.combinations = list(combinations(range(n_segments), n_segments - radius))
+
+        # a hit is only kept at the first combination of identical segments:
+        # all its segments are identical, no other segment before its last one
+        self.combination_bits = np.zeros(len(self.combinations), dtype=np.uint64)
+        self.checked_bits = np.zeros(len(self.combinations), dtype=np.uint64)
+        for num, comb in enumerate(self.combinations):
+            self.combination_bits[num] = sum(1 << seg for seg in comb)
+            self.checked_bits[num] = (1 << (comb[-1] + 1)) - 1
+
+        # short keys are looked up directly in a table of bucket offsets,
+        # every combination has its own range of the table
+        self.bases = None
+        n_bases = [
+            sum(self.segments[seg][1] for seg in comb) for comb in self.combinations
+        ]
+        if 2 * max(n_bases) <= MAX_TABLE_BITS:
+            self.bases = np.cumsum([0] + [4**num for num in n_bases]).astype(np.uint64)
+
+        keys = self._combination_keys(self.codes).T.ravel()
+        self.order = np.argsort(keys, kind="stable")
+        self.keys = keys[self.order]
+        self.order %= self.n_barcodes
+
+        self.offsets = None
+        if self.bases is not None:
+            self.offsets = np.searchsorted(
+                self.keys, np.arange(self.bases[-1] + np.uint64(1), dtype=np.uint64)
+            )
+
+            # smaller offsets keep more of the table in cache
+            if self.keys.shape[0] < 2**31:
+                self.offsets = self.offsets.astype(np.int32)
+
+        # exact matches are looked up first, ties are duplicated barcodes
+        self.exact = None
+        without_n = np.flatnonzero(~np.any(self.n_mask, axis=1))
+        if self.length <= BASES_PER_WORD and without_n.shape[0] > 0:
+            keys = self.codes[without_n, 0]
+            order = np.argsort(keys, kind="stable")
+            keys = keys[order]
+            tied = np.zeros(keys.shape[0], dtype=bool)
+            tied[:-1] = keys[1:] == keys[:-1]
+            self.exact = (keys, without_n[order], tied)
+
+    @classmethod
+    def from_puck(cls, path: str, radius: int = 2) -> "BarcodeMatcher":
+        """\
+        Returns a matcher over barcodes of a puck `CSV` file. Bead indexes
+        are row positions in the file.
+
+        Parameters
+        ----------
+        path
+            Path of the puck `CSV` file.
+        radius
+            Maximum Hamming distance of a match.
+        """
+        return cls(read_puck(path)["Barcode"].tolist(), radius=radius)
+
+    def _combination_keys(self, codes: np.ndarray) -> np.ndarray:
+        """Returns a matrix of stacked keys, one column per combination."""
+        segment_keys = []
+        for pieces, _ in self.segments:
+            keys = np.zeros(codes.shape[0], dtype=np.uint64)
+            for word, shift, n_bases in pieces:
+                piece = (codes[:, word] >> shift) & np.uint64(4**n_bases - 1)
+                keys = _append(keys, piece, n_bases)
+            segment_keys.append(keys)
+
+        n_combinations = len(self.combinations)
+        keys = np.empty((codes.shape[0], n_combinations), dtype=np.uint64)
+
+        if self.bases is None:
+            tag_bits = max(1, (n_combinations - 1).bit_length())
+            key_mask = np.uint64(2 ** (64 - tag_bits) - 1)
+
+        for num, comb in enumerate(self.combinations):
+            column = np.zeros(codes.shape[0], dtype=np.uint64)
+            for seg in comb:
+                column = _append(column, segment_keys[seg], self.segments[seg][1])
+
+            # combination is the range of the table, or the high bits of keys
+            if self.bases is None:
+                keys[:, num] = (column & key_mask) | np.uint64(num << (64 - tag_bits))
+            else:
+                keys[:, num] = column + self.bases[num]
+
+        return keys
+
+    def _hits(self, codes: np.ndarray, n_mask: np.ndarray) -> Tuple[np.ndarray]:
+        """Returns (`query`, `barcode`, `distance`) triplets within the
+        radius of packed queries, sorted by query."""
+        n_combinations = len(self.combinations)
+        query_keys = self._combination_keys(codes).ravel()
+
+        if self.offsets is None:
+            low = np.searchsorted(self.keys, query_keys, side="left")
+            high = np.searchsorted(self.keys, query_keys, side="right")
+        else:
+            low = self.offsets[query_keys]
+            high = self.offsets[query_keys + np.uint64(1)]
+
+        counts = (high - low).astype(np.intp)
+
+        first = np.cumsum(counts) - counts
+        candidates = np.arange(counts.sum()) - np.repeat(first - low, counts)
+
+        # hits are (query, combination) keys until filtered by distance
+        hit_keys = np.repeat(np.arange(query_keys.shape[0]), counts)
+        hit_queries = hit_keys // n_combinations
+        hit_barcodes = self.order[candidates]
+
+        # words are compared one at a time as contiguous arrays
+        mismatches = []
+        distances = np.zeros(hit_keys.shape[0], dtype=np.int32)
+        for word in range(codes.shape[1]):
+            diff = codes[:, word][hit_queries] ^ self.word_codes[word][hit_barcodes]
+            diff = (diff | (diff >> np.uint64(1))) & LOW_BITS
+            diff |= n_mask[:, word][hit_queries] | self.word_n_mask[word][hit_barcodes]
+            distances += popcount(diff)
+            mismatches.append(diff)
+
+        within = np.flatnonzero(distances <= self.radius)
+        mismatches = [diff[within] for diff in mismatches]
+
+        identical = np.zeros(within.shape[0], dtype=np.uint64)
+        for num, masks in enumerate(self.segment_masks):
+            found = np.ones(within.shape[0], dtype=bool)
+            for diff, mask in zip(mismatches, masks):
+                found &= (diff & mask) == 0
+            identical |= found.astype(np.uint64) << np.uint64(num)
+
+        # barcodes sharing several segments with a query are found repeatedly
+        hit_combinations = hit_keys[within] % n_combinations
+        kept = within[
+            identical & self.checked_bits[hit_combinations]
+            == self.combination_bits[hit_combinations]
+        ]
+
+        return hit_keys[kept] // n_combinations, hit_barcodes[kept], distances[kept]
+
+    def pairs(self, queries) -> Tuple[np.ndarray]:
+        """\
+        Returns all (`query`, `barcode`, `distance`) triplets within the
+        radius, sorted by query and barcode.
+
+        Parameters
+        ----------
+        queries
+            Observed barcodes as `str`, or as a `uint8` matrix of ASCII codes.
+        """
+        matrix = to_byte_matrix(queries)
+
+        if matrix.shape[1] != self.length:
+            raise ValueError(f"Queries aren't {self.length}-base long.")
+
+        hit_queries, hit_barcodes, distances = self._hits(*encode(matrix))
+        order = np.lexsort((hit_barcodes, hit_queries))
+
+        return hit_queries[order], hit_barcodes[order], distances[order]
+
+    def match(
+        self, queries, chunk_size: int = 2**16, threads: int = 1
+    ) -> Tuple[np.ndarray]:
+        """\
+        Returns the closest whitelist barcode of every query as a tuple of
+        arrays (`index`, `distance`, `ambiguous`).
+
+        `index` and `distance` are -1 if no barcode is within the radius.
+        `ambiguous` is `True` if several barcodes are at the smallest
+        distance, `index` is then the first of them.
+
+        Parameters
+        ----------
+        queries
+            Observed barcodes as `str`, or as a `uint8` matrix of ASCII codes.
+        chunk_size
+            Number of queries processed at once, bounds memory.
+        threads
+            Number of threads matching chunks concurrently.
+        """
+        matrix = to_byte_matrix(queries)
+        n_queries = matrix.shape[0]
+
+        if matrix.shape[1] != self.length:
+            raise ValueError(f"Queries aren't {self.length}-base long.")
+
+        outputs = (
+            np.full(n_queries, -1, dtype=np.int64),
+            np.full(n_queries, -1, dtype=np.int32),
+            np.zeros(n_queries, dtype=bool),
+        )
+
+        # chunks write disjoint rows of outputs
+        match_chunk = partial(self._match_chunk, matrix, chunk_size, outputs)
+        starts = range(0, n_queries, chunk_size)
+
+        if threads > 1:
+            with ThreadPoolExecutor(threads) as executor:
+                list(executor.map(match_chunk, starts))
+        else:
+            for start in starts:
+                match_chunk(start)
+
+        return outputs
+
+    def _match_chunk(
+        self, matrix: np.ndarray, chunk_size: int, outputs: Tuple, start: int
+    ) -> None:
+        """Writes best hits of the chunk of queries beginning at `start`."""
+        indexes, distances, ambiguous = outputs
+
+        codes, n_mask = encode(matrix[start : start + chunk_size])
+        queries = np.arange(start, start + codes.shape[0])
+
+        if self.exact is not None:
+            found, index, tied = self._match_exact(codes, n_mask)
+            indexes[queries[found]] = index
+            distances[queries[found]] = 0
+            ambiguous[queries[found]] = tied
+            codes = codes[~found]
+            n_mask = n_mask[~found]
+            queries = queries[~found]
+
+        hit_queries, hit_barcodes, hit_distances = self._hits(codes, n_mask)
+
+        if hit_queries.shape[0] == 0:
+            return
+
+        # hits are grouped by query, best is the closest then first barcode
+        starts = np.flatnonzero(np.diff(hit_queries, prepend=-1))
+        scores = hit_distances.astype(np.int64) * self.n_barcodes + hit_barcodes
+        best_distances, best_barcodes = np.divmod(
+            np.minimum.reduceat(scores, starts), self.n_barcodes
+        )
+
+        sizes = np.diff(starts, append=hit_queries.shape[0])
+        n_best = np.add.reduceat(
+            hit_distances == np.repeat(best_distances, sizes), starts
+        )
+
+        best = queries[hit_queries[starts]]
+        indexes[best] = best_barcodes
+        distances[best] = best_distances
+        ambiguous[best] = n_best > 1
+
+    def _match_exact(self, codes: np.ndarray, n_mask: np.ndarray) -> Tuple[np.ndarray]:
+        """Returns packed queries found in the whitelist, with their index
+        and whether the barcode is duplicated."""
+        keys, order, tied = self.exact
+
+        low = np.searchsorted(keys, codes[:, 0], side="left")
+        low = np.minimum(low, keys.shape[0] - 1)
+        found = (keys[low] == codes[:, 0]) & ~np.any(n_mask, axis=1)
+
+        return found, order[low[found]], tied[low[found]]
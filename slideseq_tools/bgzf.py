@@ -0,0 +1,338 @@
+"""
+Writes BGZF (blocked gzip) files compressed on several threads.
+
+BGZF files are series of independent `gzip` members holding at most 64 KiB
+of data each, readable by any `gzip` tool. Positions are virtual offsets,
+the compressed offset of a block shifted 16 bits left plus the offset within
+its uncompressed data.
+"""
+
+import io
+import struct
+import zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+# uncompressed data per block, leaves room for incompressible data
+BLOCK_SIZE = 65280
+
+HEADER = struct.Struct("<4BI2BH2BHH")
+TRAILER = struct.Struct("<II")
+
+EOF_BLOCK = bytes.fromhex("1f8b08040000000000ff0600424302001b0003000000000000000000")
+
+
+def compress_block(data: bytes, level: int = 6) -> bytes:
+    """\
+    Returns data compressed as a BGZF block.
+
+    Parameters
+    ----------
+    data
+        At most `BLOCK_SIZE` bytes.
+    level
+        `zlib` compression level.
+    """
+    compressor = zlib.compressobj(level, zlib.DEFLATED, -15)
+    deflated = compressor.compress(data) + compressor.flush()
+
+    # block size minus 1 in the BC extra subfield
+    bsize = HEADER.size + len(deflated) + TRAILER.size - 1
+    header = HEADER.pack(31, 139, 8, 4, 0, 0, 255, 6, 66, 67, 2, bsize)
+    trailer = TRAILER.pack(zlib.crc32(data), len(data))
+
+    return header + deflated + trailer
+
+
+def block_offsets(path: str) -> np.ndarray:
+    """\
+    Returns compressed and uncompressed offsets of every data block of a BGZF
+    file as a two column matrix, only reading block headers and trailers.
+
+    Function raises a `ValueError` if file isn't BGZF.
+
+    Parameters
+    ----------
+    path
+        Path of the BGZF file.
+    """
+    offsets = []
+    compressed = 0
+    uncompressed = 0
+
+    with open(path, "rb") as file_obj:
+
+        while True:
+
+            header = file_obj.read(HEADER.size)
+
+            if not header:
+                break
+
+            if len(header) < HEADER.size:
+                raise ValueError(f"{path} is truncated.")
+
+            fields = HEADER.unpack(header)
+            if fields[:4] != (31, 139, 8, 4) or fields[8:11] != (66, 67, 2):
+                raise ValueError(f"{path} isn't a BGZF file.")
+
+            bsize = fields[11]
+            file_obj.seek(compressed + bsize + 1 - 4)
+            isize = file_obj.read(4)
+
+            if len(isize) < 4:
+                raise ValueError(f"{path} is truncated.")
+
+            isize = struct.unpack("<I", isize)[0]
+
+            if isize > 0:
+                offsets.append((compressed, uncompressed))
+
+            compressed += bsize + 1
+            uncompressed += isize
+
+    return np.array(offsets, dtype=np.int64).reshape((-1, 2))
+
+
+def read_gzi(path: str) -> np.ndarray:
+    """\
+    Returns compressed and uncompressed offsets of the blocks listed in a
+    `bgzip` `.gzi` index as a two column matrix, like `block_offsets`.
+
+    Parameters
+    ----------
+    path
+        Path of the `.gzi` file.
+    """
+    with open(path, "rb") as file_obj:
+        data = file_obj.read()
+
+    if len(data) < 8:
+        raise ValueError(f"{path} isn't a gzi index.")
+
+    n_entries = struct.unpack("<Q", data[:8])[0]
+    if len(data) != 8 + 16 * n_entries:
+        raise ValueError(f"{path} isn't a gzi index.")
+
+    # the first block isn't listed
+    offsets = np.frombuffer(data, dtype="<u8", offset=8).astype(np.int64)
+    return np.vstack([[0, 0], offsets.reshape((-1, 2))])
+
+
+def uncompressed_size(path: str) -> int:
+    """\
+    Returns the uncompressed size of a BGZF file, from its `.gzi` index if
+    it's more recent than the file, from block headers otherwise.
+
+    With the index only the last block header is read. Without it, every
+    block header is read with `block_offsets`, one read per 64 KiB block or
+    about 600,000 reads for a 40 GB file, which is slow on network file
+    systems.
+
+    Function raises a `ValueError` if file isn't BGZF.
+
+    Parameters
+    ----------
+    path
+        Path of the BGZF file.
+    """
+    path = Path(path)
+    gzi_path = Path(f"{path}.gzi")
+
+    if gzi_path.exists() and gzi_path.stat().st_mtime >= path.stat().st_mtime:
+        offsets = read_gzi(gzi_path)
+    else:
+        offsets = block_offsets(path)
+
+    if offsets.shape[0] == 0:
+        return 0
+
+    compressed, uncompressed = (int(offset) for offset in offsets[-1])
+
+    with open(path, "rb") as file_obj:
+
+        file_obj.seek(compressed)
+        header = file_obj.read(HEADER.size)
+
+        if len(header) < HEADER.size:
+            raise ValueError(f"{path} is truncated.")
+
+        fields = HEADER.unpack(header)
+        if fields[:4] != (31, 139, 8, 4) or fields[8:11] != (66, 67, 2):
+            raise ValueError(f"{path} isn't a BGZF file.")
+
+        file_obj.seek(compressed + fields[11] + 1 - 4)
+        isize = file_obj.read(4)
+
+    if len(isize) < 4:
+        raise ValueError(f"{path} is truncated.")
+
+    return uncompressed + struct.unpack("<I", isize)[0]
+
+
+# pylint: disable=too-many-instance-attributes
+class BgzfWriter(io.RawIOBase):
+    """\
+    Binary BGZF writer compressing blocks on a thread pool.
+
+    `zlib` releases the GIL so blocks are compressed in parallel, they are
+    written in order as they complete.
+    """
+
+    path: Path
+    threads: int
+    level: int
+
+    def __init__(
+        self, path: str, threads: int = 1, level: int = 6, index: bool = False
+    ) -> None:
+        """\
+        Constructor of BgzfWriter class.
+
+        Parameters
+        ----------
+        path
+            Path of the BGZF file.
+        threads
+            Number of compression threads.
+        level
+            `zlib` compression level.
+        index
+            Whether to write a `bgzip` compatible `.gzi` index on close.
+        """
+        super().__init__()
+
+        self.path = Path(path)
+        self.threads = threads
+        self.level = level
+
+        # pylint: disable=consider-using-with
+        self._file_obj = open(self.path, "wb")
+        self._buffer = bytearray()
+        self._pending = deque()
+        self._pool = ThreadPoolExecutor(threads) if threads > 1 else None
+
+        self._compressed = 0
+        self._uncompressed = 0
+        self._index = [] if index else None
+
+    def writable(self) -> bool:
+        """Returns `True`, writer is writable."""
+        return True
+
+    def write(self, data) -> int:
+        """\
+        Writes data and returns its length.
+
+        Parameters
+        ----------
+        data
+            Bytes-like object.
+        """
+        self._buffer += data
+
+        while len(self._buffer) >= BLOCK_SIZE:
+            self._submit(bytes(self._buffer[:BLOCK_SIZE]))
+            del self._buffer[:BLOCK_SIZE]
+
+        return len(data)
+
+    def tell(self) -> int:
+        """Returns the virtual offset of the next byte written, waiting for
+        pending blocks to be written."""
+        self._drain(0)
+        return (self._compressed << 16) | len(self._buffer)
+
+    def flush(self) -> None:
+        """Writes buffered data as a block, even if it isn't full."""
+        if self._file_obj.closed:
+            return
+        if self._buffer:
+            self._submit(bytes(self._buffer))
+            self._buffer.clear()
+        self._drain(0)
+        self._file_obj.flush()
+
+    def close(self) -> None:
+        """Writes remaining data, the end-of-file marker and the index."""
+        if self.closed:
+            return
+
+        try:
+            self.flush()
+            self._file_obj.write(EOF_BLOCK)
+        finally:
+            self._file_obj.close()
+            if self._pool is not None:
+                self._pool.shutdown()
+            super().close()
+
+        if self._index is not None:
+            with open(f"{self.path}.gzi", "wb") as file_obj:
+                file_obj.write(struct.pack("<Q", len(self._index)))
+                for offsets in self._index:
+                    file_obj.write(struct.pack("<QQ", *offsets))
+
+    def _submit(self, data: bytes) -> None:
+        """Compresses a block, in the pool if any."""
+        if self._pool is None:
+            self._write_block(compress_block(data, self.level), len(data))
+            return
+
+        self._pending.append(
+            (self._pool.submit(compress_block, data, self.level), len(data))
+        )
+
+        # bounds memory used by blocks waiting to be written
+        self._drain(2 * self.threads)
+
+    def _drain(self, max_pending: int) -> None:
+        """Writes completed blocks in order until few enough are pending."""
+        while len(self._pending) > max_pending:
+            future, size = self._pending.popleft()
+            self._write_block(future.result(), size)
+
+    def _write_block(self, block: bytes, size: int) -> None:
+        """Writes a compressed block and records its offsets."""
+        # the gzi index doesn't list the first block
+        if self._index is not None and self._compressed > 0:
+            self._index.append((self._compressed, self._uncompressed))
+
+        self._file_obj.write(block)
+        self._compressed += len(block)
+        self._uncompressed += size
+
+
+def open_bgzf(
+    path: str, mode: str = "wt", threads: int = 1, level: int = 6, index: bool = False
+):
+    """\
+    Returns a BGZF file object opened for writing.
+
+    Function raises a `ValueError` if mode isn't `wb` or `wt`.
+
+    Parameters
+    ----------
+    path
+        Path of the BGZF file.
+    mode
+        `wb` for binary or `wt` for text mode.
+    threads
+        Number of compression threads.
+    level
+        `zlib` compression level.
+    index
+        Whether to write a `bgzip` compatible `.gzi` index on close.
+    """
+    if mode not in ("wb", "wt"):
+        raise ValueError(f"Mode {mode} isn't supported.")
+
+    writer = BgzfWriter(path, threads=threads, level=level, index=index)
+
+    if mode == "wb":
+        return writer
+
+    return io.TextIOWrapper(writer, encoding="ascii")
@@ -0,0 +1,193 @@
+"""
+Manages a persistent binary cache of data frames.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import zipfile
+from pathlib import Path
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+CACHE_VERSION = 1
+
+
+class DataFrameCache:
+    """Directory of data frames serialized as `npz` files."""
+
+    cache_dir: Path
+    max_bytes: int
+
+    def __init__(self, cache_dir: str, max_bytes: int = 2**30) -> None:
+        """\
+        Constructor of DataFrameCache class.
+
+        The directory is created if it doesn't exist. Least recently used
+        entries are removed when the cache grows over `max_bytes`.
+
+        Parameters
+        ----------
+        cache_dir
+            Cache directory.
+        max_bytes
+            Maximum size of the cache directory in bytes.
+        """
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+
+    @classmethod
+    def key(cls, path: str, **params) -> str:
+        """\
+        Returns a cache key for a file and parameters used to process it.
+
+        The key changes as soon as the file path, size or modification time
+        changes.
+
+        Parameters
+        ----------
+        path
+            Path of the source file.
+        params
+            JSON serializable parameters.
+        """
+        path = Path(path).absolute()
+        stat = path.stat()
+        content = {
+            "version": CACHE_VERSION,
+            "path": str(path),
+            "size": stat.st_size,
+            "mtime": stat.st_mtime_ns,
+            "params": params,
+        }
+        digest = hashlib.sha1(json.dumps(content, sort_keys=True).encode("utf-8"))
+        return f"{path.name}.{digest.hexdigest()[:16]}"
+
+    def _path(self, key: str) -> Path:
+        """Returns the file path of a cache entry."""
+        return self.cache_dir / f"{key}.npz"
+
+    def load(self, key: str) -> pd.DataFrame:
+        """\
+        Returns a cached data frame or `None` if entry doesn't exist or can't
+        be read.
+
+        Parameters
+        ----------
+        key
+            Cache key.
+        """
+        path = self._path(key)
+
+        try:
+            with np.load(path, allow_pickle=False) as arrays:
+                dframe = self._deserialize(dict(arrays))
+        except (OSError, KeyError, ValueError, zipfile.BadZipFile):
+            return None
+
+        # most recently used entries are evicted last, unless already evicted
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+        return dframe
+
+    def save(self, key: str, dframe: pd.DataFrame) -> None:
+        """\
+        Saves a data frame in the cache and evicts old entries if needed.
+
+        Parameters
+        ----------
+        key
+            Cache key.
+        dframe
+            Data frame with categorical, numerical or `str` columns.
+        """
+        path = self._path(key)
+
+        # concurrent processes never read a partially written entry
+        with tempfile.NamedTemporaryFile(
+            dir=self.cache_dir, suffix=".tmp", delete=False
+        ) as file_obj:
+            try:
+                np.savez(file_obj, **self._serialize(dframe))
+            except BaseException:
+                file_obj.close()
+                os.unlink(file_obj.name)
+                raise
+
+        os.replace(file_obj.name, path)
+
+        self._evict(keep=path)
+
+    def _evict(self, keep: Path) -> None:
+        """Removes least recently used entries until cache fits `max_bytes`."""
+        entries = []
+
+        for path in self.cache_dir.glob("*.npz"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+
+        for _, size, path in sorted(entries):
+
+            if total <= self.max_bytes:
+                break
+
+            if path == keep:
+                continue
+
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+
+            total -= size
+
+    @classmethod
+    def _serialize(cls, dframe: pd.DataFrame) -> Dict:
+        """Returns data frame columns as a `dict` of arrays."""
+        arrays = {"__columns__": np.array(dframe.columns, dtype=str)}
+
+        for num, column in enumerate(dframe.columns):
+
+            series = dframe[column]
+
+            if isinstance(series.dtype, pd.CategoricalDtype):
+                arrays[f"{num}.codes"] = series.cat.codes.to_numpy()
+                arrays[f"{num}.categories"] = np.array(series.cat.categories, dtype=str)
+            elif pd.api.types.is_numeric_dtype(series.dtype):
+                arrays[f"{num}.values"] = series.to_numpy()
+            else:
+                arrays[f"{num}.strings"] = series.fillna("").to_numpy(dtype=str)
+                arrays[f"{num}.na"] = series.isna().to_numpy()
+
+        return arrays
+
+    @classmethod
+    def _deserialize(cls, arrays: Dict) -> pd.DataFrame:
+        """Returns data frame from a `dict` of arrays."""
+        columns = {}
+
+        for num, column in enumerate(arrays["__columns__"].tolist()):
+
+            if f"{num}.codes" in arrays:
+                columns[column] = pd.Categorical.from_codes(
+                    arrays[f"{num}.codes"], categories=arrays[f"{num}.categories"]
+                )
+            elif f"{num}.values" in arrays:
+                columns[column] = arrays[f"{num}.values"]
+            else:
+                strings = pd.Series(arrays[f"{num}.strings"])
+                columns[column] = strings.mask(arrays[f"{num}.na"])
+
+        return pd.DataFrame(columns)
@@ -3,7 +3,14 @@ Manages Slide-seq read 1 structure containing bead barcode and UMI.
 """
 
 import re
-from typing import List, Tuple
+from functools import lru_cache
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from slideseq_tools.utils.constants import UP_PRIMER
+from slideseq_tools.utils.sequence import locate_primer
+
 
 # pylint: disable=too-few-public-methods
 class ReadStructure:
@@ -132,3 +139,154 @@ class ReadStructure:
                     counter += 1
 
         return "^" + regex + f"(?P<discard_{counter+1}>.*)$"
+
+    def extraction_plan(self) -> "ExtractionPlan":
+        """\
+        Returns the plan extracting segments of batches of reads.
+        """
+        return ExtractionPlan(self)
+
+
+class ExtractionPlan:
+    """\
+    Extraction of read 1 segments compiled from a read structure.
+
+    Segments of a symbol are concatenated in read order, for example both
+    `C` segments of `8C18U6C2X9M` make the bead barcode.
+    """
+
+    names = {"C": "barcode", "M": "umi", "U": "up_primer"}
+
+    structure: str
+    columns: Dict
+    min_length: int
+    primer_offset: int
+    primer_length: int
+
+    def __init__(self, structure: ReadStructure) -> None:
+        """\
+        Constructor taking a read structure.
+
+        Parameters
+        ----------
+        structure
+            Read structure to compile.
+        """
+        self.structure = structure.structure
+        self.min_length = structure.min_length()
+        self.columns = {name: [] for name in self.names.values()}
+
+        offset = 0
+
+        for symbol, length, num in structure.segments:
+            length = int(length)
+            if symbol == "U" and num == 1:
+                self.primer_offset = offset
+                self.primer_length = length
+            if symbol in self.names:
+                self.columns[self.names[symbol]].append(
+                    np.arange(offset, offset + length)
+                )
+            offset += length
+
+        self.columns = {
+            name: np.concatenate(columns) if columns else np.empty(0, dtype=int)
+            for name, columns in self.columns.items()
+        }
+
+    # pylint: disable=too-many-locals
+    def extract(
+        self,
+        reads: np.ndarray,
+        lengths: np.ndarray = None,
+        max_shift: int = 0,
+        primer: str = UP_PRIMER,
+    ) -> Dict:
+        """\
+        Returns read segments of a batch of reads as a `dict` of `uint8`
+        matrices of ASCII codes, with keys `barcode`, `umi` and `up_primer`.
+
+        Reads shorter than the minimum length aren't extracted, their
+        segments are made of `N` and the `valid` key of the returned `dict`
+        masks them.
+
+        If `max_shift` is positive, the UP primer is located in every read
+        within `max_shift` bases of its expected offset (see
+        `locate_primer`) and segments from the primer onwards are shifted
+        accordingly. The `dict` then also contains the `primer_offset` and
+        `primer_mismatches` arrays.
+
+        Parameters
+        ----------
+        reads
+            Reads as a `uint8` matrix of ASCII codes, one row per read, padded
+            with zeros.
+        lengths
+            Read lengths. Defaults to the number of non-zero codes per read.
+        max_shift
+            Maximum shift of the UP primer.
+        primer
+            UP primer sequence, its length must match the structure.
+        """
+        reads = np.atleast_2d(reads)
+
+        if lengths is None:
+            lengths = np.count_nonzero(reads, axis=1)
+        lengths = np.asarray(lengths)
+
+        segments = {}
+        shifts = np.zeros(reads.shape[0], dtype=np.int64)
+
+        if max_shift > 0:
+
+            if len(primer) != self.primer_length:
+                raise ValueError(
+                    f"Primer {primer} doesn't match read structure {self.structure}."
+                )
+
+            offsets, mismatches = locate_primer(
+                reads, lengths, primer, self.primer_offset, max_shift
+            )
+            shifts = offsets - self.primer_offset
+            segments["primer_offset"] = offsets
+            segments["primer_mismatches"] = mismatches
+
+        # reads narrower than the structure are padded to extract all segments
+        width = max(column.max(initial=-1) for column in self.columns.values())
+        width += max_shift + 1
+        if reads.shape[1] < width:
+            padding = np.zeros((reads.shape[0], width - reads.shape[1]), np.uint8)
+            reads = np.hstack([reads, padding])
+
+        valid = lengths >= self.min_length + shifts
+        segments["valid"] = valid
+
+        for name, columns in self.columns.items():
+
+            if max_shift > 0:
+                moved = columns >= self.primer_offset
+                columns = columns[None, :] + shifts[:, None] * moved[None, :]
+                segment = np.take_along_axis(reads, columns, axis=1)
+            else:
+                segment = reads[:, columns]
+
+            segment[~valid] = ord("N")
+            segments[name] = segment
+
+        return segments
+
+
+@lru_cache(maxsize=None)
+def parse_structure(structure: str) -> ReadStructure:
+    """\
+    Returns the read structure of a definition, parsed once per definition
+    and shared afterwards, so it mustn't be modified.
+
+    Raises a `ValueError` if the structure is not valid.
+
+    Parameters
+    ----------
+    structure
+        A `str` specifying the read structure, for example `8C18U7C2X8M`.
+    """
+    return ReadStructure(structure)
@@ -2,15 +2,19 @@
 For ample sheet validity.
 """
 
+import os
 import re
 from pathlib import Path
-from typing import Dict
+from typing import Dict, List
 import pandas as pd
 
 # pylint: disable=no-name-in-module
 from pydantic import BaseModel, FilePath
 
-from slideseq_tools.config.read_structure import ReadStructure
+from slideseq_tools.config.read_structure import parse_structure
+from slideseq_tools.config.validation_cache import ValidationCache
+
+PATH_COLUMNS = ["fastq_1", "fastq_2", "puck"]
 
 
 class SampleSheetRow(BaseModel):
@@ -25,12 +29,12 @@ class SampleSheetRow(BaseModel):
 
     def min_length(self) -> int:
         """ "Returns minimum read length considering the structure."""
-        structure = ReadStructure(self.read_structure)
+        structure = parse_structure(self.read_structure)
         return structure.min_length()
 
     def umi_tools_regex(self) -> str:
         """ "Returns UMI-tools regex considering the structure."""
-        structure = ReadStructure(self.read_structure)
+        structure = parse_structure(self.read_structure)
         return structure.umi_tools_regex()
 
     def puck_name(self) -> str:
@@ -93,73 +97,185 @@ class SampleSheet:
         """
         Checks if input sample sheet has multiple values for a sample.
 
-        Method raises `ValueError` if there are multiple values for a sample.
+        Method raises `ValueError` if there are multiple values for a sample,
+        listing every conflicting sample and column.
 
         Parameters
         ----------
         dframe
             Pandas dataframe to check.
         """
-        for sample, sample_df in dframe.groupby("sample"):
+        conflicts = self.find_conflicts(dframe)
+
+        if conflicts.shape[0] == 0:
+            return
 
-            unique_df = sample_df.filter(
-                regex=r"^((?!fastq_[12]).*)$", axis=1
-            ).drop_duplicates()
+        lines = [
+            f"{row.column} has multiple values for {row.sample} sample: "
+            + ", ".join(map(str, row.values))
+            for row in conflicts.itertuples(index=False)
+        ]
+        raise ValueError("\n".join(lines))
 
-            # it shouldn't be any duplicate
-            if unique_df.shape[0] == 1:
-                continue
+    @staticmethod
+    def find_conflicts(dframe: pd.DataFrame) -> pd.DataFrame:
+        """
+        Returns samples having multiple values in a column, `FASTQ` columns
+        aside, as a data frame with `sample`, `column`, `n_values` and
+        `values` columns, `values` being lists of distinct values.
 
-            for column in unique_df:
-                if unique_df[column].drop_duplicates().shape[0] != 1:
-                    raise ValueError(
-                        f"{column} has multiple values for {sample} sample."
-                    )
+        Distinct values are counted for all samples and columns at once with
+        a single `groupby`, missing values counting as a value.
 
-    def create_samplesheet(self) -> None:
+        Parameters
+        ----------
+        dframe
+            Pandas dataframe to check.
+        """
+        columns = [
+            column
+            for column in dframe.filter(regex=r"^((?!fastq_[12]).*)$", axis=1)
+            if column != "sample"
+        ]
+        report_columns = ["sample", "column", "n_values", "values"]
+
+        if not columns:
+            return pd.DataFrame(columns=report_columns)
+
+        counts = dframe.groupby("sample")[columns].nunique(dropna=False)
+        counts = counts.stack().rename("n_values")
+        counts.index.names = ["sample", "column"]
+        counts = counts[counts > 1].reset_index()
+
+        if counts.shape[0] == 0:
+            return pd.DataFrame(columns=report_columns)
+
+        # distinct values of the conflicting samples and columns only
+        values = (
+            dframe.loc[
+                dframe["sample"].isin(counts["sample"]),
+                ["sample"] + counts["column"].unique().tolist(),
+            ]
+            .melt(id_vars="sample", var_name="column")
+            .drop_duplicates()
+            .groupby(["sample", "column"], sort=False)["value"]
+            .agg(list)
+            .rename("values")
+        )
+
+        return counts.join(values, on=["sample", "column"])[report_columns]
+
+    def create_samplesheet(self, cache: ValidationCache = None) -> None:
         """
         Creates sample sheet with additional required columns for downstream
         processing.
-        """
-        sheet_rows = []
 
-        for _, row in self.original_dframe.iterrows():
+        Columns are processed at once, like `SampleSheetRow` would row by
+        row: paths are resolved and checked once per distinct path, read
+        structures parsed once per distinct structure. Rows found in the
+        cache, unchanged and with unchanged files, aren't processed again.
 
-            # allow specifying relative path
-            row["fastq_1"] = self._resolve(row["fastq_1"])
-            row["fastq_2"] = self._resolve(row["fastq_2"])
-            row["puck"] = self._resolve(row["puck"])
+        Method raises:
 
-            sheet_row = SampleSheetRow(**row.to_dict())
-            sheet_rows.append(sheet_row.dict())
+            * `ValueError` if a column is missing or has values which aren't
+              `str`
+            * `FileNotFoundError` if a relative path can't be resolved
+            * `ValueError` if a path isn't a file
 
-        self.dframe = pd.DataFrame.from_records(sheet_rows)
+        Parameters
+        ----------
+        cache
+            Cache of validated rows, updated with the new ones.
+        """
+        columns = list(SampleSheetRow.__annotations__)
+        dframe = self.original_dframe
+
+        missing = [column for column in columns if column not in dframe]
+        if missing:
+            raise ValueError(f"Sample sheet doesn't have {', '.join(missing)}.")
+
+        dframe = dframe[columns].copy()
+
+        for column in columns:
+            dtype = pd.api.types.infer_dtype(dframe[column], skipna=False)
+            if dtype not in ["string", "empty"]:
+                raise ValueError(f"{column} has values which aren't strings.")
+
+        if cache is None:
+            self.dframe = self._process(dframe).reset_index(drop=True)
+            return
+
+        keys = cache.row_keys(dframe, self.launch_dir, PATH_COLUMNS)
+        rows = [None if key is None else cache.get_row(key) for key in keys]
+        new = [num for num, row in enumerate(rows) if row is None]
+
+        if new:
+            processed = self._process(dframe.iloc[new])
+            for num, row in zip(new, processed.to_dict("records")):
+                rows[num] = {
+                    **row,
+                    **{column: str(row[column]) for column in PATH_COLUMNS},
+                }
+                cache.set_row(keys[num], rows[num])
+
+        dframe = pd.DataFrame.from_records(
+            rows, columns=columns + ["min_length", "umi_tools_regex", "puck_name"]
+        )
+        for column in PATH_COLUMNS:
+            dframe[column] = [Path(path) for path in dframe[column]]
+
+        self.dframe = dframe
+
+    def _process(self, dframe: pd.DataFrame) -> pd.DataFrame:
+        """Returns rows with resolved paths and additional columns."""
+        dframe = dframe.copy()
+
+        # allow specifying relative path
+        for column in PATH_COLUMNS:
+            dframe[column] = self._resolve_files(dframe[column])
+
+        structures = {
+            structure: parse_structure(structure)
+            for structure in dframe["read_structure"].unique()
+        }
+        dframe["min_length"] = dframe["read_structure"].map(
+            {key: value.min_length() for key, value in structures.items()}
+        )
+        dframe["umi_tools_regex"] = dframe["read_structure"].map(
+            {key: value.umi_tools_regex() for key, value in structures.items()}
+        )
 
-    def _resolve(self, path: str) -> str:
+        names = pd.Series([path.name for path in dframe["puck"]], index=dframe.index)
+        dframe["puck_name"] = names.str.replace(r"\.csv$", "", regex=True)
+
+        return dframe
+
+    def _resolve_files(self, paths: pd.Series) -> pd.Series:
         """
-        Resolve `FASTQ` file path if necessary.
+        Returns paths of a column as `Path` objects, checking they are files.
 
-        The method checks if the path is absolute. If yes, it returns the
-        absolute path. If the path is relative, then it tries to resolve it
-        using `launch_dir` attribute. If the path can't be resolved, then it
-        raise `FileNotFoundError`.
+        Absolute paths are kept as is, relative ones are resolved using
+        `launch_dir` attribute. Every distinct path is resolved once and
+        checked against the listing of its directory, a directory being
+        listed once whatever the number of its files.
 
         Parameters
         ----------
-        path
-            `FASTQ` file path to check.
+        paths
+            Column of paths to resolve.
         """
-        path = Path(path)
-
-        if path.is_absolute():
-            return path
-
-        abspath = Path(self.launch_dir) / path
+        base = Path(self.launch_dir).absolute()
+        resolved = {value: Path(base, value) for value in paths.unique()}
+        files = _list_files([str(path) for path in resolved.values()])
 
-        if not abspath.exists():
-            raise FileNotFoundError(f"{path} and {abspath} don't exist.")
+        for value, path in resolved.items():
+            if files[str(path)] is None and not os.path.isabs(value):
+                abspath = Path(self.launch_dir) / value
+                raise FileNotFoundError(f"{Path(value)} and {abspath} don't exist.")
+            if not files[str(path)]:
+                raise ValueError(f"{path} isn't a file.")
 
-        return str(abspath.absolute())
+        return paths.map(resolved)
 
     def save(self, path: str) -> None:
         """
@@ -173,3 +289,32 @@ class SampleSheet:
         if not hasattr(self, "dframe"):
             self.create_samplesheet()
         self.dframe.to_csv(path, index=False)
+
+
+def _list_files(paths: List[str]) -> Dict:
+    """\
+    Returns whether paths are files, `None` for missing paths, listing
+    every directory once.
+    """
+    by_dir: Dict = {}
+    for path in paths:
+        directory, name = os.path.split(path)
+        by_dir.setdefault(directory, []).append((path, name))
+
+    files = {}
+
+    for directory, dir_paths in by_dir.items():
+
+        try:
+            with os.scandir(directory) as entries:
+                listing = {entry.name: entry.is_file() for entry in entries}
+        except OSError:
+            listing = {}
+
+        # names like `..` aren't listed
+        for path, name in dir_paths:
+            files[path] = listing.get(name)
+            if files[path] is None and os.path.exists(path):
+                files[path] = os.path.isfile(path)
+
+    return files
@@ -0,0 +1,201 @@
+"""
+Plans shards of equal work from the FASTQ files of a sample sheet.
+"""
+
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Tuple
+
+import numpy as np
+import pandas as pd
+
+from slideseq_tools.bgzf import HEADER, uncompressed_size
+
+MANIFEST_COLUMNS = [
+    "sample",
+    "shard",
+    "fastq_1",
+    "fastq_2",
+    "start_record",
+    "end_record",
+    "n_records",
+]
+
+
+def _head(path: Path, n_bytes: int) -> Tuple:
+    """\
+    Returns the first bytes of a file, decompressed if it's `gzip`, the
+    number of compressed bytes they come from and whether the file ended.
+    """
+    with open(path, "rb") as file_obj:
+
+        if file_obj.read(2) != b"\x1f\x8b":
+            file_obj.seek(0)
+            data = file_obj.read(n_bytes)
+            return data, len(data), not file_obj.read(1)
+
+        file_obj.seek(0)
+        decompressor = zlib.decompressobj(31)
+        blocks = []
+        n_data = 0
+        consumed = 0
+
+        while n_data < n_bytes:
+
+            compressed = file_obj.read(2**20)
+            if not compressed:
+                break
+
+            # gzip members follow each other, BGZF blocks among them
+            while compressed:
+                block = decompressor.decompress(compressed)
+                blocks.append(block)
+                n_data += len(block)
+                consumed += len(compressed) - len(decompressor.unused_data)
+                compressed = decompressor.unused_data
+                if decompressor.eof:
+                    decompressor = zlib.decompressobj(31)
+                if n_data >= n_bytes:
+                    break
+
+        ended = n_data < n_bytes and not file_obj.read(1)
+
+    return b"".join(blocks), consumed, ended
+
+
+def estimate_records(path: str, n_bytes: int = 2**22) -> int:
+    """\
+    Returns the estimated number of records of a `FASTQ` file.
+
+    Bytes per record are measured on the first `n_bytes` of data. The
+    uncompressed size is the file size for plain files, it's read from the
+    `.gzi` index or block headers of BGZF files, and estimated from the
+    compression ratio of the first bytes for other `gzip` files. Records
+    are counted if the file is shorter than `n_bytes`. BGZF files without
+    `.gzi` index have every block header read (see `uncompressed_size`).
+
+    Parameters
+    ----------
+    path
+        Path of the `FASTQ` file, plain, `gzip` or BGZF compressed.
+    n_bytes
+        Number of bytes of data sampled.
+    """
+    path = Path(path)
+    data, consumed, ended = _head(path, n_bytes)
+
+    n_lines = data.count(b"\n")
+
+    if ended:
+        return (n_lines + (data[-1:] not in (b"", b"\n"))) // 4
+
+    if n_lines == 0:
+        return 0
+
+    with open(path, "rb") as file_obj:
+        header = file_obj.read(HEADER.size)
+
+    if header[:2] != b"\x1f\x8b":
+        size = path.stat().st_size
+    elif len(header) == HEADER.size and HEADER.unpack(header)[8:11] == (66, 67, 2):
+        size = uncompressed_size(path)
+    else:
+        size = path.stat().st_size * len(data) / max(consumed, 1)
+
+    return int(round(size * n_lines / 4 / len(data)))
+
+
+def estimate_all(paths, workers: int = 4) -> Dict:
+    """\
+    Returns estimated numbers of records of `FASTQ` files by path,
+    estimated concurrently.
+
+    Parameters
+    ----------
+    paths
+        Paths of `FASTQ` files.
+    workers
+        Number of threads.
+    """
+    paths = list(dict.fromkeys(map(str, paths)))
+    with ThreadPoolExecutor(max(workers, 1)) as executor:
+        return dict(zip(paths, executor.map(estimate_records, paths)))
+
+
+# pylint: disable=too-many-locals
+def plan_shards(
+    dframe: pd.DataFrame, target_reads: int, counts: Dict = None, workers: int = 4
+) -> pd.DataFrame:
+    """\
+    Returns the shards of every sample as a manifest with one row per
+    `FASTQ` pair piece, with `sample`, `shard`, `fastq_1`, `fastq_2`,
+    `start_record`, `end_record` and `n_records` columns.
+
+    Pairs of a sample are seen as one stream of records cut in shards of
+    about `target_reads` records, so large pairs are split in record ranges
+    and small ones grouped. Record ranges are 0-based and exclusive, an
+    empty `end_record` meaning the end of the file as record counts are
+    estimated.
+
+    Parameters
+    ----------
+    dframe
+        Sample sheet with `sample`, `fastq_1` and `fastq_2` columns.
+    target_reads
+        Number of records per shard.
+    counts
+        Known numbers of records by Read 1 path, others are estimated.
+    workers
+        Number of threads estimating numbers of records.
+    """
+    pairs = dframe[["sample", "fastq_1", "fastq_2"]].astype(str).drop_duplicates()
+
+    counts = dict(counts or {})
+    missing = [path for path in pairs["fastq_1"].unique() if path not in counts]
+    counts.update(estimate_all(missing, workers))
+
+    rows = []
+
+    for sample, sample_pairs in pairs.groupby("sample", sort=False):
+
+        n_records = np.array(
+            [counts[path] for path in sample_pairs["fastq_1"]], dtype=np.int64
+        )
+        starts = np.cumsum(n_records) - n_records
+        total = int(n_records.sum())
+
+        n_shards = max(1, int(round(total / max(target_reads, 1))))
+        bounds = np.round(np.linspace(0, total, n_shards + 1)).astype(np.int64)
+
+        for (fastq1, fastq2), start, count in zip(
+            sample_pairs[["fastq_1", "fastq_2"]].itertuples(index=False),
+            starts,
+            n_records,
+        ):
+            # shards overlapping the records of the pair
+            first = min(np.searchsorted(bounds, start, side="right") - 1, n_shards - 1)
+            last = max(np.searchsorted(bounds, start + count, side="left"), first + 1)
+
+            for shard in range(first, last):
+                low = max(bounds[shard], start) - start
+                high = min(bounds[shard + 1], start + count) - start
+                rows.append(
+                    (
+                        sample,
+                        shard + 1,
+                        fastq1,
+                        fastq2,
+                        low,
+                        None if shard == last - 1 else high,
+                        high - low,
+                    )
+                )
+
+    # pieces follow the shard order within samples
+    manifest = pd.DataFrame(rows, columns=MANIFEST_COLUMNS)
+
+    for column in ["start_record", "end_record", "n_records"]:
+        manifest[column] = manifest[column].astype("Int64")
+
+    return manifest
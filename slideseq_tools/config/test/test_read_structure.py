@@ -4,7 +4,9 @@ Testing module for the slideseq_tools.config.read_structure module.
 
 import pytest
 
-from ..read_structure import ReadStructure
+from ..read_structure import ReadStructure, parse_structure
+from ...utils.constants import UP_PRIMER
+from ...utils.sequence import locate_primer, to_padded_matrix
 
 
 class TestReadStructure:
@@ -37,3 +39,46 @@ class TestReadStructure:
         for struct_def, length in definitions:
             structure = ReadStructure(struct_def)
             assert length == structure.min_length()
+
+    def test_parse_structure(self):
+        """Tests if `parse_structure` parses a definition once."""
+        structure = parse_structure("8C18U6C2X9M")
+        assert structure is parse_structure("8C18U6C2X9M")
+        assert structure.segments == ReadStructure("8C18U6C2X9M").segments
+        with pytest.raises(ValueError):
+            parse_structure("8C18U")
+
+    def test_extraction_plan(self):
+        """Tests if the extraction plan concatenates segments by symbol."""
+        plan = ReadStructure("2C3U1C1X2M").extraction_plan()
+        reads, lengths = to_padded_matrix(["ACTTTGCAA", "ACTTTGCAATTT", "ACTT"])
+        segments = plan.extract(reads, lengths)
+        assert segments["valid"].tolist() == [True, True, False]
+        assert segments["barcode"].tobytes() == b"ACG" + b"ACG" + b"NNN"
+        assert segments["umi"].tobytes() == b"AA" + b"AA" + b"NN"
+        assert segments["up_primer"].tobytes() == b"TTT" + b"TTT" + b"NNN"
+
+    def test_extraction_plan_shifted_primer(self):
+        """Tests if segments after a shifted UP primer are recovered."""
+        plan = ReadStructure("8C18U6C2X9M").extraction_plan()
+        barcode, umi = "ACGTACGTGGCCAA", "TTTGGGCCC"
+        exact = barcode[:8] + UP_PRIMER + barcode[8:] + "TC" + umi
+        deletion = exact[:3] + exact[4:]
+        insertion = exact[:5] + "G" + exact[5:]
+        mutated = exact[:10] + "A" + exact[11:]
+        reads, lengths = to_padded_matrix([exact, deletion, insertion, mutated])
+
+        segments = plan.extract(reads, lengths, max_shift=2)
+
+        assert segments["primer_offset"].tolist() == [8, 7, 9, 8]
+        assert segments["primer_mismatches"].tolist() == [0, 0, 0, 1]
+        assert segments["valid"].tolist() == [True, True, True, True]
+        assert segments["umi"].tobytes() == umi.encode() * 4
+        assert bytes(segments["barcode"][0]) == barcode.encode()
+        assert bytes(segments["barcode"][1])[8:] == barcode.encode()[8:]
+
+    def test_locate_primer_truncated(self):
+        """Tests if primer bases past read end are mismatches."""
+        reads, lengths = to_padded_matrix(["AAAAAAAA" + UP_PRIMER[:10]])
+        _, mismatches = locate_primer(reads, lengths, max_shift=1)
+        assert mismatches.tolist() == [8]
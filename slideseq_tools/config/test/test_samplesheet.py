@@ -3,10 +3,25 @@ Testing module for the slideseq_tools.config.samplesheet module.
 """
 
 from pathlib import Path
+import pandas as pd
 import pytest
 
 import slideseq_tools
-from ..samplesheet import SampleSheet
+from ..samplesheet import SampleSheet, SampleSheetRow
+
+
+def write_samplesheet(tmp_path, rows) -> Path:
+    """Writes files of sample sheet rows and the sample sheet."""
+    for row in rows:
+        for column in ["fastq_1", "fastq_2", "puck"]:
+            path = Path(row[column])
+            path = path if path.is_absolute() else tmp_path / path
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.touch()
+
+    path = tmp_path / "samplesheet.csv"
+    pd.DataFrame.from_records(rows).to_csv(path, index=False)
+    return path
 
 
 class TestSampleSheet:
@@ -29,3 +44,88 @@ class TestSampleSheet:
         samplesheet = SampleSheet(path=samplesheet_path)
         samplesheet.save(path)
         assert path.exists()
+
+    def test_create_samplesheet(self, tmp_path):
+        """Tests if columns are the ones of `SampleSheetRow` rows."""
+        rows = [
+            {
+                "sample": f"sample{num % 3}",
+                "fastq_1": f"data/sample{num % 3}_L{num:03d}.R1.fastq.gz",
+                "fastq_2": str(tmp_path / f"sample{num % 3}_L{num:03d}.R2.fastq.gz"),
+                "puck": f"pucks/sample{num % 3}.csv",
+                "read_structure": "8C18U6C2X9M" if num % 3 else "8C18U7C2X8M",
+                "genome": "EB2",
+            }
+            for num in range(12)
+        ]
+        path = write_samplesheet(tmp_path, rows)
+
+        samplesheet = SampleSheet(path, launch_dir=tmp_path)
+        samplesheet.create_samplesheet()
+
+        expected = []
+        for row in rows:
+            row = {**row}
+            for column in ["fastq_1", "fastq_2", "puck"]:
+                if not Path(row[column]).is_absolute():
+                    row[column] = str((tmp_path / row[column]).absolute())
+            expected.append(SampleSheetRow(**row).dict())
+
+        assert samplesheet.dframe.equals(pd.DataFrame.from_records(expected))
+
+    def test_create_samplesheet_missing_file(self, tmp_path):
+        """
+        Tests if `create_samplesheet` raises `FileNotFoundError` when a
+        relative path doesn't exist, and `ValueError` when it isn't a file.
+        """
+        row = {
+            "sample": "sample1",
+            "fastq_1": "sample1_L001.R1.fastq.gz",
+            "fastq_2": "sample1_L001.R2.fastq.gz",
+            "puck": "sample1.csv",
+            "read_structure": "8C18U6C2X9M",
+            "genome": "EB2",
+        }
+        path = write_samplesheet(tmp_path, [row])
+
+        (tmp_path / "sample1.csv").unlink()
+        with pytest.raises(FileNotFoundError):
+            SampleSheet(path, launch_dir=tmp_path).create_samplesheet()
+
+        (tmp_path / "sample1.csv").mkdir()
+        with pytest.raises(ValueError):
+            SampleSheet(path, launch_dir=tmp_path).create_samplesheet()
+
+    def test_find_conflicts(self):
+        """Tests if every sample with multiple values in a column is found."""
+        dframe = pd.DataFrame(
+            {
+                "sample": ["sample1", "sample1", "sample2", "sample2", "sample3"],
+                "fastq_1": ["1", "2", "3", "4", "5"],
+                "puck": ["a.csv", "b.csv", "c.csv", "c.csv", "d.csv"],
+                "read_structure": ["8C18U6C2X9M"] * 3 + [None, "8C18U6C2X9M"],
+                "genome": ["EB2", "EB2", "EB2", "EB1", "EB2"],
+            }
+        )
+        conflicts = SampleSheet.find_conflicts(dframe)
+        assert conflicts[["sample", "column", "n_values"]].values.tolist() == [
+            ["sample1", "puck", 2],
+            ["sample2", "read_structure", 2],
+            ["sample2", "genome", 2],
+        ]
+        assert conflicts["values"].tolist()[0] == ["a.csv", "b.csv"]
+        assert SampleSheet.find_conflicts(dframe[dframe["sample"] == "sample3"]).empty
+
+    def test_constructor_conflicts(self, tmp_path):
+        """Tests if constructor raises `ValueError` listing all conflicts."""
+        path = tmp_path / "samplesheet.csv"
+        pd.DataFrame(
+            {
+                "sample": ["sample1", "sample1", "sample2", "sample2"],
+                "puck": ["a.csv", "b.csv", "c.csv", "d.csv"],
+            }
+        ).to_csv(path, index=False)
+
+        with pytest.raises(ValueError) as excinfo:
+            SampleSheet(path)
+        assert "sample1" in str(excinfo.value) and "sample2" in str(excinfo.value)
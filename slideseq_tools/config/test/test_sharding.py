@@ -0,0 +1,72 @@
+"""
+Testing module for the slideseq_tools.config.sharding module.
+"""
+
+import gzip
+
+import pandas as pd
+import pytest
+
+from ...bgzf import open_bgzf
+from ..sharding import estimate_records, plan_shards
+
+
+def _records(n_reads):
+    """Returns `FASTQ` records of varying lengths."""
+    return "".join(
+        f"@read{num}\n{'ACGT' * (10 + num % 5)}\n+\n{'IIII' * (10 + num % 5)}\n"
+        for num in range(n_reads)
+    )
+
+
+def _write(path, text, compression):
+    """Writes a plain, `gzip` or BGZF file."""
+    if compression == "plain":
+        path.write_text(text, encoding="ascii")
+    elif compression == "gzip":
+        with gzip.open(path, "wt") as file_obj:
+            file_obj.write(text)
+    else:
+        with open_bgzf(path, "wt", index=compression == "bgzf+gzi") as file_obj:
+            file_obj.write(text)
+
+
+class TestSharding:
+    """The test class associated with the sharding module."""
+
+    @pytest.mark.parametrize("compression", ["plain", "gzip", "bgzf", "bgzf+gzi"])
+    def test_estimate_records(self, tmp_path, compression):
+        """Tests if records are counted or estimated closely enough."""
+        path = tmp_path / "R1.fastq.gz"
+
+        _write(path, _records(100), compression)
+        assert estimate_records(path) == 100
+
+        _write(path, _records(50000), compression)
+        assert estimate_records(path, n_bytes=2**16) == pytest.approx(50000, rel=0.05)
+
+    def test_plan_shards(self):
+        """Tests if large pairs are split and small ones grouped."""
+        dframe = pd.DataFrame(
+            {
+                "sample": ["sample1"] * 3 + ["sample2"],
+                "fastq_1": ["a.R1", "b.R1", "c.R1", "d.R1"],
+                "fastq_2": ["a.R2", "b.R2", "c.R2", "d.R2"],
+            }
+        )
+        counts = {"a.R1": 250, "b.R1": 30, "c.R1": 20, "d.R1": 10}
+        manifest = plan_shards(dframe, 100, counts=counts)
+
+        columns = ["sample", "shard", "fastq_1", "start_record", "n_records"]
+        assert manifest[columns].values.tolist() == [
+            ["sample1", 1, "a.R1", 0, 100],
+            ["sample1", 2, "a.R1", 100, 100],
+            ["sample1", 3, "a.R1", 200, 50],
+            ["sample1", 3, "b.R1", 0, 30],
+            ["sample1", 3, "c.R1", 0, 20],
+            ["sample2", 1, "d.R1", 0, 10],
+        ]
+
+        # last pieces of files go to their end
+        assert manifest["end_record"].isna().tolist() == [False] * 2 + [True] * 4
+        assert manifest["end_record"][:2].tolist() == [100, 200]
@@ -0,0 +1,90 @@
+"""
+Testing module for the slideseq_tools.config.validation module.
+"""
+
+import gzip
+
+import pandas as pd
+
+from ..validation import check_fastq, check_puck, validate_samplesheet
+
+
+def _write_fastq(path, n_reads, length):
+    """Writes a `gzip` compressed `FASTQ` file."""
+    with gzip.open(path, "wt") as file_obj:
+        for num in range(n_reads):
+            file_obj.write(f"@read{num}\n{'A' * length}\n+\n{'I' * length}\n")
+
+
+class TestValidation:
+    """The test class associated with the validation module."""
+
+    def test_check_fastq(self, tmp_path):
+        """Tests if records are counted and lengths sampled."""
+        path = tmp_path / "R1.fastq.gz"
+        _write_fastq(path, 30, 43)
+        result = check_fastq(path, n_sampled=10)
+        assert result == {"n_records": 30, "lengths": [[43, 10]], "errors": []}
+
+    def test_check_fastq_truncated(self, tmp_path):
+        """Tests if truncated `gzip` streams and records are errors."""
+        path = tmp_path / "R1.fastq.gz"
+        _write_fastq(path, 3000, 43)
+        path.write_bytes(path.read_bytes()[:-100])
+        assert check_fastq(path)["errors"]
+
+        path = tmp_path / "R1.fastq"
+        path.write_text("@read0\nACGT\n+\nIIII\n@read1\nACGT\n", encoding="utf-8")
+        assert check_fastq(path)["errors"]
+
+    def test_check_fastq_trailing_blank_lines(self, tmp_path):
+        """Tests if blank lines ending the file are ignored."""
+        path = tmp_path / "R1.fastq"
+        path.write_text("@read0\nACGT\n+\nIIII\n\n\n", encoding="utf-8")
+        assert check_fastq(path) == {
+            "n_records": 1,
+            "lengths": [[4, 1]],
+            "errors": [],
+        }
+
+        # empty last read followed by a blank line
+        path.write_text("@read0\nA\n+\nI\n@read1\n\n+\n\n\n", encoding="utf-8")
+        assert check_fastq(path, block_size=3)["n_records"] == 2
+
+    def test_check_puck(self, tmp_path):
+        """Tests if the puck schema is checked."""
+        path = tmp_path / "puck.csv"
+        path.write_text("ACGT,1.5,-2\nTTGA,3,4\n", encoding="utf-8")
+        assert check_puck(path) == {"n_records": 2, "errors": []}
+
+        path.write_text("ACGT,1.5\nTTGA,3\n", encoding="utf-8")
+        assert check_puck(path)["errors"]
+
+        path.write_text("ACGT,1.5,a\nTTG,3,4\n", encoding="utf-8")
+        assert len(check_puck(path)["errors"]) == 2
+
+    def test_validate_samplesheet(self, tmp_path):
+        """Tests if record mismatches and short reads are reported."""
+        _write_fastq(tmp_path / "L1.R1.fastq.gz", 20, 43)
+        _write_fastq(tmp_path / "L1.R2.fastq.gz", 20, 50)
+        _write_fastq(tmp_path / "L2.R1.fastq.gz", 20, 30)
+        _write_fastq(tmp_path / "L2.R2.fastq.gz", 19, 50)
+        (tmp_path / "puck.csv").write_text("ACGT,1,2\n", encoding="utf-8")
+
+        dframe = pd.DataFrame(
+            {
+                "fastq_1": [tmp_path / "L1.R1.fastq.gz", tmp_path / "L2.R1.fastq.gz"],
+                "fastq_2": [tmp_path / "L1.R2.fastq.gz", tmp_path / "L2.R2.fastq.gz"],
+                "puck": [tmp_path / "puck.csv"] * 2,
+                "read_structure": ["8C18U6C2X9M"] * 2,
+                "min_length": [43, 43],
+            }
+        )
+        checks = {}
+        report = validate_samplesheet(dframe, workers=2, checks=checks)
+
+        assert report["kind"].tolist() == ["fastq_1"] * 2 + ["fastq_2"] * 2 + ["puck"]
+        assert report["status"].tolist() == ["ok", "error", "ok", "error", "ok"]
+        assert report["n_records"].tolist() == [20, 20, 20, 19, 1]
+        assert "shorter than 43" in report["message"][1]
+        assert len(checks) == 5
@@ -0,0 +1,103 @@
+"""
+Testing module for the slideseq_tools.config.validation_cache module.
+"""
+
+import os
+
+import pandas as pd
+import pytest
+
+from ..samplesheet import SampleSheet
+from ..validation_cache import ValidationCache
+
+
+def _write_samplesheet(tmp_path, n_rows):
+    """Writes missing files of sample sheet rows and the sample sheet."""
+    rows = []
+    for num in range(n_rows):
+        row = {
+            "sample": "sample1",
+            "fastq_1": f"L{num}.R1.fastq.gz",
+            "fastq_2": f"L{num}.R2.fastq.gz",
+            "puck": "sample1.csv",
+            "read_structure": "8C18U6C2X9M",
+            "genome": "EB2",
+        }
+        for column in ["fastq_1", "fastq_2", "puck"]:
+            if not (tmp_path / row[column]).exists():
+                (tmp_path / row[column]).touch()
+        rows.append(row)
+
+    path = tmp_path / "samplesheet.csv"
+    pd.DataFrame.from_records(rows).to_csv(path, index=False)
+    return path
+
+
+class TestValidationCache:
+    """The test class associated with the ValidationCache class."""
+
+    def test_rows(self, tmp_path):
+        """Tests if only new or modified rows are processed again."""
+        path = _write_samplesheet(tmp_path, 3)
+        cache = ValidationCache(tmp_path / "cache" / "validation.json")
+
+        samplesheet = SampleSheet(path, launch_dir=tmp_path)
+        samplesheet.create_samplesheet(cache=cache)
+        cache.save()
+
+        cache = ValidationCache(tmp_path / "cache" / "validation.json")
+        assert len(cache.rows) == 3
+
+        path = _write_samplesheet(tmp_path, 4)
+        os.utime(tmp_path / "L0.R2.fastq.gz", ns=(0, 0))
+
+        samplesheet = SampleSheet(path, launch_dir=tmp_path)
+        samplesheet.create_samplesheet(cache=cache)
+
+        # a row was added and another one has a modified file
+        assert len(cache.rows) == 5
+        names = [os.path.basename(row["fastq_1"]) for row in cache.rows.values()]
+        assert names[-2:] == ["L0.R1.fastq.gz", "L3.R1.fastq.gz"]
+
+        expected = SampleSheet(path, launch_dir=tmp_path)
+        expected.create_samplesheet()
+        assert samplesheet.dframe.equals(expected.dframe)
+
+    def test_file_checks(self, tmp_path):
+        """Tests if file checks are only served while files don't change."""
+        path = tmp_path / "R1.fastq"
+        path.write_text("@r\nA\n+\nI\n", encoding="utf-8")
+
+        cache = ValidationCache(tmp_path / "validation.json")
+        cache.set_file_checks({str(path): {"n_records": 1}}, {"n_sampled": 10})
+        cache.save()
+
+        cache = ValidationCache(tmp_path / "validation.json")
+        assert cache.file_checks([path], {"n_sampled": 10}) == {
+            str(path): {"n_records": 1}
+        }
+        assert not cache.file_checks([path], {"n_sampled": 20})
+
+        path.write_text("@r\nAC\n+\nII\n", encoding="utf-8")
+        assert not cache.file_checks([path], {"n_sampled": 10})
+
+    def test_file_errors_not_cached(self, tmp_path):
+        """Tests if file checks with errors are checked again."""
+        path = tmp_path / "R1.fastq"
+        path.write_text("@r\nA\n+\nI\n", encoding="utf-8")
+
+        cache = ValidationCache(tmp_path / "validation.json")
+        cache.set_file_checks({str(path): {"n_records": 1}}, {})
+        cache.set_file_checks({str(path): {"errors": ["I/O error"]}}, {})
+        cache.save()
+
+        cache = ValidationCache(tmp_path / "validation.json")
+        assert not cache.file_checks([path], {})
+
+    def test_failed_save(self, tmp_path):
+        """Tests if a failed save leaves no temporary file."""
+        cache = ValidationCache(tmp_path / "validation.json")
+        cache.set_row("key", {"sample": object()})
+        with pytest.raises(TypeError):
+            cache.save()
+        assert not list(tmp_path.iterdir())
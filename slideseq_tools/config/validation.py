@@ -0,0 +1,233 @@
+"""
+Deep validation of the files referenced by a sample sheet.
+"""
+
+import gzip
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+from slideseq_tools.barcode import PUCK_COLUMNS
+from slideseq_tools.fastq import FastqReader
+
+REPORT_COLUMNS = ["path", "kind", "status", "n_records", "message"]
+
+# reads whose length is sampled per FASTQ file
+N_SAMPLED = 10000
+
+
+def check_fastq(path: str, n_sampled: int = N_SAMPLED, block_size: int = 2**22) -> Dict:
+    """\
+    Returns the checks of a `FASTQ` file as a JSON serializable `dict` with
+    `n_records`, `lengths` and `errors` keys.
+
+    The whole file is decompressed, which verifies `gzip` integrity, and
+    its records are counted from line breaks. Lengths of the first
+    `n_sampled` reads are returned as `[length, count]` pairs.
+
+    Parameters
+    ----------
+    path
+        Path of the `FASTQ` file, plain or `gzip` compressed.
+    n_sampled
+        Number of reads whose length is sampled.
+    block_size
+        Number of bytes decompressed at once.
+    """
+    result = {"n_records": None, "lengths": [], "errors": []}
+    path = Path(path)
+
+    try:
+        chunk = next(iter(FastqReader(path, chunk_size=n_sampled)), None)
+        if chunk is not None:
+            lengths, counts = np.unique(chunk.lengths, return_counts=True)
+            result["lengths"] = np.column_stack([lengths, counts]).tolist()
+
+        n_lines = 0
+        tail = b"\n"
+
+        opener = gzip.open if path.suffix == ".gz" else open
+        with opener(path, "rb") as file_obj:
+            for block in iter(lambda: file_obj.read(block_size), b""):
+                n_lines += block.count(b"\n")
+                tail = (tail + block[-4096:])[-4096:]
+
+        # last line without line break
+        n_lines += tail[-1:] != b"\n"
+
+        # blank lines ending the file, not the empty lines of last records
+        n_blank = max(tail[len(tail.rstrip(b"\r\n")) :].count(b"\n") - 1, 0)
+        n_blank -= (n_blank - n_lines) % 4
+        n_lines -= max(n_blank, 0)
+
+        if n_lines % 4:
+            raise ValueError(f"{path} is truncated, it has {n_lines} lines.")
+
+        result["n_records"] = n_lines // 4
+
+    except (OSError, EOFError, zlib.error, ValueError) as exc:
+        result["errors"].append(str(exc) or type(exc).__name__)
+
+    return result
+
+
+def check_puck(path: str) -> Dict:
+    """\
+    Returns the checks of a puck `CSV` file as a JSON serializable `dict`
+    with `n_records` and `errors` keys.
+
+    Beads must have a barcode and numeric coordinates, barcodes all having
+    the same length.
+
+    Parameters
+    ----------
+    path
+        Path of the puck `CSV` file, without header.
+    """
+    result = {"n_records": None, "errors": []}
+
+    try:
+        dframe = pd.read_csv(path, header=None, dtype=str, keep_default_na=False)
+    except (OSError, ValueError) as exc:
+        result["errors"].append(f"{path} can't be read: {exc}")
+        return result
+
+    if dframe.shape[1] != len(PUCK_COLUMNS):
+        result["errors"].append(
+            f"{path} has {dframe.shape[1]} columns instead of "
+            f"{len(PUCK_COLUMNS)} ({', '.join(PUCK_COLUMNS)})."
+        )
+        return result
+
+    dframe.columns = PUCK_COLUMNS
+    result["n_records"] = dframe.shape[0]
+
+    if np.any(dframe["Barcode"].str.len() == 0):
+        result["errors"].append(f"{path} has beads without barcode.")
+    elif dframe["Barcode"].str.len().nunique() > 1:
+        result["errors"].append(f"{path} has barcodes of different lengths.")
+
+    for column in ["x", "y"]:
+        if pd.to_numeric(dframe[column], errors="coerce").isna().any():
+            result["errors"].append(f"{path} has non-numeric {column} coordinates.")
+
+    return result
+
+
+def _check_file(task) -> Dict:
+    """Returns the checks of a `(kind, path, n_sampled)` task."""
+    kind, path, n_sampled = task
+    if kind == "puck":
+        return check_puck(path)
+    return check_fastq(path, n_sampled=n_sampled)
+
+
+def check_files(tasks: List, workers: int = 4) -> List[Dict]:
+    """\
+    Returns the checks of files run concurrently, in task order.
+
+    Largest files are checked first, so wall time is about the one of the
+    largest file if there are enough workers.
+
+    Parameters
+    ----------
+    tasks
+        Tuples (`kind`, `path`, `n_sampled`), `kind` being `puck` or a
+        `FASTQ` column name.
+    workers
+        Number of threads, decompression releases the GIL.
+    """
+    sizes = [Path(path).stat().st_size for _, path, _ in tasks]
+    order = np.argsort(sizes, kind="stable")[::-1]
+
+    with ThreadPoolExecutor(max(workers, 1)) as executor:
+        results = list(executor.map(_check_file, [tasks[num] for num in order]))
+
+    checks = [None] * len(tasks)
+    for num, result in zip(order, results):
+        checks[num] = result
+
+    return checks
+
+
+# pylint: disable=too-many-locals
+def validate_samplesheet(
+    dframe: pd.DataFrame,
+    workers: int = 4,
+    n_sampled: int = N_SAMPLED,
+    max_short_fraction: float = 0.01,
+    checks: Dict = None,
+) -> pd.DataFrame:
+    """\
+    Returns the deep validation report of the files of a sample sheet, one
+    row per file with `path`, `kind`, `status`, `n_records` and `message`
+    columns, `status` being `ok` or `error`.
+
+    On top of file checks, Read 1 and Read 2 of a row must have the same
+    number of records and at most `max_short_fraction` of sampled Read 1
+    lengths may be shorter than the `min_length` of the row.
+
+    Parameters
+    ----------
+    dframe
+        Sample sheet created by `SampleSheet.create_samplesheet`.
+    workers
+        Number of threads checking files.
+    n_sampled
+        Number of reads whose length is sampled per `FASTQ` file.
+    max_short_fraction
+        Maximum fraction of sampled Read 1 shorter than the structure.
+    checks
+        Checks of files already done, by path, only the other files are
+        checked. It's updated with the new checks.
+    """
+    checks = {} if checks is None else checks
+
+    kinds = {}
+    for kind in ["fastq_1", "fastq_2", "puck"]:
+        for path in dframe[kind].astype(str).unique():
+            kinds.setdefault(path, kind)
+
+    tasks = [(kind, path, n_sampled) for path, kind in kinds.items()]
+    tasks = [task for task in tasks if task[1] not in checks]
+    checks.update(zip([task[1] for task in tasks], check_files(tasks, workers)))
+
+    errors = {path: list(checks[path]["errors"]) for path in kinds}
+
+    for row in dframe.drop_duplicates(["fastq_1", "fastq_2"]).itertuples():
+
+        fastq1, fastq2 = str(row.fastq_1), str(row.fastq_2)
+        n_records1 = checks[fastq1]["n_records"]
+        n_records2 = checks[fastq2]["n_records"]
+
+        if None not in (n_records1, n_records2) and n_records1 != n_records2:
+            message = f"{fastq1} has {n_records1} records, {fastq2} {n_records2}."
+            errors[fastq1].append(message)
+            errors[fastq2].append(message)
+
+        lengths = np.array(checks[fastq1]["lengths"], dtype=np.int64).reshape(-1, 2)
+        n_short = lengths[lengths[:, 0] < row.min_length, 1].sum()
+
+        if n_short > max_short_fraction * max(lengths[:, 1].sum(), 1):
+            errors[fastq1].append(
+                f"{n_short} of {lengths[:, 1].sum()} sampled reads of {fastq1} "
+                f"are shorter than {row.min_length} bases ({row.read_structure})."
+            )
+
+    report = pd.DataFrame(
+        {
+            "path": list(kinds),
+            "kind": list(kinds.values()),
+            "status": ["error" if errors[path] else "ok" for path in kinds],
+            "n_records": [checks[path]["n_records"] for path in kinds],
+            "message": [" ".join(errors[path]) for path in kinds],
+        },
+        columns=REPORT_COLUMNS,
+    )
+    report["n_records"] = report["n_records"].astype("Int64")
+
+    return report
@@ -0,0 +1,211 @@
+"""
+Manages a persistent cache of sample sheet validations.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Dict, List
+
+import pandas as pd
+
+CACHE_VERSION = 1
+
+
+def _stat(path: str) -> List:
+    """Returns size and modification time of a file, `None` if missing."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+class ValidationCache:
+    """\
+    `JSON` file of validated sample sheet rows and file checks.
+
+    Entries are keyed by row contents and the size and modification time
+    of the files, so a row is validated again as soon as it or one of its
+    files changes. Least recently used entries are dropped when there are
+    more than `max_entries`.
+    """
+
+    path: Path
+    max_entries: int
+    rows: Dict
+    files: Dict
+
+    def __init__(self, path: str, max_entries: int = 10**6) -> None:
+        """\
+        Constructor of ValidationCache class.
+
+        The cache is empty if the file doesn't exist or can't be read.
+
+        Parameters
+        ----------
+        path
+            Path of the cache `JSON` file.
+        max_entries
+            Maximum number of rows and of files kept.
+        """
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.rows = {}
+        self.files = {}
+
+        try:
+            with open(self.path, encoding="utf-8") as file_obj:
+                content = json.load(file_obj)
+        except (OSError, ValueError):
+            return
+
+        if isinstance(content, dict) and content.get("version") == CACHE_VERSION:
+            self.rows = content.get("rows", {})
+            self.files = content.get("files", {})
+
+    def row_keys(
+        self, dframe: pd.DataFrame, launch_dir: str, path_columns: List
+    ) -> List[str]:
+        """\
+        Returns the cache keys of sample sheet rows, `None` for rows whose
+        files don't all exist.
+
+        Parameters
+        ----------
+        dframe
+            Original sample sheet rows.
+        launch_dir
+            Directory resolving relative paths.
+        path_columns
+            Columns of file paths.
+        """
+        base = str(Path(launch_dir).absolute())
+        stats = {}
+
+        for column in path_columns:
+            for value in dframe[column].unique():
+                path = os.path.join(base, value)
+                stats[path] = _stat(path)
+
+        keys = []
+
+        for values in dframe.itertuples(index=False, name=None):
+
+            row = dict(zip(dframe.columns, values))
+            files = [stats[os.path.join(base, row[column])] for column in path_columns]
+
+            if None in files:
+                keys.append(None)
+                continue
+
+            content = {"row": row, "launch_dir": base, "files": files}
+            digest = hashlib.sha1(json.dumps(content, sort_keys=True).encode("utf-8"))
+            keys.append(digest.hexdigest())
+
+        return keys
+
+    def get_row(self, key: str) -> Dict:
+        """\
+        Returns a validated row, `None` if it isn't cached.
+
+        Parameters
+        ----------
+        key
+            Row key.
+        """
+        row = self.rows.pop(key, None)
+
+        # most recently used entries are dropped last
+        if row is not None:
+            self.rows[key] = row
+
+        return row
+
+    def set_row(self, key: str, row: Dict) -> None:
+        """\
+        Caches a validated row.
+
+        Parameters
+        ----------
+        key
+            Row key.
+        row
+            `JSON` serializable row.
+        """
+        self.rows.pop(key, None)
+        self.rows[key] = row
+
+    def file_checks(self, paths: List[str], params: Dict) -> Dict:
+        """\
+        Returns cached checks of files by path, only for files which didn't
+        change since they were checked with the same parameters.
+
+        Parameters
+        ----------
+        paths
+            File paths.
+        params
+            `JSON` serializable check parameters.
+        """
+        checks = {}
+
+        for path in map(str, paths):
+
+            entry = self.files.pop(path, None)
+
+            if entry is None:
+                continue
+
+            self.files[path] = entry
+
+            if entry["stat"] == _stat(path) and entry["params"] == params:
+                checks[path] = entry["checks"]
+
+        return checks
+
+    def set_file_checks(self, checks: Dict, params: Dict) -> None:
+        """\
+        Caches checks of files by path. Checks with `errors` aren't cached,
+        they may come from transient failures, and files are checked again.
+
+        Parameters
+        ----------
+        checks
+            `JSON` serializable checks by path.
+        params
+            `JSON` serializable check parameters.
+        """
+        for path, result in checks.items():
+            self.files.pop(path, None)
+            if not result.get("errors"):
+                self.files[path] = {
+                    "stat": _stat(path),
+                    "params": params,
+                    "checks": result,
+                }
+
+    def save(self) -> None:
+        """Writes the cache file, dropping least recently used entries."""
+        for entries in [self.rows, self.files]:
+            for key in list(entries)[: max(len(entries) - self.max_entries, 0)]:
+                del entries[key]
+
+        content = {"version": CACHE_VERSION, "rows": self.rows, "files": self.files}
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        # concurrent processes never read a partially written cache
+        with tempfile.NamedTemporaryFile(
+            "w", dir=self.path.parent, suffix=".tmp", delete=False, encoding="utf-8"
+        ) as file_obj:
+            try:
+                json.dump(content, file_obj)
+            except BaseException:
+                file_obj.close()
+                os.unlink(file_obj.name)
+                raise
+
+        os.replace(file_obj.name, self.path)
@@ -0,0 +1,275 @@
+"""
+Reads genome sequences from memory-mapped FASTA files.
+"""
+
+import mmap
+import os
+from pathlib import Path
+from typing import List, Tuple
+
+import numpy as np
+import pandas as pd
+
+FAI_COLUMNS = ["name", "length", "offset", "line_bases", "line_width"]
+
+# ASCII code to upper case ASCII code
+UPPER = np.arange(256, dtype=np.uint8)
+UPPER[ord("a") : ord("z") + 1] -= 32
+
+
+def _count(buffer, sub: bytes, start: int, end: int) -> int:
+    """Returns occurrences of a byte in a buffer range, by blocks."""
+    block_size = 2**24
+    return sum(
+        buffer[pos : min(pos + block_size, end)].count(sub)
+        for pos in range(start, end, block_size)
+    )
+
+
+def _map(path: Path) -> np.ndarray:
+    """Returns a file memory-mapped as `uint8`, empty files can't be mapped."""
+    if os.path.getsize(path) == 0:
+        return np.empty(0, dtype=np.uint8)
+    return np.memmap(path, dtype=np.uint8, mode="r")
+
+
+# pylint: disable=too-many-locals
+def build_fai(path: str) -> pd.DataFrame:
+    """\
+    Returns the `samtools faidx` index of a `FASTA` file as a data frame with
+    `name`, `length`, `offset`, `line_bases` and `line_width` columns.
+
+    Headers are found with `mmap` searches and lengths from line break
+    counts, the file isn't read line by line.
+
+    Blank lines ending a sequence are ignored. Function raises a
+    `ValueError` if lines of a sequence don't all have the same length, but
+    the last one.
+
+    Parameters
+    ----------
+    path
+        Path of the plain text `FASTA` file.
+    """
+    rows: List = []
+
+    with open(path, "rb") as file_obj:
+
+        if os.fstat(file_obj.fileno()).st_size == 0:
+            return pd.DataFrame(rows, columns=FAI_COLUMNS)
+
+        with mmap.mmap(file_obj.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+
+            size = len(buffer)
+            header = 0 if buffer[:1] == b">" else buffer.find(b"\n>") + 1
+
+            while header > 0 or (header == 0 and buffer[:1] == b">"):
+
+                eol = buffer.find(b"\n", header)
+                eol = size if eol < 0 else eol
+                name = buffer[header + 1 : eol].decode("ascii").split()[0]
+                offset = min(eol + 1, size)
+
+                following = buffer.find(b"\n>", eol)
+                end = size if following < 0 else following + 1
+
+                # blank lines before the next record aren't part of the sequence
+                stop = end
+                while stop > offset and buffer[stop - 1] in b"\r\n":
+                    stop -= 1
+                eol = buffer.find(b"\n", stop, end)
+                if stop == offset:
+                    end = offset
+                elif eol >= 0:
+                    end = eol + 1
+
+                first = buffer.find(b"\n", offset, end)
+                line_width = end - offset if first < 0 else first + 1 - offset
+                line = buffer[offset : offset + line_width]
+                line_bases = len(line.rstrip(b"\r\n"))
+
+                length = (
+                    end
+                    - offset
+                    - _count(buffer, b"\n", offset, end)
+                    - _count(buffer, b"\r", offset, end)
+                )
+
+                # every line but the last has the same length
+                if line_bases > 0:
+                    n_full, last = divmod(length, line_bases)
+                    breaks = line_width - line_bases
+                    expected = n_full * line_width + (last + breaks if last else 0)
+
+                    # the last line may end the file without line break
+                    n_eols = n_full - (not last and buffer[end - 1] != ord("\n"))
+                    eols = buffer[
+                        offset
+                        + line_width
+                        - 1 : offset
+                        + n_eols * line_width : line_width
+                    ]
+                    if not (
+                        expected - breaks <= end - offset <= expected
+                        and eols.count(b"\n") == len(eols)
+                    ):
+                        raise ValueError(
+                            f"Sequence {name} has lines of different lengths."
+                        )
+
+                rows.append((name, length, offset, line_bases, line_width))
+                header = -1 if following < 0 else following + 1
+
+    return pd.DataFrame(rows, columns=FAI_COLUMNS)
+
+
+def read_fai(path: str) -> pd.DataFrame:
+    """\
+    Returns a `samtools faidx` index as a data frame.
+
+    Parameters
+    ----------
+    path
+        Path of the `.fai` file.
+    """
+    return pd.read_csv(
+        path,
+        sep="\t",
+        header=None,
+        names=FAI_COLUMNS,
+        usecols=range(5),
+        dtype={"name": str},
+    )
+
+
+class Fasta:
+    """\
+    Memory-mapped `FASTA` file indexed like `samtools faidx`.
+
+    Bases are read straight from the mapped file, so processes reading the
+    same genome share it through the page cache and no record objects are
+    created.
+    """
+
+    path: Path
+    index: pd.DataFrame
+
+    def __init__(self, path: str, write_index: bool = True) -> None:
+        """\
+        Constructor of Fasta class.
+
+        The `.fai` index next to the `FASTA` file is used if it's more recent,
+        otherwise it's built and written, if possible.
+
+        Raises a `FileNotFoundError` if `FASTA` file doesn't exist.
+
+        Parameters
+        ----------
+        path
+            Path of the plain text `FASTA` file.
+        write_index
+            Whether to write the index it builds.
+        """
+        path = Path(path)
+
+        if not path.exists():
+            raise FileNotFoundError(f"FASTA file {path} doesn't exist.")
+
+        self.path = path
+
+        fai_path = Path(f"{path}.fai")
+
+        if fai_path.exists() and fai_path.stat().st_mtime >= path.stat().st_mtime:
+            self.index = read_fai(fai_path)
+        else:
+            self.index = build_fai(path)
+            if write_index:
+                try:
+                    self.index.to_csv(fai_path, sep="\t", header=False, index=False)
+                except OSError:
+                    pass
+
+        self.buffer = _map(path)
+        self.names = pd.Index(self.index["name"])
+
+    def __getstate__(self) -> dict:
+        """Returns the state to pickle, the mapping being opened again."""
+        state = self.__dict__.copy()
+        del state["buffer"]
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        """Restores a pickled state and maps the `FASTA` file."""
+        self.__dict__.update(state)
+        self.buffer = _map(self.path)
+
+    def __len__(self) -> int:
+        """Returns number of sequences."""
+        return self.index.shape[0]
+
+    def lengths(self) -> pd.Series:
+        """Returns sequence lengths indexed by name."""
+        return pd.Series(self.index["length"].values, index=self.names)
+
+    # pylint: disable=too-many-locals
+    def fetch(self, seqids, starts, ends) -> Tuple[np.ndarray]:
+        """\
+        Returns slices of sequences as a `uint8` matrix of upper case ASCII
+        codes, padded with zeros, and their lengths.
+
+        Slices are clipped to the sequence ends. Method raises a `KeyError`
+        if a sequence isn't in the file.
+
+        Parameters
+        ----------
+        seqids
+            Sequence names.
+        starts
+            0-based start positions.
+        ends
+            0-based exclusive end positions.
+        """
+        records = self.names.get_indexer(np.asarray(seqids, dtype=object))
+
+        if np.any(records < 0):
+            missing = np.asarray(seqids, dtype=object)[records < 0][0]
+            raise KeyError(f"Sequence {missing} isn't in {self.path}.")
+
+        seq_lengths = self.index["length"].values[records]
+        starts = np.clip(np.asarray(starts, dtype=np.int64), 0, seq_lengths)
+        ends = np.clip(np.asarray(ends, dtype=np.int64), starts, seq_lengths)
+        lengths = ends - starts
+
+        width = int(lengths.max()) if lengths.shape[0] else 0
+        positions = starts[:, None] + np.arange(width)
+        valid = np.arange(width) < lengths[:, None]
+
+        # file offsets skip the line breaks
+        line_bases = np.maximum(self.index["line_bases"].values[records], 1)[:, None]
+        line_width = self.index["line_width"].values[records][:, None]
+        offsets = (
+            self.index["offset"].values[records][:, None]
+            + positions // line_bases * line_width
+            + positions % line_bases
+        )
+
+        matrix = np.zeros((lengths.shape[0], width), dtype=np.uint8)
+        matrix[valid] = UPPER[self.buffer[offsets[valid]]]
+
+        return matrix, lengths
+
+    def fetch_str(self, seqid: str, start: int, end: int) -> str:
+        """\
+        Returns a slice of a sequence as an upper case `str`.
+
+        Parameters
+        ----------
+        seqid
+            Sequence name.
+        start
+            0-based start position.
+        end
+            0-based exclusive end position.
+        """
+        matrix, lengths = self.fetch([seqid], [start], [end])
+        return matrix[0, : lengths[0]].tobytes().decode("ascii")
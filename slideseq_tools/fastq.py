@@ -0,0 +1,358 @@
+"""
+Reads FASTQ files by chunks of reads held in NumPy arrays.
+"""
+
+import gzip
+from pathlib import Path
+from typing import Iterator, List, Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+NEWLINE = ord("\n")
+
+
+def _gather(buffer: np.ndarray, starts: np.ndarray, lengths: np.ndarray) -> Tuple:
+    """Returns slices of a buffer as a zero-padded matrix."""
+    width = int(lengths.max()) if lengths.shape[0] else 0
+    padded = np.append(buffer, np.zeros(width, dtype=np.uint8))
+    matrix = sliding_window_view(padded, width)[starts]
+    matrix[np.arange(width) >= lengths[:, None]] = 0
+    return matrix
+
+
+def _concatenate(buffer: np.ndarray, starts: np.ndarray, lengths: np.ndarray):
+    """Returns slices of a buffer concatenated, and their offsets."""
+    offsets = np.zeros(lengths.shape[0] + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    indexes = np.arange(offsets[-1]) + np.repeat(starts - offsets[:-1], lengths)
+    return buffer[indexes], offsets
+
+
+def _trailing_blank_lines(buffer: np.ndarray, newlines: np.ndarray) -> int:
+    """Returns the number of empty lines ending a buffer."""
+    count = 0
+
+    while count < newlines.shape[0]:
+        end = newlines[-1 - count]
+        start = newlines[-2 - count] + 1 if count + 1 < newlines.shape[0] else 0
+        if end - start > 1 or (end - start == 1 and buffer[start] != ord("\r")):
+            break
+        count += 1
+
+    return count
+
+
+def join_rows(fields: List, n_rows: int) -> np.ndarray:
+    """\
+    Returns rows made of several fields concatenated in a single `uint8`
+    buffer, `FASTQ` records being rows of header, sequence and quality
+    fields.
+
+    Every field is copied for all rows at once with a mask of its valid
+    positions, there is no loop over rows.
+
+    Parameters
+    ----------
+    fields
+        Fields of every row, either `bytes` shared by all rows or a tuple of
+        a `uint8` matrix of ASCII codes, one row per row, and its lengths.
+    n_rows
+        Number of rows.
+    """
+    fields = [
+        (
+            (np.frombuffer(field, dtype=np.uint8), None)
+            if isinstance(field, bytes)
+            else (np.atleast_2d(field[0]), np.asarray(field[1], dtype=np.int64))
+        )
+        for field in fields
+    ]
+
+    row_lengths = np.zeros(n_rows, dtype=np.int64)
+    for values, lengths in fields:
+        row_lengths += values.shape[0] if lengths is None else lengths
+
+    cursors = np.cumsum(row_lengths) - row_lengths
+    buffer = np.empty(int(row_lengths.sum()), dtype=np.uint8)
+
+    for values, lengths in fields:
+
+        if lengths is None:
+            buffer[cursors[:, None] + np.arange(values.shape[0])] = values
+            cursors += values.shape[0]
+            continue
+
+        positions = np.arange(values.shape[1])
+        valid = positions < lengths[:, None]
+        buffer[(cursors[:, None] + positions)[valid]] = values[valid]
+        cursors += lengths
+
+    return buffer
+
+
+class FastqChunk:
+    """\
+    Chunk of `FASTQ` records.
+
+    Sequences and qualities are `uint8` matrices of ASCII codes, one row per
+    read, padded with zeros. Names are concatenated in a `uint8` array,
+    record `i` name being `names[name_offsets[i]:name_offsets[i + 1]]`.
+    """
+
+    sequences: np.ndarray
+    qualities: np.ndarray
+    lengths: np.ndarray
+    names: np.ndarray
+    name_offsets: np.ndarray
+
+    def __init__(
+        self,
+        sequences: np.ndarray,
+        qualities: np.ndarray,
+        lengths: np.ndarray,
+        names: np.ndarray,
+        name_offsets: np.ndarray,
+    ) -> None:
+        """\
+        Constructor of FastqChunk class.
+
+        Parameters
+        ----------
+        sequences
+            Sequences matrix.
+        qualities
+            Qualities matrix.
+        lengths
+            Read lengths.
+        names
+            Concatenated record names, without `@`.
+        name_offsets
+            Offsets of names, one more than the number of records.
+        """
+        self.sequences = sequences
+        self.qualities = qualities
+        self.lengths = lengths
+        self.names = names
+        self.name_offsets = name_offsets
+
+    def __len__(self) -> int:
+        """Returns number of records."""
+        return self.lengths.shape[0]
+
+    def name(self, num: int) -> str:
+        """\
+        Returns a record name.
+
+        Parameters
+        ----------
+        num
+            Record number in the chunk.
+        """
+        start, end = self.name_offsets[num], self.name_offsets[num + 1]
+        return self.names[start:end].tobytes().decode("ascii")
+
+    def read_ids(self) -> Tuple[np.ndarray]:
+        """\
+        Returns read identifiers as a zero-padded matrix and their lengths.
+
+        Identifiers are names up to the first space, without any `/1` or `/2`
+        mate suffix.
+        """
+        starts = self.name_offsets[:-1]
+        lengths = np.diff(self.name_offsets)
+
+        # first space or tab following every name start
+        spaces = np.flatnonzero((self.names == ord(" ")) | (self.names == ord("\t")))
+        following = np.searchsorted(spaces, starts)
+        ends = np.append(spaces, self.names.shape[0])[following]
+        lengths = np.minimum(lengths, ends - starts)
+
+        last = np.maximum(starts + lengths - 1, 0)
+        mate = (
+            (lengths >= 2)
+            & ((self.names[last] == ord("1")) | (self.names[last] == ord("2")))
+            & (self.names[np.maximum(last - 1, 0)] == ord("/"))
+        )
+        lengths = lengths - 2 * mate
+
+        return _gather(self.names, starts, lengths), lengths
+
+
+# pylint: disable=too-few-public-methods
+class FastqReader:
+    """Streaming `FASTQ` reader, plain or `gzip` compressed."""
+
+    path: Path
+    chunk_size: int
+    block_size: int
+
+    def __init__(
+        self, path: str, chunk_size: int = 2**16, block_size: int = 2**22
+    ) -> None:
+        """\
+        Constructor of FastqReader class.
+
+        Raises a `FileNoFoundError` if `FASTQ` file doesn't exist.
+
+        Parameters
+        ----------
+        path
+            Path of the `FASTQ` file.
+        chunk_size
+            Maximum number of records per chunk.
+        block_size
+            Number of bytes read from the file at once.
+        """
+        path = Path(path)
+
+        if not path.exists():
+            raise FileNotFoundError(f"FASTQ file {path} doesn't exist.")
+
+        self.path = path
+        self.chunk_size = chunk_size
+        self.block_size = block_size
+
+    def _open(self):
+        """Returns binary file object."""
+        if self.path.suffix == ".gz":
+            return gzip.open(self.path, "rb")
+        return open(self.path, "rb")
+
+    def __iter__(self) -> Iterator[FastqChunk]:
+        """Yields chunks of at most `chunk_size` records."""
+        n_lines = 4 * self.chunk_size
+        pending = b""
+
+        with self._open() as file_obj:
+
+            eof = False
+
+            while not eof or pending:
+
+                blocks: List[bytes] = [pending]
+                count = pending.count(b"\n")
+
+                while count < n_lines and not eof:
+                    block = file_obj.read(self.block_size)
+                    eof = not block
+                    blocks.append(block)
+                    count += block.count(b"\n")
+
+                data = b"".join(blocks)
+
+                if eof and data and not data.endswith(b"\n"):
+                    data += b"\n"
+
+                chunk, pending = self._parse(data, eof)
+
+                if chunk is not None:
+                    yield chunk
+
+    # pylint: disable=too-many-locals
+    def _parse(self, data: bytes, eof: bool) -> Tuple:
+        """Returns the chunk of records at the beginning of `data` and the
+        remaining bytes."""
+        buffer = np.frombuffer(data, dtype=np.uint8)
+        newlines = np.flatnonzero(buffer == NEWLINE)
+
+        # blank lines ending the file, not the empty lines of last records
+        if eof:
+            n_blank = _trailing_blank_lines(buffer, newlines)
+            n_blank -= (n_blank - newlines.shape[0]) % 4
+            if n_blank > 0:
+                newlines = newlines[: newlines.shape[0] - n_blank]
+
+        n_records = min(newlines.shape[0] // 4, self.chunk_size)
+
+        if eof and n_records == newlines.shape[0] // 4 and newlines.shape[0] % 4:
+            raise ValueError(f"{self.path} is truncated.")
+
+        if n_records == 0:
+            return None, b""
+
+        end = newlines[4 * n_records - 1] + 1
+        newlines = newlines[: 4 * n_records]
+        starts = np.append(0, newlines[:-1] + 1)
+        lengths = newlines - starts
+
+        # carriage returns of Windows line endings
+        lengths -= buffer[np.maximum(newlines - 1, 0)] == ord("\r")
+
+        headers, seqs, pluses, quals = (starts[num::4] for num in range(4))
+
+        if np.any(buffer[headers] != ord("@")) or np.any(buffer[pluses] != ord("+")):
+            raise ValueError(f"{self.path} isn't a valid FASTQ file.")
+
+        seq_lengths = lengths[1::4]
+
+        if np.any(seq_lengths != lengths[3::4]):
+            raise ValueError(f"{self.path} has qualities not matching sequences.")
+
+        names, name_offsets = _concatenate(buffer, headers + 1, lengths[0::4] - 1)
+
+        chunk = FastqChunk(
+            sequences=_gather(buffer, seqs, seq_lengths),
+            qualities=_gather(buffer, quals, seq_lengths),
+            lengths=seq_lengths,
+            names=names,
+            name_offsets=name_offsets,
+        )
+
+        return chunk, data[end:]
+
+
+# pylint: disable=too-many-locals
+def read_fastq_pairs(
+    fastq1: str, fastq2: str, chunk_size: int = 2**16, check_ids: bool = True
+) -> Iterator[Tuple[FastqChunk]]:
+    """\
+    Yields chunks of Read 1 and Read 2 records read in parallel.
+
+    Function raises a `ValueError` if files don't have the same number of
+    records or, when `check_ids` is set, if read identifiers of a pair
+    differ.
+
+    Parameters
+    ----------
+    fastq1
+        Path of the Read 1 `FASTQ` file.
+    fastq2
+        Path of the Read 2 `FASTQ` file.
+    chunk_size
+        Maximum number of records per chunk.
+    check_ids
+        Whether to check read identifiers are in sync.
+    """
+    reader1 = iter(FastqReader(fastq1, chunk_size=chunk_size))
+    reader2 = iter(FastqReader(fastq2, chunk_size=chunk_size))
+
+    n_records = 0
+
+    for chunk1 in reader1:
+
+        chunk2 = next(reader2, None)
+
+        if chunk2 is None or len(chunk1) != len(chunk2):
+            raise ValueError(f"{fastq1} and {fastq2} don't have same record number.")
+
+        if check_ids:
+            ids1, lengths1 = chunk1.read_ids()
+            ids2, lengths2 = chunk2.read_ids()
+            width = min(ids1.shape[1], ids2.shape[1])
+            differ = (lengths1 != lengths2) | np.any(
+                ids1[:, :width] != ids2[:, :width], axis=1
+            )
+            if np.any(differ):
+                num = int(np.argmax(differ))
+                raise ValueError(
+                    f"Record {n_records + num} is {chunk1.name(num)} in {fastq1} "
+                    f"but {chunk2.name(num)} in {fastq2}."
+                )
+
+        n_records += len(chunk1)
+
+        yield chunk1, chunk2
+
+    if next(reader2, None) is not None:
+        raise ValueError(f"{fastq1} and {fastq2} don't have same record number.")
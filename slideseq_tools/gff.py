@@ -2,18 +2,41 @@
 Manages GFF files.
 """
 
+import csv
+import re
 from pathlib import Path
-from typing import Dict
+from typing import Dict, List, Sequence
 
-import re
+import numpy as np
+import pandas as pd
+
+from slideseq_tools.cache import DataFrameCache
+from slideseq_tools.intervals import IntervalIndex
+
+COLUMNS = [
+    "seqname",
+    "source",
+    "feature",
+    "start",
+    "end",
+    "score",
+    "strand",
+    "frame",
+    "attribute",
+]
+
+ATTRIBUTE_REGEX = re.compile(r'^\s*(?P<tag>\S+)\s"(?P<value>\S+)"\s*$')
 
 
 class GFF:
     """GFF file."""
 
     path: str
+    cache: DataFrameCache = None
 
-    def __init__(self, gff_path: str) -> None:
+    def __init__(
+        self, gff_path: str, cache_dir: str = None, cache_size: int = 2**30
+    ) -> None:
         """\
         Constructor of GFF class.
 
@@ -23,6 +46,11 @@ class GFF:
         ----------
         path 
             Path of the `GFF` file.
+        cache_dir
+            Directory where parsed feature tables are cached. Tables are
+            parsed every time if not specified.
+        cache_size
+            Maximum size of the cache directory in bytes.
         """
         path = Path(gff_path)
 
@@ -31,18 +59,19 @@ class GFF:
 
         self.path = path
 
+        if cache_dir is not None:
+            self.cache = DataFrameCache(cache_dir, max_bytes=cache_size)
+
     def parse_attributes(self, attribute_str: str) -> Dict:
         """Returns a dictionary containg attributes."""
         attributes = {}
 
-        regex = re.compile(r'^\s*(?P<tag>\S+)\s"(?P<value>\S+)"\s*$')
-
         for pair in attribute_str.split(";"):
 
             if not pair:
                 continue
 
-            mtch = regex.match(pair)
+            mtch = ATTRIBUTE_REGEX.match(pair)
 
             if mtch:
                 attributes[mtch.group("tag")] = mtch.group("value")
@@ -54,39 +83,157 @@ class GFF:
     def parse_record(self, record_str: str) -> Dict:
         """Returns dictionary containing columns of a record. The method raises a
         `ValueError` if the record cannot be parsed."""
-        colnames = [
-            "seqname",
-            "source",
-            "feature",
-            "start",
-            "end",
-            "score",
-            "strand",
-            "frame",
-            "attribute",
-        ]
-
         cols = record_str.split("\t")
         cols[-1] = self.parse_attributes(cols[-1])
 
-        if len(colnames) != len(cols):
+        if len(COLUMNS) != len(cols):
             raise ValueError(
-                f"Record {record_str} doesn't contain {len(colnames)} columns."
+                f"Record {record_str} doesn't contain {len(COLUMNS)} columns."
             )
 
-        record = dict(list(zip(colnames, cols)))
+        record = dict(list(zip(COLUMNS, cols)))
 
         return record
 
-    def get_features(self, min_length: int = 50) -> Dict:
-        """Returns a list of features (`seqname`, `start`, `end`)."""
-        features = []
+    def read_table(
+        self,
+        features: Sequence[str] = None,
+        min_length: int = 0,
+        attributes: Sequence[str] = ("gene_id",),
+        chunk_size: int = int(1e6),
+    ) -> pd.DataFrame:
+        """\
+        Returns features as a columnar data frame.
+
+        The file is read by chunks of `chunk_size` records, compressed files
+        included, and records are filtered before any attribute is parsed.
+        Only the requested attributes are extracted, as `str` columns named
+        after the attribute key (missing attributes are `NaN`). Tables are
+        loaded from the cache if a cache directory has been specified and the
+        file hasn't changed since.
 
-        with open(self.path, "r", encoding="utf-8") as file_obj:
-            for line in file_obj:
-                rec = self.parse_record(line.rstrip())
-                if (int(rec["end"]) - int(rec["end"]) + 1) < min_length:
-                    feature = (rec["seqname"], int(rec["start"]), int(rec["end"]))
-                    features.append(feature)
+        Columns are `seqname` (categorical), `start` and `end` (`int32`),
+        `feature` (categorical), `strand` (categorical) and one column per
+        attribute.
 
-        return features
+        Parameters
+        ----------
+        features
+            Feature types to keep, for example `["exon"]`. All types are kept
+            if not specified.
+        min_length
+            Minimum feature length, bounds included.
+        attributes
+            Attribute keys to extract.
+        chunk_size
+            Number of records parsed at once.
+        """
+        if self.cache is None:
+            return self._parse_table(features, min_length, attributes, chunk_size)
+
+        key = DataFrameCache.key(
+            self.path,
+            features=None if features is None else sorted(features),
+            min_length=min_length,
+            attributes=list(attributes),
+        )
+
+        dframe = self.cache.load(key)
+
+        if dframe is None:
+            dframe = self._parse_table(features, min_length, attributes, chunk_size)
+            self.cache.save(key, dframe)
+
+        return dframe
+
+    def _parse_table(
+        self,
+        features: Sequence[str],
+        min_length: int,
+        attributes: Sequence[str],
+        chunk_size: int,
+    ) -> pd.DataFrame:
+        """Parses features as a columnar data frame, see `read_table`."""
+        reader = pd.read_csv(
+            self.path,
+            sep="\t",
+            header=None,
+            names=COLUMNS,
+            usecols=["seqname", "feature", "start", "end", "strand", "attribute"],
+            dtype={
+                "seqname": str,
+                "feature": str,
+                "start": np.float64,
+                "end": np.float64,
+                "strand": str,
+                "attribute": str,
+            },
+            quoting=csv.QUOTE_NONE,
+            compression="infer",
+            chunksize=chunk_size,
+        )
+
+        chunks = []
+
+        for chunk in reader:
+
+            # comment and directive lines don't have coordinates
+            chunk = chunk[chunk["start"].notna() & chunk["end"].notna()]
+
+            keep = (chunk["end"] - chunk["start"] + 1) >= min_length
+            if features is not None:
+                keep &= chunk["feature"].isin(features)
+            chunk = chunk[keep]
+
+            values = {}
+            for key in attributes:
+                regex = rf'(?:^|;)\s*{re.escape(key)}[\s=]"?([^";]*)"?'
+                values[key] = chunk["attribute"].str.extract(regex, expand=False)
+
+            chunks.append(chunk.drop(columns="attribute").assign(**values))
+
+        if chunks:
+            dframe = pd.concat(chunks, ignore_index=True)
+        else:
+            columns = ["seqname", "feature", "start", "end", "strand", *attributes]
+            dframe = pd.DataFrame(columns=columns)
+
+        dframe = dframe.astype(
+            {
+                "seqname": "category",
+                "feature": "category",
+                "start": np.int32,
+                "end": np.int32,
+                "strand": "category",
+            }
+        )
+
+        columns = ["seqname", "start", "end", "feature", "strand", *attributes]
+
+        return dframe[columns]
+
+    def interval_index(self, **kwargs) -> IntervalIndex:
+        """\
+        Returns an interval index over features. Query results are row
+        positions in the table returned by `read_table` with the same
+        arguments.
+
+        Parameters
+        ----------
+        kwargs
+            Arguments passed to `read_table`.
+        """
+        return IntervalIndex.from_table(self.read_table(**kwargs))
+
+    def get_features(self, min_length: int = 50) -> List:
+        """Returns a list of features (`seqname`, `start`, `end`) at least
+        `min_length` long."""
+        dframe = self.read_table(min_length=min_length, attributes=())
+
+        return list(
+            zip(
+                dframe["seqname"].astype(str).tolist(),
+                dframe["start"].tolist(),
+                dframe["end"].tolist(),
+            )
+        )
@@ -0,0 +1,202 @@
+"""
+Interval index over genomic features.
+"""
+
+from typing import Dict, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+class IntervalIndex:
+    """\
+    Index answering which features overlap positions or ranges.
+
+    Features are grouped by `seqname` and by length class (powers of 2).
+    Each group stores start positions sorted along with the running maximum
+    of end positions, so candidates of a query are found with two binary
+    searches and long features don't make every query scan the whole
+    sequence.
+
+    Coordinates are inclusive on both ends, as in `GFF` files.
+    """
+
+    n_features: int
+    groups: Dict
+
+    def __init__(self, seqnames, starts, ends) -> None:
+        """\
+        Constructor of IntervalIndex class.
+
+        Raises a `ValueError` if arrays don't have the same length or if a
+        feature ends before it starts.
+
+        Parameters
+        ----------
+        seqnames
+            Sequence names of features.
+        starts
+            Start positions of features.
+        ends
+            End positions of features.
+        """
+        seqnames = np.asarray(seqnames)
+        starts = np.asarray(starts, dtype=np.int64)
+        ends = np.asarray(ends, dtype=np.int64)
+
+        if not seqnames.shape[0] == starts.shape[0] == ends.shape[0]:
+            raise ValueError("seqnames, starts and ends don't have same length.")
+
+        if np.any(ends < starts):
+            raise ValueError("Some features end before they start.")
+
+        self.n_features = starts.shape[0]
+        self.groups = {}
+
+        classes = np.floor(np.log2(ends - starts + 1)).astype(np.int64)
+        codes, names = pd.factorize(seqnames)
+
+        for code, name in enumerate(names):
+
+            groups = []
+
+            for length_class in np.unique(classes[codes == code]):
+
+                indexes = np.flatnonzero((codes == code) & (classes == length_class))
+                order = indexes[np.argsort(starts[indexes], kind="stable")]
+
+                groups.append(
+                    (
+                        order,
+                        starts[order],
+                        ends[order],
+                        np.maximum.accumulate(ends[order]),
+                    )
+                )
+
+            self.groups[name] = groups
+
+    @classmethod
+    def from_table(cls, dframe: pd.DataFrame) -> "IntervalIndex":
+        """\
+        Returns an index built from a data frame with `seqname`, `start` and
+        `end` columns, such as returned by `GFF.read_table`. Query results are
+        row positions in the data frame.
+
+        Parameters
+        ----------
+        dframe
+            Features data frame.
+        """
+        return cls(
+            dframe["seqname"].astype(str).to_numpy(),
+            dframe["start"].to_numpy(),
+            dframe["end"].to_numpy(),
+        )
+
+    def query(self, seqname: str, start: int, end: int = None) -> np.ndarray:
+        """\
+        Returns sorted indexes of features overlapping a position or a range.
+
+        Parameters
+        ----------
+        seqname
+            Sequence name.
+        start
+            Position or range start.
+        end
+            Range end, the query is a position if not specified.
+        """
+        _, indexes = self.query_batch(
+            [seqname], [start], None if end is None else [end]
+        )
+        return indexes
+
+    def query_batch(self, seqnames, starts, ends=None) -> Tuple[np.ndarray]:
+        """\
+        Returns features overlapping a batch of positions or ranges as a
+        compressed sparse row structure (`offsets`, `indexes`).
+
+        Features overlapping query `i` are
+        `indexes[offsets[i]:offsets[i + 1]]`, sorted.
+
+        Parameters
+        ----------
+        seqnames
+            Sequence names of queries.
+        starts
+            Positions or range starts.
+        ends
+            Range ends, queries are positions if not specified.
+        """
+        seqnames = np.asarray(seqnames)
+        starts = np.asarray(starts, dtype=np.int64)
+        ends = starts if ends is None else np.asarray(ends, dtype=np.int64)
+
+        n_queries = starts.shape[0]
+        hit_queries = [np.empty(0, dtype=np.int64)]
+        hit_features = [np.empty(0, dtype=np.int64)]
+
+        codes, names = pd.factorize(seqnames)
+
+        for code, name in enumerate(names):
+
+            queries = np.flatnonzero(codes == code)
+
+            for group in self.groups.get(name, []):
+                query_hits, feature_hits = self._overlaps(
+                    group, starts[queries], ends[queries]
+                )
+                hit_queries.append(queries[query_hits])
+                hit_features.append(feature_hits)
+
+        return self._to_csr(
+            np.concatenate(hit_queries), np.concatenate(hit_features), n_queries
+        )
+
+    def count_batch(self, seqnames, starts, ends=None) -> np.ndarray:
+        """\
+        Returns the number of features overlapping each query.
+
+        Parameters
+        ----------
+        seqnames
+            Sequence names of queries.
+        starts
+            Positions or range starts.
+        ends
+            Range ends, queries are positions if not specified.
+        """
+        offsets, _ = self.query_batch(seqnames, starts, ends)
+        return np.diff(offsets)
+
+    @staticmethod
+    def _to_csr(
+        hit_queries: np.ndarray, hit_features: np.ndarray, n_queries: int
+    ) -> Tuple[np.ndarray]:
+        """Returns (query, feature) pairs as (`offsets`, sorted `indexes`)."""
+        order = np.lexsort((hit_features, hit_queries))
+        offsets = np.zeros(n_queries + 1, dtype=np.int64)
+        np.cumsum(np.bincount(hit_queries, minlength=n_queries), out=offsets[1:])
+
+        return offsets, hit_features[order]
+
+    @classmethod
+    def _overlaps(cls, group: Tuple, starts: np.ndarray, ends: np.ndarray) -> Tuple:
+        """Returns (query, feature) pairs overlapping within a group."""
+        order, feature_starts, feature_ends, max_ends = group
+
+        # candidates start before query end and follow the first feature
+        # whose running maximum end reaches query start
+        low = np.searchsorted(max_ends, starts, side="left")
+        high = np.searchsorted(feature_starts, ends, side="right")
+        counts = np.maximum(high - low, 0)
+
+        # candidates of each query run from low to high
+        queries = np.repeat(np.arange(starts.shape[0]), counts)
+        shifts = np.cumsum(counts) - counts - low
+        candidates = np.arange(int(counts.sum())) - np.repeat(shifts, counts)
+
+        overlap = feature_ends[candidates] >= starts[queries]
+
+        return queries[overlap], order[candidates[overlap]]
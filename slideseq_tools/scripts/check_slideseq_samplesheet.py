@@ -5,23 +5,92 @@ Checks Slide-seq sample sheet and new columns for downstream processing.
 # coding: utf-8
 
 import click
+import pandas as pd
 
 from slideseq_tools.config.samplesheet import SampleSheet
+from slideseq_tools.config.sharding import plan_shards
+from slideseq_tools.config.validation import N_SAMPLED, validate_samplesheet
+from slideseq_tools.config.validation_cache import ValidationCache
 
 # pylint: disable=no-value-for-parameter
+# pylint: disable=too-many-arguments
+# pylint: disable=too-many-locals
 @click.command()
 @click.option("--launch-dir", default="./", help="nextflow launch directory")
+@click.option("--deep", is_flag=True, help="check FASTQ and puck file contents")
+@click.option("--workers", default=4, help="number of threads checking files")
+@click.option("--report", default=None, help="CSV report of deep checks")
+@click.option("--cache", default=None, help="JSON cache of validations")
+@click.option("--shards-manifest", default=None, help="CSV manifest of shards")
+@click.option("--target-reads", default=int(5e7), help="number of reads per shard")
 @click.argument("in_samplesheet")
 @click.argument("out_samplesheet")
-def main(launch_dir, in_samplesheet, out_samplesheet):
+def main(
+    launch_dir,
+    deep,
+    workers,
+    report,
+    cache,
+    shards_manifest,
+    target_reads,
+    in_samplesheet,
+    out_samplesheet,
+):
     """
     Opens the sample sheet as `CSV`, checks it and add required columns for
     downstream processing. Finally, save the new sample sheet as `CSV`.
+
+    With `--deep`, FASTQ files are fully decompressed, Read 1 and Read 2
+    record counts compared, Read 1 lengths sampled and puck files parsed,
+    all files at once.
+
+    With `--cache`, rows and files which didn't change since they were
+    validated aren't validated again.
+
+    With `--shards-manifest`, FASTQ pairs of every sample are split or
+    grouped in shards of about `--target-reads` reads, from record counts
+    of deep checks or estimated ones.
     """
+    cache = None if cache is None else ValidationCache(cache)
+
     samplesheet = SampleSheet(in_samplesheet, launch_dir)
-    samplesheet.create_samplesheet()
+    samplesheet.create_samplesheet(cache=cache)
+
+    if deep:
+        dframe = samplesheet.dframe
+        params = {"n_sampled": N_SAMPLED}
+        paths = pd.unique(dframe[["fastq_1", "fastq_2", "puck"]].values.ravel())
+
+        file_checks = {} if cache is None else cache.file_checks(paths, params)
+        checks = validate_samplesheet(dframe, workers=workers, checks=file_checks)
+
+        if cache is not None:
+            cache.set_file_checks(file_checks, params)
+
+        if report is not None:
+            checks.to_csv(report, index=False)
+
+    if cache is not None:
+        cache.save()
+
+    if deep:
+        failed = checks[checks["status"] == "error"]
+        if failed.shape[0] > 0:
+            raise click.ClickException("\n".join(failed["message"]))
+
     samplesheet.save(out_samplesheet)
 
+    if shards_manifest is not None:
+        counts = {}
+        if deep:
+            fastqs = checks[(checks["kind"] == "fastq_1") & checks["n_records"].notna()]
+            counts = dict(zip(fastqs["path"], fastqs["n_records"].astype(int)))
+
+        manifest = plan_shards(
+            samplesheet.dframe, target_reads, counts=counts, workers=workers
+        )
+        manifest.to_csv(shards_manifest, index=False)
+
 
 if __name__ == "__main__":
     main()
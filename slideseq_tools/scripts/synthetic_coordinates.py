@@ -1,25 +1,47 @@
 """
-Creates puck bead coordinates from a TIFF image.
+Creates puck bead coordinates from a TIFF image, or procedurally.
 """
 
 # coding: utf-8
 
 import click
 
-from slideseq_tools.synthetic_data.spatial import Puck
+from slideseq_tools.synthetic_data.spatial import LAYOUTS, Puck
 
 # pylint: disable=no-value-for-parameter
+# pylint: disable=too-many-arguments
 @click.command()
 @click.option("--n-beads", default=int(8 * 1e4), help="number of beads")
+@click.option("--seed", default=None, type=int, help="random seed")
+@click.option(
+    "--layout",
+    default="image",
+    type=click.Choice(["image"] + LAYOUTS),
+    help="bead layout, sampled from the image or procedural",
+)
+@click.option("--diameter", default=1000.0, help="puck diameter of procedural layouts")
+@click.option("--gradient", default=0.0, help="density gradient along x, -1 to 1")
 @click.argument("tiff_path")
 @click.argument("csv_path")
-def main(n_beads, tiff_path, csv_path):
+def main(n_beads, seed, layout, diameter, gradient, tiff_path, csv_path):
     """
     Opens TIFF image and creates coordinates, then subsamples beads and
-    saves coordinates in a `CSV` file.
+    saves coordinates in a `CSV` file. Procedural layouts use the image as
+    a mask, TIFF_PATH being `-` for none.
     """
-    dframe = Puck.coordinates(tiff_path)
-    dframe = dframe.sample(min(dframe.shape[0], n_beads))
+    if layout == "image":
+        if tiff_path == "-":
+            raise click.BadParameter("image layout needs a TIFF image.")
+        dframe = Puck.sample_coordinates(tiff_path, n_beads, rng=seed)
+    else:
+        dframe = Puck.layout(
+            n_beads,
+            diameter=diameter,
+            method=layout,
+            mask_path=None if tiff_path == "-" else tiff_path,
+            gradient=gradient,
+            rng=seed,
+        )
     dframe.to_csv(csv_path, header=False, index=False, float_format="%.15f")
 
 
@@ -7,29 +7,127 @@ Creates synthetic Slide-seq data.
 import os
 import sys
 import logging
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 import click
 import pandas as pd
 
 from slideseq_tools.synthetic_data.slideseq import SlideSeq
+from slideseq_tools.synthetic_data.spatial import LAYOUTS
+from slideseq_tools.utils.rng import substream
+
+# Slide-seq state of the process, set by init_worker in pool workers
+SLIDESEQ = None
+PUCKS = {}
+
+
+def init_worker(slideseq, pucks: dict) -> None:
+    """\
+    Sets the Slide-seq state read by `generate_file`. Pool initializer, so
+    workers get the state whether they're forked or spawned.
+
+    Parameters
+    ----------
+    slideseq
+        `SlideSeq` object, genome sequences loaded.
+    pucks
+        Tuples (`puck`, `barcodes`) by sample number.
+    """
+    # pylint: disable=global-statement
+    global SLIDESEQ, PUCKS
+    SLIDESEQ = slideseq
+    PUCKS = pucks
+
+
+def generate_file(task) -> tuple:
+    """\
+    Generates the `FASTQ` files of a `(sample, file)` pair and returns their
+    paths. Reads the Slide-seq state set by `init_worker`.
+
+    Parameters
+    ----------
+    task
+        Tuple (`sample_num`, `file_num`, `prefix`, `path_prefix`, `n_reads`,
+        `chunk_size`, `threads`, `level`).
+    """
+    sample_num, file_num, prefix, path_prefix, n_reads, chunk_size = task[:6]
+    threads, level = task[6:]
+
+    SLIDESEQ.puck, SLIDESEQ.barcodes = PUCKS[sample_num]
+
+    logging.info("Creating %s", path_prefix)
+
+    # reads only depend on the seed, sample, file and chunk numbers
+    chunks = SLIDESEQ.stream_fastq(
+        prefix=prefix,
+        n_reads=n_reads,
+        chunk_size=chunk_size,
+        keys=(sample_num, file_num),
+    )
+
+    return SlideSeq.write_fastq_stream(
+        chunks=chunks,
+        path_prefix=path_prefix,
+        threads=threads,
+        level=level,
+    )
+
 
 # pylint: disable=no-value-for-parameter
 # pylint: disable=too-many-arguments
 # pylint: disable=too-many-locals
+# pylint: disable=too-many-branches
+# pylint: disable=too-many-statements
 @click.command()
 @click.option("--n-samples", default=2, help="number of samples")
 @click.option("--n-files", default=5, help="number of files per sample")
 @click.option("--n-reads", default=int(2 * 1e4), help="number of reads per file")
 @click.option("--read-structure", default="8C18U6C2X9M", help="read 1 structure")
 @click.option("--out-dir", default="data", help="number of reads per file")
+@click.option("--cache-dir", default=None, help="parsed annotation cache directory")
+@click.option("--threads", default=1, help="compression threads per file")
+@click.option("--compression-level", default=6, help="compression level")
+@click.option("--chunk-size", default=2**18, help="number of reads per chunk")
+@click.option("--workers", default=1, help="number of processes generating files")
+@click.option("--seed", default=None, type=int, help="random seed")
+@click.option(
+    "--layout",
+    default="image",
+    type=click.Choice(["image"] + LAYOUTS),
+    help="bead layout, sampled from the image or procedural",
+)
+@click.option("--diameter", default=1000.0, help="puck diameter of procedural layouts")
+@click.option("--gradient", default=0.0, help="density gradient along x, -1 to 1")
 @click.argument("tiff_path")
 @click.argument("genome_path")
-def main(n_samples, n_files, n_reads, read_structure, out_dir, tiff_path, genome_path):
+def main(
+    n_samples,
+    n_files,
+    n_reads,
+    read_structure,
+    out_dir,
+    cache_dir,
+    threads,
+    compression_level,
+    chunk_size,
+    workers,
+    seed,
+    layout,
+    diameter,
+    gradient,
+    tiff_path,
+    genome_path,
+):
     """
-    Create synthetic Slide-seq data.
+    Create synthetic Slide-seq data. TIFF_PATH is the beads image, or the
+    mask of procedural layouts, `-` for none.
     """
     # tiff file
-    if not os.path.exists(tiff_path):
+    if tiff_path == "-":
+        tiff_path = None
+        if layout == "image":
+            raise click.BadParameter("image layout needs a TIFF image.")
+    elif not os.path.exists(tiff_path):
         raise FileNotFoundError(f"{tiff_path} doesn't exist.")
 
     # genome
@@ -53,39 +151,55 @@ def main(n_samples, n_files, n_reads, read_structure, out_dir, tiff_path, genome
         except OSError as _:
             pass
 
-    slideseq = SlideSeq(tiff_path=tiff_path, gff_path=gff_path, fasta_path=fasta_path)
+    slideseq = SlideSeq(
+        tiff_path=tiff_path,
+        gff_path=gff_path,
+        fasta_path=fasta_path,
+        cache_dir=cache_dir,
+        seed=seed,
+        layout=layout,
+        diameter=diameter,
+        gradient=gradient,
+    )
 
     logging.basicConfig(level=logging.DEBUG, stream=sys.stdout)
 
+    slideseq.seq.load_sequences()
+
+    pucks = {}
     rows = []
+    tasks = []
 
     for sample_num in range(1, n_samples + 1):
 
         sample = f"sample{sample_num}"
 
         # puck
-        slideseq.generate_puck()
+        slideseq.generate_puck(rng=substream(seed, sample_num))
         puck_path = str(out_dir / f"{sample}.csv")
         slideseq.save_coordinates(puck_path)
+        pucks[sample_num] = (slideseq.puck, slideseq.barcodes)
 
         # reads
         for file_num in range(1, n_files + 1):
 
             prefix = f"{sample}-file{file_num}"
             path_prefix = str(out_dir / f"{sample}_L{file_num:03d}")
-
-            logging.info("Creating %s", path_prefix)
-
-            reads1, reads2 = slideseq.generate_reads(prefix=prefix, n_reads=n_reads)
-
-            fastq1, fastq2 = SlideSeq.write_fastq(
-                reads1=reads1, reads2=reads2, path_prefix=path_prefix
+            tasks.append(
+                (
+                    sample_num,
+                    file_num,
+                    prefix,
+                    path_prefix,
+                    n_reads,
+                    chunk_size,
+                    threads,
+                    compression_level,
+                )
             )
 
             row = {
                 "sample": sample,
-                "fastq_1": fastq1,
-                "fastq_2": fastq2,
                 "puck": puck_path,
                 "read_structure": read_structure,
                 "genome": genome_path.name,
@@ -93,7 +207,22 @@ def main(n_samples, n_files, n_reads, read_structure, out_dir, tiff_path, genome
 
             rows.append(row)
 
-    samplesheet = pd.DataFrame.from_records(rows)
+    # files are generated in any order, rows keep the task order
+    if workers > 1:
+        with ProcessPoolExecutor(
+            workers, initializer=init_worker, initargs=(slideseq, pucks)
+        ) as executor:
+            paths = list(executor.map(generate_file, tasks))
+    else:
+        init_worker(slideseq, pucks)
+        paths = [generate_file(task) for task in tasks]
+
+    for row, (fastq1, fastq2) in zip(rows, paths):
+        row["fastq_1"] = fastq1
+        row["fastq_2"] = fastq2
+
+    columns = ["sample", "fastq_1", "fastq_2", "puck", "read_structure", "genome"]
+    samplesheet = pd.DataFrame.from_records(rows, columns=columns)
     samplesheet.to_csv(out_dir / "samplesheet.csv", index=False)
 
 
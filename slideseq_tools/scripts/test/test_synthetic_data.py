@@ -0,0 +1,132 @@
+"""
+Testing module for the slideseq_tools.scripts.synthetic_data module.
+"""
+
+import gzip
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pytest
+from click.testing import CliRunner
+
+from .. import synthetic_data
+from ...synthetic_data.slideseq import SlideSeq
+
+
+@pytest.fixture(name="genome_path")
+def fixture_genome_path(tmp_path):
+    """Small genome directory laid out like iGenomes."""
+    genome_path = tmp_path / "genome"
+    gff_path = genome_path / "Annotation/Genes/genes.gtf"
+    fasta_path = genome_path / "Sequence/WholeGenomeFasta/genome.fa"
+    gff_path.parent.mkdir(parents=True)
+    fasta_path.parent.mkdir(parents=True)
+
+    gff_path.write_text(
+        'chr\tena\texon\t1\t100\t.\t+\t.\tgene_id "g1";\n'
+        'chr\tena\texon\t150\t400\t.\t-\t.\tgene_id "g2";\n',
+        encoding="utf-8",
+    )
+    rng = np.random.default_rng(0)
+    sequence = "".join(rng.choice(list("acgt"), size=420))
+    fasta_path.write_text(f">chr\n{sequence}\n", encoding="utf-8")
+
+    return genome_path
+
+
+@pytest.fixture(name="state")
+def fixture_state(genome_path):
+    """Slide-seq object and puck of a sample, as set in workers."""
+    slideseq = SlideSeq(
+        tiff_path=None,
+        gff_path=genome_path / "Annotation/Genes/genes.gtf",
+        fasta_path=genome_path / "Sequence/WholeGenomeFasta/genome.fa",
+        n_beads=200,
+        seed=3,
+        layout="jittered",
+    )
+    slideseq.seq.load_sequences()
+    slideseq.generate_puck(rng=1)
+    return slideseq, {1: (slideseq.puck, slideseq.barcodes)}
+
+
+def _run(genome_path, out_dir, workers):
+    """Runs the script and returns its sample sheet and decompressed files."""
+    result = CliRunner().invoke(
+        synthetic_data.main,
+        [
+            "--n-samples=2",
+            "--n-files=3",
+            "--n-reads=500",
+            "--chunk-size=128",
+            "--seed=7",
+            "--layout=jittered",
+            f"--workers={workers}",
+            f"--out-dir={out_dir}",
+            "-",
+            str(genome_path),
+        ],
+    )
+    assert result.exit_code == 0, result.output
+
+    samplesheet = pd.read_csv(out_dir / "samplesheet.csv")
+    contents = {}
+
+    for path in samplesheet[["fastq_1", "fastq_2"]].to_numpy().ravel():
+        with gzip.open(path, "rb") as file_obj:
+            contents[str(path).replace(str(out_dir), "")] = file_obj.read()
+
+    for path in samplesheet["puck"].unique():
+        with open(path, "rb") as file_obj:
+            contents[str(path).replace(str(out_dir), "")] = file_obj.read()
+
+    for column in ["fastq_1", "fastq_2", "puck"]:
+        samplesheet[column] = samplesheet[column].str.replace(str(out_dir), "")
+
+    return samplesheet, contents
+
+
+class TestSyntheticData:
+    """The test class associated with the synthetic_data script."""
+
+    def test_workers_same_output(self, genome_path, tmp_path):
+        """Tests if files and sample sheet rows don't depend on workers."""
+        samplesheet1, contents1 = _run(genome_path, tmp_path / "serial", 1)
+        samplesheet2, contents2 = _run(genome_path, tmp_path / "pool", 2)
+
+        pd.testing.assert_frame_equal(samplesheet1, samplesheet2)
+        assert contents1 == contents2
+
+        # rows follow samples and files
+        assert samplesheet1["fastq_1"].tolist() == [
+            f"/sample{sample}_L{file:03d}.R1.fastq.gz"
+            for sample in [1, 2]
+            for file in [1, 2, 3]
+        ]
+
+    def test_generate_file_spawned(self, state, tmp_path):
+        """Tests if spawned workers, which pickle the state, write same files."""
+        tasks = [
+            (1, num, f"file{num}", str(tmp_path / f"{name}{num}"), 300, 64, 1, 6)
+            for name in ["serial", "spawn"]
+            for num in [1, 2]
+        ]
+
+        synthetic_data.init_worker(*state)
+        serial = [synthetic_data.generate_file(task) for task in tasks[:2]]
+
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(
+            2,
+            mp_context=context,
+            initializer=synthetic_data.init_worker,
+            initargs=state,
+        ) as executor:
+            spawned = list(executor.map(synthetic_data.generate_file, tasks[2:]))
+
+        for paths1, paths2 in zip(serial, spawned):
+            for path1, path2 in zip(paths1, paths2):
+                with gzip.open(path1, "rb") as file1, gzip.open(path2, "rb") as file2:
+                    assert file1.read() == file2.read()
@@ -0,0 +1,287 @@
+"""
+Spatial index over puck bead coordinates.
+"""
+
+from typing import Tuple
+
+import numpy as np
+import pandas as pd
+
+from slideseq_tools.barcode import read_puck
+
+# smallest side of grid cells, beads may all be at the same position
+MIN_CELL_SIZE = 1e-6
+
+
+# pylint: disable=too-many-instance-attributes
+class SpatialIndex:
+    """\
+    Uniform grid index answering which beads are near positions.
+
+    Beads are bucketed in square cells and sorted by cell, so the beads of a
+    cell are a contiguous slice found with an offset table. A query only
+    visits the cells its radius overlaps, there is no all-vs-all comparison.
+
+    Query results are bead positions in the coordinate arrays.
+    """
+
+    n_points: int
+    cell_size: float
+
+    def __init__(self, x, y, cell_size: float = None) -> None:
+        """\
+        Constructor of SpatialIndex class.
+
+        Raises a `ValueError` if arrays don't have the same length or if
+        `cell_size` isn't positive.
+
+        Parameters
+        ----------
+        x
+            Bead x coordinates.
+        y
+            Bead y coordinates.
+        cell_size
+            Side of grid cells. Defaults to a size holding about 2 beads per
+            cell on average, at least `MIN_CELL_SIZE`.
+        """
+        self.x = np.asarray(x, dtype=np.float64)
+        self.y = np.asarray(y, dtype=np.float64)
+
+        if self.x.shape[0] != self.y.shape[0]:
+            raise ValueError("x and y don't have same length.")
+
+        self.n_points = self.x.shape[0]
+        self.origin = (self.x.min(), self.y.min()) if self.n_points else (0.0, 0.0)
+
+        width = float(self.x.max() - self.origin[0]) if self.n_points else 0.0
+        height = float(self.y.max() - self.origin[1]) if self.n_points else 0.0
+
+        if cell_size is None:
+            area = max(width, 1.0) * max(height, 1.0)
+            cell_size = max(np.sqrt(2 * area / max(self.n_points, 1)), MIN_CELL_SIZE)
+        elif not cell_size > 0:
+            raise ValueError(f"Cell size must be positive, not {cell_size}.")
+
+        self.cell_size = float(cell_size)
+        self.shape = (
+            int(height // self.cell_size) + 1,
+            int(width // self.cell_size) + 1,
+        )
+
+        rows, cols = self._cells(self.x, self.y)
+        cells = rows * self.shape[1] + cols
+
+        self.order = np.argsort(cells, kind="stable")
+        self.offsets = np.searchsorted(
+            cells[self.order], np.arange(self.shape[0] * self.shape[1] + 1)
+        )
+
+    @classmethod
+    def from_table(cls, dframe: pd.DataFrame, cell_size: float = None):
+        """\
+        Returns an index built from a data frame with `x` and `y` columns.
+        Query results are row positions in the data frame.
+
+        Parameters
+        ----------
+        dframe
+            Coordinates data frame.
+        cell_size
+            Side of grid cells.
+        """
+        return cls(dframe["x"].to_numpy(), dframe["y"].to_numpy(), cell_size)
+
+    @classmethod
+    def from_puck(cls, path: str, cell_size: float = None) -> "SpatialIndex":
+        """\
+        Returns an index over the beads of a puck `CSV` file. Query results
+        are row positions in the file.
+
+        Parameters
+        ----------
+        path
+            Path of the puck `CSV` file.
+        cell_size
+            Side of grid cells.
+        """
+        return cls.from_table(read_puck(path), cell_size)
+
+    def _cells(self, x: np.ndarray, y: np.ndarray) -> Tuple[np.ndarray]:
+        """Returns grid rows and columns of positions, outside ones clipped."""
+        rows = np.floor((y - self.origin[1]) / self.cell_size)
+        cols = np.floor((x - self.origin[0]) / self.cell_size)
+        rows = np.clip(rows, -1, self.shape[0]).astype(np.int64)
+        cols = np.clip(cols, -1, self.shape[1]).astype(np.int64)
+        return rows, cols
+
+    # pylint: disable=too-many-locals
+    def radius_batch(self, x, y, radius: float) -> Tuple[np.ndarray]:
+        """\
+        Returns beads within a radius of a batch of positions as a compressed
+        sparse row structure (`offsets`, `indexes`, `distances`).
+
+        Beads near query `i` are `indexes[offsets[i]:offsets[i + 1]]`,
+        sorted.
+
+        Parameters
+        ----------
+        x
+            Query x coordinates.
+        y
+            Query y coordinates.
+        radius
+            Maximum Euclidean distance, inclusive.
+        """
+        x = np.asarray(x, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        n_queries = x.shape[0]
+
+        rows, cols = self._cells(x, y)
+        reach = int(np.ceil(radius / self.cell_size))
+
+        hit_queries = [np.empty(0, dtype=np.int64)]
+        hit_points = [np.empty(0, dtype=np.int64)]
+
+        # shifts reaching cells of the grid from at least one query
+        row_shifts = range(
+            max(-reach, -int(rows.max(initial=0))),
+            min(reach, self.shape[0] - 1 - int(rows.min(initial=0))) + 1,
+        )
+        col_shifts = range(
+            max(-reach, -int(cols.max(initial=0))),
+            min(reach, self.shape[1] - 1 - int(cols.min(initial=0))) + 1,
+        )
+
+        for row_shift in row_shifts:
+            for col_shift in col_shifts:
+
+                cell_rows = rows + row_shift
+                cell_cols = cols + col_shift
+                inside = (
+                    (cell_rows >= 0)
+                    & (cell_rows < self.shape[0])
+                    & (cell_cols >= 0)
+                    & (cell_cols < self.shape[1])
+                )
+                queries = np.flatnonzero(inside)
+                cells = cell_rows[queries] * self.shape[1] + cell_cols[queries]
+
+                low = self.offsets[cells]
+                counts = self.offsets[cells + 1] - low
+
+                first = np.cumsum(counts) - counts
+                candidates = np.arange(counts.sum()) - np.repeat(first - low, counts)
+
+                hit_queries.append(np.repeat(queries, counts))
+                hit_points.append(self.order[candidates])
+
+        hit_queries = np.concatenate(hit_queries)
+        hit_points = np.concatenate(hit_points)
+
+        distances = np.hypot(
+            self.x[hit_points] - x[hit_queries], self.y[hit_points] - y[hit_queries]
+        )
+        within = distances <= radius
+        hit_queries = hit_queries[within]
+
+        order = np.argsort(hit_queries * self.n_points + hit_points[within])
+        offsets = np.zeros(n_queries + 1, dtype=np.int64)
+        np.cumsum(np.bincount(hit_queries, minlength=n_queries), out=offsets[1:])
+
+        return offsets, hit_points[within][order], distances[within][order]
+
+    def knn_batch(self, x, y, k: int) -> Tuple[np.ndarray]:
+        """\
+        Returns the `k` nearest beads of a batch of positions as matrices
+        (`indexes`, `distances`), one row per query sorted by distance.
+
+        Queries are radius queries whose radius doubles until they find `k`
+        beads, all beads within the radius being found the `k` nearest are
+        exact. There are fewer columns if there are fewer beads.
+
+        Parameters
+        ----------
+        x
+            Query x coordinates.
+        y
+            Query y coordinates.
+        k
+            Number of neighbours.
+        """
+        x = np.asarray(x, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        k = min(k, self.n_points)
+
+        indexes = np.zeros((x.shape[0], k), dtype=np.int64)
+        distances = np.zeros((x.shape[0], k), dtype=np.float64)
+
+        # cells hold 2 beads on average, the first radius holds about 1.5 k
+        radius = self.cell_size * np.sqrt(0.25 * k)
+        pending = np.arange(x.shape[0])
+
+        while pending.shape[0] and k > 0:
+
+            offsets, hits, hit_distances = self.radius_batch(
+                x[pending], y[pending], radius
+            )
+            counts = np.diff(offsets)
+            done = counts >= k
+
+            hit_queries = np.repeat(np.arange(pending.shape[0]), counts)
+            order = np.lexsort((hits, hit_distances, hit_queries))
+            ranks = np.arange(hits.shape[0]) - np.repeat(offsets[:-1], counts)
+
+            keep = (ranks < k) & done[hit_queries][order]
+            rows = pending[hit_queries[order][keep]]
+            indexes[rows, ranks[keep]] = hits[order][keep]
+            distances[rows, ranks[keep]] = hit_distances[order][keep]
+
+            pending = pending[~done]
+            radius *= 2
+
+        return indexes, distances
+
+    def neighbour_graph(self, radius: float = None, k: int = None) -> Tuple:
+        """\
+        Returns the bead neighbour graph as a compressed sparse row structure
+        (`offsets`, `indexes`, `distances`), beads being neighbours of bead
+        `i` are `indexes[offsets[i]:offsets[i + 1]]`.
+
+        Neighbours are the beads within `radius`, or the `k` nearest ones if
+        `k` is specified. A bead isn't its own neighbour.
+
+        Raises a `ValueError` if neither or both `radius` and `k` are
+        specified.
+
+        Parameters
+        ----------
+        radius
+            Maximum Euclidean distance of neighbours.
+        k
+            Number of neighbours.
+        """
+        if (radius is None) == (k is None):
+            raise ValueError("Either radius or k must be specified.")
+
+        points = np.arange(self.n_points)
+
+        if k is None:
+            offsets, indexes, distances = self.radius_batch(self.x, self.y, radius)
+            queries = np.repeat(points, np.diff(offsets))
+        else:
+            indexes, distances = self.knn_batch(self.x, self.y, k + 1)
+            queries = np.repeat(points, indexes.shape[1])
+            indexes, distances = indexes.ravel(), distances.ravel()
+
+        # beads themselves, or the farthest neighbour if tied beads hide them
+        others = indexes != queries
+        if k is not None:
+            ranks = np.cumsum(others.reshape((self.n_points, -1)), axis=1).ravel()
+            others &= ranks <= k
+
+        counts = np.bincount(queries[others], minlength=self.n_points)
+        offsets = np.zeros(self.n_points + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+
+        return offsets, indexes[others], distances[others]
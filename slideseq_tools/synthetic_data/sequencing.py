@@ -4,23 +4,40 @@ Creates synthetic Slide-seq sequencing data for testing.
 
 from typing import List, Tuple
 from pathlib import Path
-from random import randrange
 import numpy as np
-from Bio import SeqIO
 
 from slideseq_tools.utils.constants import BASES, MUTATIONS
+from slideseq_tools.utils.sequence import (
+    LETTERS,
+    PackedSequences,
+    encode,
+    to_byte_matrix,
+)
+from slideseq_tools.barcode import BarcodeMatcher
+from slideseq_tools.fasta import Fasta
 from slideseq_tools.gff import GFF
+from slideseq_tools.utils.rng import as_generator
+
+# ASCII code to ASCII code of its substitution, 0 for non-DNA codes
+SUBSTITUTIONS = np.zeros(256, dtype=np.uint8)
+for _base, _mutation in MUTATIONS.items():
+    SUBSTITUTIONS[ord(_base)] = ord(_mutation)
 
 
 class Sequencing:
     """Synthetic Slide-seq sequencing data."""
 
     gff_path: Path = None
-    record_dict = None
+    cache_dir: Path = None
+    fasta = None
     features = None
+    feature_seqids = None
+    feature_starts = None
 
     @classmethod
-    def __init__(cls, gff_path: str, fasta_path: str, length: int = 50) -> None:
+    def __init__(
+        cls, gff_path: str, fasta_path: str, length: int = 50, cache_dir: str = None
+    ) -> None:
         """\
         Constructor for Sequencing Slide-seq class.
 
@@ -37,6 +54,8 @@ class Sequencing:
             Path of the `FASTA` file.
         length
             Length of transcripts.
+        cache_dir
+            Directory where parsed `GFF` features are cached.
         """
         gff_path = Path(gff_path)
         if not gff_path.exists():
@@ -49,9 +68,20 @@ class Sequencing:
         cls.fasta_path = fasta_path
 
         cls.length = length
+        cls.cache_dir = cache_dir
+
+    def __getstate__(self) -> dict:
+        """\
+        Returns the state to pickle, with the constructor settings which are
+        class attributes, so spawned processes get them.
+        """
+        state = self.__dict__.copy()
+        for name in ["gff_path", "fasta_path", "length", "cache_dir"]:
+            state[name] = getattr(self, name)
+        return state
 
     @classmethod
-    def random_sequence(cls, length: int = 14) -> str:
+    def random_sequence(cls, length: int = 14, rng=None) -> str:
         """\
         Returns a random DNA sequence as `str`.
 
@@ -59,27 +89,130 @@ class Sequencing:
         ----------
         length
             Sequence length.
+        rng
+            Random generator, or seed.
         """
+        rng = as_generator(rng)
+
         min_val = min(BASES.keys())
         max_val = max(BASES.keys())
 
         bases = []
 
-        for _ in range(length):
-            bases.append(BASES[randrange(min_val, max_val + 1)])
+        for code in rng.integers(min_val, max_val + 1, size=length):
+            bases.append(BASES[code])
 
         return "".join(bases)
 
+    # pylint: disable=too-many-arguments
+    @classmethod
+    def random_sequences(
+        cls,
+        n_seqs: int,
+        length: int = 14,
+        unique: bool = False,
+        min_distance: int = 0,
+        packed: bool = False,
+        rng=None,
+    ):
+        """\
+        Returns random DNA sequences drawn at once, as a `uint8` matrix of
+        ASCII codes with one row per sequence or as `PackedSequences`.
+
+        Sequences colliding with previous ones are drawn again until all are
+        unique or far enough from each other. Method raises a `ValueError`
+        if there aren't enough such sequences.
+
+        Parameters
+        ----------
+        n_seqs
+            Number of sequences.
+        length
+            Sequence length.
+        unique
+            Whether sequences are all different.
+        min_distance
+            Minimum Hamming distance between sequences.
+        packed
+            Whether to return `PackedSequences`.
+        rng
+            Random generator, or seed.
+        """
+        rng = as_generator(rng)
+
+        if min_distance > length:
+            raise ValueError(f"{length}-base sequences can't be {min_distance} apart.")
+
+        if unique or min_distance > 0:
+            matrix = cls._distant_sequences(n_seqs, length, max(min_distance, 1), rng)
+        else:
+            matrix = LETTERS[rng.integers(0, 4, size=(n_seqs, length))]
+
+        if packed:
+            return PackedSequences.encode(matrix)
+
+        return matrix
+
+    # pylint: disable=too-many-locals
+    @classmethod
+    def _distant_sequences(
+        cls, n_seqs: int, length: int, min_distance: int, rng: np.random.Generator
+    ) -> np.ndarray:
+        """Returns random sequences at least `min_distance` apart."""
+        if n_seqs > 4**length:
+            raise ValueError(f"There are less than {n_seqs} {length}-base sequences.")
+
+        accepted = np.empty((0, length), dtype=np.uint8)
+        stale_rounds = 0
+
+        while accepted.shape[0] < n_seqs:
+
+            n_accepted = accepted.shape[0]
+            n_missing = n_seqs - n_accepted
+
+            # extra candidates make up for the ones rejected
+            candidates = LETTERS[rng.integers(0, 4, size=(2 * n_missing + 16, length))]
+            pool = np.vstack([accepted, candidates])
+
+            keep = np.ones(candidates.shape[0], dtype=bool)
+
+            # candidates too close to an accepted or a previous candidate
+            if min_distance == 1:
+                codes, _ = encode(pool)
+                if codes.shape[1] == 1:
+                    codes = codes[:, 0]
+                _, first = np.unique(codes, axis=0, return_index=True)
+                keep[:] = False
+                keep[first[first >= n_accepted] - n_accepted] = True
+            else:
+                matcher = BarcodeMatcher(pool, radius=min_distance - 1)
+                for start in range(0, candidates.shape[0], 2**15):
+                    queries, barcodes, _ = matcher.pairs(
+                        candidates[start : start + 2**15]
+                    )
+                    queries += start
+                    keep[queries[barcodes < queries + n_accepted]] = False
+
+            candidates = candidates[keep][:n_missing]
+
+            stale_rounds = 0 if candidates.shape[0] else stale_rounds + 1
+
+            if stale_rounds == 100:
+                raise ValueError(
+                    f"Cannot draw {n_seqs} {length}-base sequences "
+                    f"{min_distance} apart."
+                )
+
+            accepted = np.vstack([accepted, candidates])
+
+        return accepted
+
     def _is_dna(self, sequence: str) -> bool:
         """Returns if a `str` is DNA."""
-        bases = set(BASES.values())
-        for base in sequence:
-            if base not in bases:
-                return False
-        return True
+        return set(sequence) <= set(BASES.values())
 
     @classmethod
-    def mutate(cls, sequence: str, n_bases: int = None) -> str:
+    def mutate(cls, sequence: str, n_bases: int = None, rng=None) -> str:
         """\
         Randomly mutate a DNA sequence.
 
@@ -93,24 +226,75 @@ class Sequencing:
             Sequence to mutate as `str`.
         n_bases
             Number of base to mutate.
+        rng
+            Random generator, or seed.
         """
         if not cls._is_dna(cls, sequence):
             raise ValueError(f"{sequence} is not DNA.")
 
-        # number of bases to mutate
+        matrix = to_byte_matrix([sequence])
+        mutated, _ = cls.mutate_batch(matrix, n_bases, rng=rng)
+
+        return mutated.tobytes().decode("ascii")
+
+    @classmethod
+    def mutate_batch(
+        cls, matrix: np.ndarray, n_bases=None, lengths: np.ndarray = None, rng=None
+    ) -> Tuple[np.ndarray]:
+        """\
+        Randomly mutates a batch of DNA sequences at once.
+
+        Returns the mutated sequences and a boolean matrix of the positions
+        changed. Every sequence gets its own number of substitutions at
+        distinct random positions, `MUTATIONS` giving the new bases.
+
+        Method raises a `ValueError` if sequences aren't made of DNA bases.
+        A sequence is fully mutated if its number of bases to mutate isn't
+        specified or greater than its length.
+
+        Parameters
+        ----------
+        matrix
+            Sequences as a `uint8` matrix of ASCII codes, one row per sequence,
+            padded with zeros.
+        n_bases
+            Number of bases to mutate, for all sequences or per sequence.
+        lengths
+            Sequence lengths. Defaults to the number of non-zero codes per
+            sequence.
+        rng
+            Random generator, or seed.
+        """
+        rng = as_generator(rng)
+        matrix = np.atleast_2d(matrix)
+        n_seqs, width = matrix.shape
+
+        if lengths is None:
+            lengths = np.count_nonzero(matrix, axis=1)
+
+        inside = np.arange(width) < np.asarray(lengths)[:, None]
+
+        if np.any(SUBSTITUTIONS[matrix][inside] == 0):
+            raise ValueError("Sequences are not DNA.")
+
         if n_bases is None:
-            size = len(sequence)
-        else:
-            size = min(n_bases, len(sequence))
+            n_bases = width
+        n_bases = np.broadcast_to(np.asarray(n_bases), (n_seqs,))
+
+        # ranks of random keys give distinct random positions per sequence
+        keys = rng.random((n_seqs, width))
+        keys[~inside] = 2
+        ranks = np.empty((n_seqs, width), dtype=np.int64)
+        np.put_along_axis(
+            ranks, np.argsort(keys, axis=1), np.arange(width)[None, :], axis=1
+        )
 
-        positions = np.random.choice(a=len(sequence), size=size, replace=False)
-        sequence = list(sequence)
-        for pos in positions:
-            sequence[pos] = MUTATIONS[sequence[pos]]
+        changed = (ranks < n_bases[:, None]) & inside
+        mutated = np.where(changed, SUBSTITUTIONS[matrix], matrix)
 
-        return "".join(sequence)
+        return mutated, changed
 
-    def get_transcripts(self, n_transcripts: int = 3) -> Tuple:
+    def get_transcripts(self, n_transcripts: int = 3, rng=None) -> Tuple:
         """\
         Returns a list of transcripts as a tuples (`seqid`, `start`, `end`, `sequence`).
 
@@ -122,29 +306,85 @@ class Sequencing:
         ----------
         n_transcripts
             Number of transcripts to return.
+        rng
+            Random generator, or seed.
         """
-        if not self.features:
-            gff = GFF(self.gff_path)
-            self.features = gff.get_features(min_length=self.length)
+        rng = as_generator(rng)
 
-        if not self.record_dict:
-            self.record_dict = SeqIO.index(str(self.fasta_path.absolute()), "fasta")
+        self.load_sequences()
 
         size = min(len(self.features), n_transcripts)
-        indexes = np.random.choice(a=len(self.features), size=size, replace=False)
+        indexes = rng.choice(a=len(self.features), size=size, replace=False)
 
         transcripts = []
 
         for i in indexes:
             seqid, start, end = self.features[i]
             end = start + self.length
-            transcript = self.record_dict[seqid][start:end]
-            transcripts.append((seqid, start, end, str(transcript.seq).upper()))
+            transcript = self.fasta.fetch_str(seqid, start, end)
+            transcripts.append((seqid, start, end, transcript))
 
         return transcripts
 
+    def load_sequences(self) -> None:
+        """\
+        Loads features and memory-maps the genome `FASTA` file, building its
+        `.fai` index if needed.
+
+        Processes forked afterwards share the features, and every process
+        shares the genome through the page cache, even pickled.
+        """
+        if not self.features:
+            gff = GFF(self.gff_path, cache_dir=self.cache_dir)
+            self.features = gff.get_features(min_length=self.length)
+
+        if self.fasta is None:
+            self.fasta = Fasta(self.fasta_path)
+            self.feature_seqids = np.array([feat[0] for feat in self.features])
+            self.feature_starts = np.array(
+                [feat[1] for feat in self.features], dtype=np.int64
+            )
+
+    def get_transcript_matrix(self, n_transcripts: int, rng=None) -> Tuple[np.ndarray]:
+        """\
+        Returns transcripts as a `uint8` matrix of upper case ASCII codes,
+        padded with zeros, and their lengths.
+
+        Features are drawn without replacement like `get_transcripts`, then
+        again once all of them are drawn.
+
+        Parameters
+        ----------
+        n_transcripts
+            Number of transcripts to return.
+        rng
+            Random generator, or seed.
+        """
+        rng = as_generator(rng)
+        self.load_sequences()
+
+        n_features = len(self.features)
+        indexes = [
+            rng.choice(
+                a=n_features, size=min(n_features, n_transcripts - done), replace=False
+            )
+            for done in range(0, n_transcripts, max(n_features, 1))
+        ]
+        indexes = np.concatenate(indexes) if indexes else np.empty(0, np.int64)
+
+        starts = self.feature_starts[indexes]
+        matrix, lengths = self.fasta.fetch(
+            self.feature_seqids[indexes], starts, starts + self.length
+        )
+
+        # all rows are as wide as transcripts, even if sequences end earlier
+        padded = np.zeros((indexes.shape[0], self.length), dtype=np.uint8)
+        padded[:, : matrix.shape[1]] = matrix
+
+        return padded, lengths
+
     @classmethod
-    def generate_q_score_string(cls, n_bases: int = 50) -> str:
+    def generate_q_score_string(cls, n_bases: int = 50, rng=None) -> str:
         """\
         Returns Q-Score string.
 
@@ -152,13 +392,16 @@ class Sequencing:
         ----------
         n_bases
             Number of bases.
+        rng
+            Random generator, or seed.
         """
+        rng = as_generator(rng)
         ascii_codes = list(range(33, 74))
-        codes = np.random.choice(a=ascii_codes[-10:], size=n_bases)
+        codes = rng.choice(a=ascii_codes[-10:], size=n_bases)
         return "".join(list(map(chr, codes)))
 
     @classmethod
-    def get_phred_scores(cls, n_bases: int = 50) -> List:
+    def get_phred_scores(cls, n_bases: int = 50, rng=None) -> List:
         """\
         Returns Solexa quality score list.
 
@@ -166,6 +409,9 @@ class Sequencing:
         ----------
         n_bases
             Number of bases.
+        rng
+            Random generator, or seed.
         """
+        rng = as_generator(rng)
         scores = list(range(41))
-        return np.random.choice(a=scores[-10:], size=n_bases)
+        return rng.choice(a=scores[-10:], size=n_bases)
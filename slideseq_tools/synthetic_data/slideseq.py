@@ -2,9 +2,8 @@
 Creates synthetic Slide-seq data for testing.
 """
 
-import gzip
 from pathlib import Path
-from typing import List, Tuple
+from typing import Iterable, Iterator, List, Tuple
 
 import numpy as np
 import pandas as pd
@@ -13,12 +12,17 @@ from Bio.Seq import Seq
 from Bio import SeqIO
 from Bio.SeqRecord import SeqRecord
 
+from slideseq_tools.bgzf import open_bgzf
+from slideseq_tools.fastq import join_rows
 from slideseq_tools.utils.constants import UP_PRIMER
 from slideseq_tools.synthetic_data.spatial import Puck
 from slideseq_tools.synthetic_data.sequencing import Sequencing
+from slideseq_tools.utils.rng import as_generator, substream
+from slideseq_tools.utils.sequence import to_byte_matrix
 
 
 # pylint: disable=too-many-arguments
+# pylint: disable=too-many-instance-attributes
 class SlideSeq:
     """Synthetic Slide-seq data."""
 
@@ -28,6 +32,9 @@ class SlideSeq:
     length: int = None
     n_beads: int = None
     puck = None
+    barcodes = None
+    seed: int = None
+    layout: str = "image"
 
     def __init__(
         self,
@@ -36,6 +43,11 @@ class SlideSeq:
         fasta_path: str,
         length: int = 50,
         n_beads: int = int(8 * 1e4),
+        cache_dir: str = None,
+        seed: int = None,
+        layout: str = "image",
+        diameter: float = 1000.0,
+        gradient: float = 0.0,
     ) -> None:
         """\
         Constructor for Slide-seq class.
@@ -43,13 +55,15 @@ class SlideSeq:
         Constructor raises:
 
             * `FileNoFoundError` if  `TIFF` file doesn't exist
+            * `ValueError` if the `image` layout has no `TIFF` file
             * `FileNoFoundError` if  `GFF` file doesn't exist
             * `FileNoFoundError` if  `FASTA` file doesn't exist
 
         Parameters
         ----------
         tiff_path:
-            Path of the `TIFF` file.
+            Path of the `TIFF` file, beads image of the `image` layout or
+            mask of the other ones. Optional but for the `image` layout.
         gff_path 
             Path of the `GFF` file.
         fasta_path 
@@ -58,10 +72,25 @@ class SlideSeq:
             Length of transcripts.
         n_beads
             Number of beads.
+        cache_dir
+            Directory where parsed `GFF` features are cached.
+        seed
+            Seed of random draws, fresh entropy if `None`.
+        layout
+            Either `image`, beads being sampled from the `TIFF` image, or a
+            procedural layout of `Puck.layout`.
+        diameter
+            Puck diameter of procedural layouts.
+        gradient
+            Density gradient of procedural layouts.
         """
-        tiff_path = Path(tiff_path)
-        if not tiff_path.exists():
-            raise FileNotFoundError(f"tiff image {tiff_path} doesn't exist.")
+        if tiff_path is None:
+            if layout == "image":
+                raise ValueError("The image layout needs a TIFF image.")
+        else:
+            tiff_path = Path(tiff_path)
+            if not tiff_path.exists():
+                raise FileNotFoundError(f"tiff image {tiff_path} doesn't exist.")
         self.tiff_path = tiff_path
 
         gff_path = Path(gff_path)
@@ -76,9 +105,16 @@ class SlideSeq:
 
         self.length = length
         self.n_beads = n_beads
-        self.seq = Sequencing(gff_path=gff_path, fasta_path=fasta_path, length=length)
-
-    def generate_puck(self, barcode_length=14) -> None:
+        self.seed = seed
+        self.rng = as_generator(seed)
+        self.layout = layout
+        self.diameter = diameter
+        self.gradient = gradient
+        self.seq = Sequencing(
+            gff_path=gff_path, fasta_path=fasta_path, length=length, cache_dir=cache_dir
+        )
+
+    def generate_puck(self, barcode_length=14, min_distance: int = 0, rng=None) -> None:
         """\
         Generates bead barcodes and coordinates.
 
@@ -86,19 +122,37 @@ class SlideSeq:
         ----------
         barcode_length
             Barcodes sequence lenght.
+        min_distance
+            Minimum Hamming distance between barcodes, 1 makes them unique.
+        rng
+            Random generator, or seed. Defaults to the Slide-seq generator.
         """
-        dframe = Puck.coordinates(self.tiff_path)
-        dframe = dframe.sample(min(dframe.shape[0], self.n_beads))
-
-        barcodes = []
+        rng = self.rng if rng is None else as_generator(rng)
+
+        if self.layout == "image":
+            dframe = Puck.sample_coordinates(self.tiff_path, self.n_beads, rng=rng)
+        else:
+            dframe = Puck.layout(
+                self.n_beads,
+                diameter=self.diameter,
+                method=self.layout,
+                mask_path=self.tiff_path,
+                gradient=self.gradient,
+                rng=rng,
+            )
 
-        for _ in range(self.n_beads):
-            barcodes.append(Sequencing.random_sequence(length=barcode_length))
+        barcodes = Sequencing.random_sequences(
+            dframe.shape[0], length=barcode_length, min_distance=min_distance, rng=rng
+        )
 
-        dframe.index = pd.Index(data=barcodes, name="Barcode")
+        dframe.index = pd.Index(
+            data=barcodes.view(f"S{barcode_length}").ravel().astype(str),
+            name="Barcode",
+        )
         dframe = dframe.reset_index()
 
         self.puck = dframe
+        self.barcodes = barcodes
 
     def save_coordinates(self, path: str) -> None:
         """\
@@ -120,7 +174,7 @@ class SlideSeq:
         max_value
             Upper bound of the interval.
         """
-        return np.random.randint(max_value, size=1)[0]
+        return self.rng.integers(max_value)
 
     def generate_reads(self, prefix: str = "sample", n_reads: int = 10) -> Tuple:
         """\
@@ -131,55 +185,252 @@ class SlideSeq:
         n_reads
             Number of reads to return.
         """
-        if not self.puck is None:
+        if self.puck is None:
             self.generate_puck()
 
         reads1 = []
         reads2 = []
 
-        transcripts = self.seq.get_transcripts(n_transcripts=n_reads)
+        transcripts = self.seq.get_transcripts(n_transcripts=n_reads, rng=self.rng)
 
         for counter in range(n_reads):
 
             # read 1
-            barcode = self.puck.sample(1).Barcode.values[0]
-            barcode = Sequencing.mutate(barcode, self._randint(3))
-            umi = Sequencing.random_sequence(9)
-            up_primer = Sequencing.mutate(UP_PRIMER, self._randint(3))
+            barcode = self.puck.sample(1, random_state=self.rng).Barcode.values[0]
+            barcode = Sequencing.mutate(barcode, self._randint(3), rng=self.rng)
+            umi = Sequencing.random_sequence(9, rng=self.rng)
+            up_primer = Sequencing.mutate(UP_PRIMER, self._randint(3), rng=self.rng)
             read1 = barcode[:8] + up_primer + barcode[8:] + "TC" + umi
-            if 0 == np.random.randint(21, size=1)[0]:
-                read1 = read1[: np.random.randint(len(read1), size=1)[0]]
+            if 0 == self._randint(21):
+                read1 = read1[: self._randint(len(read1))]
             read1 = SeqRecord(
                 seq=Seq(read1),
-                id=f"{prefix}-read{counter}",
-                name=f"{prefix}-read{counter}",
+                id=f"{prefix}-{counter}",
+                name=f"{prefix}-{counter}",
                 description=f"Synthetic read 1 {prefix}-{counter}",
                 letter_annotations={
-                    "phred_quality": Sequencing.get_phred_scores(len(read1))
+                    "phred_quality": Sequencing.get_phred_scores(
+                        len(read1), rng=self.rng
+                    )
                 },
             )
             reads1.append(read1)
 
             # read 2
             _, _, _, transcript = transcripts[counter]
-            transcript = Sequencing.mutate(transcript, self._randint(6))
+            transcript = Sequencing.mutate(transcript, self._randint(6), rng=self.rng)
             read2 = SeqRecord(
                 seq=Seq(transcript),
                 id=f"{prefix}-{counter}",
                 name=f"{prefix}-{counter}",
                 description=f"Synthetic read 2 {prefix}-{counter}",
                 letter_annotations={
-                    "phred_quality": Sequencing.get_phred_scores(len(transcript))
+                    "phred_quality": Sequencing.get_phred_scores(
+                        len(transcript), rng=self.rng
+                    )
                 },
             )
             reads2.append(read2)
 
         return reads1, reads2
 
+    # pylint: disable=too-many-locals
+    def generate_fastq(
+        self, prefix: str = "sample", n_reads: int = 10, start: int = 0, rng=None
+    ) -> Tuple[bytes]:
+        """\
+        Returns Read 1 and Read 2 as `FASTQ` bytes.
+
+        Reads are drawn like with `generate_reads`, but for the whole batch
+        at once: bead indexes, mutations, UMIs, truncations and qualities are
+        arrays and records are formatted without `SeqRecord`.
+
+        Parameters
+        ----------
+        prefix
+            Prefix of read names.
+        n_reads
+            Number of reads to return.
+        start
+            Number of the first read.
+        rng
+            Random generator, or seed. Defaults to the Slide-seq generator.
+        """
+        rng = self.rng if rng is None else as_generator(rng)
+
+        if self.puck is None:
+            self.generate_puck()
+
+        barcodes = self.barcodes
+        if barcodes is None:
+            barcodes = to_byte_matrix(self.puck["Barcode"].tolist())
+
+        # read 1
+        beads = rng.integers(barcodes.shape[0], size=n_reads)
+        barcodes, _ = Sequencing.mutate_batch(
+            barcodes[beads], rng.integers(3, size=n_reads), rng=rng
+        )
+        umis = Sequencing.random_sequences(n_reads, length=9, rng=rng)
+        up_primer = to_byte_matrix([UP_PRIMER])
+        up_primers = np.broadcast_to(up_primer, (n_reads, up_primer.shape[1]))
+        up_primers, _ = Sequencing.mutate_batch(
+            up_primers, rng.integers(3, size=n_reads), rng=rng
+        )
+        tc_matrix = to_byte_matrix(["TC"])
+        tc_matrix = np.broadcast_to(tc_matrix, (n_reads, tc_matrix.shape[1]))
+        reads1 = np.hstack(
+            [barcodes[:, :8], up_primers, barcodes[:, 8:], tc_matrix, umis]
+        )
+        lengths1 = np.full(n_reads, reads1.shape[1], dtype=np.int64)
+        truncated = rng.integers(21, size=n_reads) == 0
+        lengths1[truncated] = rng.integers(
+            reads1.shape[1], size=np.count_nonzero(truncated)
+        )
+
+        # read 2
+        reads2, lengths2 = self.seq.get_transcript_matrix(n_reads, rng=rng)
+        reads2, _ = Sequencing.mutate_batch(
+            reads2, rng.integers(6, size=n_reads), lengths2, rng=rng
+        )
+
+        # read names are numbered from start
+        numbers = np.arange(start, start + n_reads).astype(bytes)
+        numbers = (
+            numbers.view(np.uint8).reshape((n_reads, numbers.itemsize)),
+            np.char.str_len(numbers),
+        )
+
+        fastqs = []
+
+        for num, reads, lengths in [(1, reads1, lengths1), (2, reads2, lengths2)]:
+            # phred qualities between 31 and 40
+            qualities = rng.integers(64, 74, size=reads.shape, dtype=np.uint8)
+            fields = [
+                f"@{prefix}-".encode("ascii"),
+                numbers,
+                f" Synthetic read {num} {prefix}-".encode("ascii"),
+                numbers,
+                b"\n",
+                (reads, lengths),
+                b"\n+\n",
+                (qualities, lengths),
+                b"\n",
+            ]
+            fastqs.append(join_rows(fields, n_reads).tobytes())
+
+        return fastqs[0], fastqs[1]
+
+    def stream_fastq(
+        self,
+        prefix: str = "sample",
+        n_reads: int = 10,
+        chunk_size: int = 2**18,
+        keys: Tuple[int] = (),
+    ) -> Iterator[Tuple[bytes]]:
+        """\
+        Yields Read 1 and Read 2 as `FASTQ` bytes, by chunks of at most
+        `chunk_size` reads. Memory doesn't depend on the number of reads.
+
+        Every chunk is drawn from its own sub-stream of the seed, identified
+        by `keys` and the chunk number, so a chunk is the same whichever
+        process generates it.
+
+        Parameters
+        ----------
+        prefix
+            Prefix of read names.
+        n_reads
+            Number of reads to yield.
+        chunk_size
+            Number of reads per chunk.
+        keys
+            Integers identifying the reads, for instance sample and file
+            numbers.
+        """
+        for chunk_num, start in enumerate(range(0, n_reads, chunk_size)):
+            yield self.generate_fastq(
+                prefix=prefix,
+                n_reads=min(chunk_size, n_reads - start),
+                start=start,
+                rng=substream(self.seed, *keys, chunk_num),
+            )
+
+    @classmethod
+    def write_fastq_stream(
+        cls,
+        chunks: Iterable[Tuple[bytes]],
+        path_prefix: str,
+        threads: int = 1,
+        level: int = 6,
+    ) -> Tuple:
+        """\
+        Writes chunks of Read 1 and Read 2 `FASTQ` bytes in 2 files,
+        compressed as BGZF, as they are generated. Returns the `FASTQ` files
+        paths.
+
+        Parameters
+        ----------
+        chunks
+            Iterable of Read 1 and Read 2 `FASTQ` bytes.
+        path_prefix
+            Path prefix for `FASTQ`.`gz`.
+        threads
+            Number of compression threads per file.
+        level
+            Compression level.
+        """
+        fastq1 = f"{path_prefix}.R1.fastq.gz"
+        fastq2 = f"{path_prefix}.R2.fastq.gz"
+
+        with open_bgzf(fastq1, "wb", threads=threads, level=level) as file_obj1:
+            with open_bgzf(fastq2, "wb", threads=threads, level=level) as file_obj2:
+                for data1, data2 in chunks:
+                    file_obj1.write(data1)
+                    file_obj2.write(data2)
+
+        return fastq1, fastq2
+
+    @classmethod
+    def write_fastq_bytes(
+        cls,
+        fastq1: bytes,
+        fastq2: bytes,
+        path_prefix: str,
+        threads: int = 1,
+        level: int = 6,
+    ) -> Tuple:
+        """\
+        Writes Read 1 and Read 2 `FASTQ` bytes in 2 files, compressed as
+        BGZF. Returns the `FASTQ` files paths.
+
+        Parameters
+        ----------
+        fastq1
+            Read 1 as `FASTQ` bytes.
+        fastq2
+            Read 2 as `FASTQ` bytes.
+        path_prefix
+            Path prefix for `FASTQ`.`gz`.
+        threads
+            Number of compression threads per file.
+        level
+            Compression level.
+        """
+        return cls.write_fastq_stream(
+            [(fastq1, fastq2)], path_prefix=path_prefix, threads=threads, level=level
+        )
+
     @classmethod
-    def write_fastq(cls, reads1: List, reads2: List, path_prefix: str) -> Tuple:
+    def write_fastq(
+        cls,
+        reads1: List,
+        reads2: List,
+        path_prefix: str,
+        threads: int = 1,
+        level: int = 6,
+    ) -> Tuple:
         """\
-        Writes 2 `FASTQ` files for Read 1 and Read 2.
+        Writes 2 `FASTQ` files for Read 1 and Read 2, compressed as BGZF.
         Returns the `FASTQ` files paths.
 
         Parameters
@@ -190,14 +441,18 @@ class SlideSeq:
             List of Read 2 as `SeqRecord`.
         path_prefix
             Path prefix for `FASTQ`.`gz`.
+        threads
+            Number of compression threads per file.
+        level
+            Compression level.
         """
         fastq1 = f"{path_prefix}.R1.fastq.gz"
         fastq2 = f"{path_prefix}.R2.fastq.gz"
 
-        with gzip.open(fastq1, "wt") as file_obj:
+        with open_bgzf(fastq1, "wt", threads=threads, level=level) as file_obj:
             SeqIO.write(sequences=reads1, handle=file_obj, format="fastq")
 
-        with gzip.open(fastq2, "wt") as file_obj:
+        with open_bgzf(fastq2, "wt", threads=threads, level=level) as file_obj:
             SeqIO.write(sequences=reads2, handle=file_obj, format="fastq")
 
         return fastq1, fastq2
@@ -3,10 +3,16 @@ Creates puck coordinates for testing.
 """
 
 from pathlib import Path
+from typing import Iterator, Tuple
 from skimage.io import imread
 
 import numpy as np
 import pandas as pd
+import tifffile
+
+from slideseq_tools.utils.rng import as_generator
+
+LAYOUTS = ["jittered", "poisson"]
 
 
 # pylint: disable=too-few-public-methods
@@ -54,3 +60,370 @@ class Puck:
         dframe.columns = ["x", "y"]
 
         return dframe
+
+    @classmethod
+    def _open(cls, path: Path) -> np.ndarray:
+        """Returns the image memory-mapped if it's stored uncompressed,
+        loaded otherwise."""
+        try:
+            return tifffile.memmap(path, mode="r")
+        except ValueError:
+            return imread(path)
+
+    @classmethod
+    def _decode_band(cls, tif, band: int) -> np.ndarray:
+        """Returns a strip, or a row of tiles, of a compressed image."""
+        page = tif.pages[0]
+        n_rows, n_cols = page.shape
+        band_rows = page.chunks[0]
+        per_band = len(page.dataoffsets) // page.chunked[0]
+
+        # missing segments are zeros, as read by tifffile
+        pixels = np.zeros(
+            (min(band_rows, n_rows - band * band_rows), n_cols), dtype=page.dtype
+        )
+
+        for index in range(band * per_band, (band + 1) * per_band):
+
+            data = None
+            if page.databytecounts[index]:
+                tif.filehandle.seek(page.dataoffsets[index])
+                data = tif.filehandle.read(page.databytecounts[index])
+
+            segment, position, _ = page.decode(
+                data, index, jpegtables=page.jpegtables, jpegheader=page.jpegheader
+            )
+
+            if segment is not None:
+                col = position[3]
+                segment = segment[0, : pixels.shape[0], : n_cols - col, 0]
+                pixels[:, col : col + segment.shape[1]] = segment
+
+        return pixels
+
+    @classmethod
+    def _row_blocks(cls, path: Path, max_pixels: int) -> Iterator[Tuple]:
+        """\
+        Yields blocks (`first_row`, `pixels`) of consecutive rows of an image,
+        of about `max_pixels` pixels, at least a row.
+
+        Uncompressed images are memory-mapped. Compressed ones are decoded a
+        strip, or a row of tiles, at once, which must be single channel.
+        """
+        try:
+            img = tifffile.memmap(path, mode="r")
+        except ValueError:
+            img = None
+
+        if img is not None:
+            step = max(1, max_pixels // img.shape[1])
+            for row in range(0, img.shape[0], step):
+                yield row, img[row : row + step]
+            return
+
+        with tifffile.TiffFile(path) as tif:
+
+            page = tif.pages[0]
+
+            if len(page.shape) != 2:
+                raise ValueError(f"TIFF image {path} isn't single channel.")
+
+            step = max(1, max_pixels // page.shape[1])
+
+            for band in range(page.chunked[0]):
+                pixels = cls._decode_band(tif, band)
+                for row in range(0, pixels.shape[0], step):
+                    yield band * page.chunks[0] + row, pixels[row : row + step]
+
+    # pylint: disable=too-many-locals
+    @classmethod
+    def sample_coordinates(
+        cls, tiff_path: str, n_beads: int, rng=None, max_pixels: int = 2**22
+    ) -> pd.DataFrame:
+        """\
+        Samples bead coordinates among the zero pixels of a `TIFF` image.
+
+        The image is scanned by blocks of rows twice: zero pixels are counted
+        first, then the ranks drawn among all of them are located. Blocks
+        hold about `max_pixels` pixels, memory-mapped if the image is stored
+        uncompressed, decoded from a strip or a row of tiles otherwise, so
+        memory follows the number of beads rather than the image size.
+        Coordinates are the ones of `coordinates`.
+
+        Raises a `FileNoFoundError` if  `TIFF` image doesn't exist.
+
+        Parameters
+        ----------
+        tiff_path
+            Path of the `TIFF` file.
+        n_beads
+            Number of beads, all zero pixels if there are fewer.
+        rng
+            Random generator, or seed.
+        max_pixels
+            Number of pixels per block of rows.
+
+        Returns
+        -------
+        pd.DataFrame
+            Data frame with two `float32` columns `x` and `y`, beads in random
+            order.
+        """
+        path = Path(tiff_path)
+
+        if not path.exists():
+            raise FileNotFoundError(f"TIFF image {path} doesn't exist.")
+
+        rng = as_generator(rng)
+
+        counts = []
+        n_cols = 1
+
+        for _, block in cls._row_blocks(path, max_pixels):
+            counts.append(np.count_nonzero(block == 0))
+            n_cols = block.shape[1]
+
+        counts = np.array(counts, dtype=np.int64)
+        starts = np.cumsum(counts) - counts
+
+        n_zeros = int(counts.sum())
+        ranks = np.sort(rng.choice(n_zeros, size=min(n_beads, n_zeros), replace=False))
+        bounds = np.searchsorted(ranks, np.append(starts, n_zeros))
+
+        pixels = np.empty(ranks.shape[0], dtype=np.int64)
+
+        for num, (row, block) in enumerate(cls._row_blocks(path, max_pixels)):
+            low, high = bounds[num], bounds[num + 1]
+            if low == high:
+                continue
+            zeros = np.flatnonzero(block == 0)
+            pixels[low:high] = row * n_cols + zeros[ranks[low:high] - starts[num]]
+
+        pixels = pixels[rng.permutation(pixels.shape[0])]
+        rows, cols = np.divmod(pixels, n_cols)
+
+        # same 3 pi / 2 rotation as coordinates
+        return pd.DataFrame(
+            {"x": cols.astype(np.float32), "y": -rows.astype(np.float32)}
+        )
+
+    # pylint: disable=too-many-arguments
+    @classmethod
+    def layout(
+        cls,
+        n_beads: int,
+        diameter: float = 1000.0,
+        method: str = "jittered",
+        mask_path: str = None,
+        gradient: float = 0.0,
+        rng=None,
+    ) -> pd.DataFrame:
+        """\
+        Lays beads out in a circular puck without an image.
+
+        Beads are drawn on a jittered grid, one bead per cell at a random
+        position, or by Poisson-disk dart throwing, beads being then a
+        minimum distance apart. Either way beads are drawn by batches over
+        the whole puck, outside the mask dropped, then thinned by the
+        density gradient.
+
+        Coordinates follow `coordinates`: the puck fits in the square
+        `0 <= x <= diameter`, `-diameter <= y <= 0`, the mask image being
+        stretched over it.
+
+        Raises a `ValueError` if the method is unknown or if the mask leaves
+        no room for beads.
+
+        Parameters
+        ----------
+        n_beads
+            Number of beads.
+        diameter
+            Puck diameter.
+        method
+            Either `jittered` or `poisson`.
+        mask_path
+            Path of a `TIFF` image whose zero pixels are where beads can be.
+        gradient
+            Density slope along x, between -1 and 1. Density is `1 + gradient`
+            times the centre one on the right edge, `1 - gradient` times on
+            the left edge.
+        rng
+            Random generator, or seed.
+
+        Returns
+        -------
+        pd.DataFrame
+            Data frame with two `float32` columns `x` and `y`, beads in random
+            order.
+        """
+        if method not in LAYOUTS:
+            raise ValueError(f"Layout {method} isn't one of {', '.join(LAYOUTS)}.")
+
+        rng = as_generator(rng)
+        mask = None if mask_path is None else cls._open(Path(mask_path))
+        radius = diameter / 2
+
+        def density(x: np.ndarray) -> np.ndarray:
+            """Returns relative density, 1 at its maximum."""
+            return (1 + gradient * (x - radius) / radius) / (1 + abs(gradient))
+
+        def accept(x: np.ndarray, y: np.ndarray) -> np.ndarray:
+            """Returns which positions are in the puck and the mask."""
+            keep = np.hypot(x - radius, y + radius) <= radius
+            if mask is not None:
+                rows = np.clip(-y / diameter * mask.shape[0], 0, mask.shape[0] - 1)
+                cols = np.clip(x / diameter * mask.shape[1], 0, mask.shape[1] - 1)
+                keep &= mask[rows.astype(np.int64), cols.astype(np.int64)] == 0
+            return keep
+
+        if not np.any(accept(*cls._uniform(10**5, diameter, rng))):
+            raise ValueError("The mask leaves no room for beads in the puck.")
+
+        if method == "jittered":
+            x, y = cls._jittered(n_beads, diameter, accept, density, rng)
+        else:
+            x, y = cls._poisson(n_beads, diameter, accept, density, rng)
+
+        order = rng.permutation(x.shape[0])
+
+        return pd.DataFrame(
+            {"x": x[order].astype(np.float32), "y": y[order].astype(np.float32)}
+        )
+
+    # pylint: disable=too-many-arguments
+    @classmethod
+    def _jittered(cls, n_beads: int, diameter: float, accept, density, rng) -> Tuple:
+        """Returns beads of a jittered grid thinned by density, cells
+        shrinking until enough of them are kept."""
+        # cells inside the puck for the number of beads
+        cell_size = diameter * np.sqrt(np.pi / 4 / max(n_beads, 1))
+
+        for _ in range(100):
+
+            n_cells = int(np.ceil(diameter / cell_size))
+            rows, cols = np.divmod(np.arange(n_cells * n_cells), n_cells)
+
+            x = (cols + rng.random(cols.shape[0])) * cell_size
+            y = -(rows + rng.random(rows.shape[0])) * cell_size
+            keep = accept(x, y) & (rng.random(x.shape[0]) < density(x))
+            keep = np.flatnonzero(keep)
+
+            if keep.shape[0] >= n_beads:
+                keep = np.sort(rng.choice(keep, size=n_beads, replace=False))
+                return x[keep], y[keep]
+
+            cell_size *= np.sqrt(max(keep.shape[0], 1) / n_beads) * 0.95
+
+        raise ValueError(f"Cannot lay {n_beads} beads out in the puck.")
+
+    # pylint: disable=too-many-arguments,too-many-locals
+    @classmethod
+    def _poisson(cls, n_beads: int, diameter: float, accept, density, rng) -> Tuple:
+        """\
+        Returns beads drawn by grid-based Poisson-disk dart throwing, then
+        thinned by density.
+
+        Cells are `min_distance / sqrt(2)` wide so they hold a bead at most.
+        Every round throws a dart in each active cell, phase by phase, cells
+        of a phase being 3 cells apart so their darts can't conflict, and
+        checks darts against beads of the 20 nearby cells. Cells are left
+        once they get a bead or miss 4 darts. The minimum distance
+        shrinks if the puck can't hold enough beads.
+        """
+        # puck area available to beads, and beads needed before thinning
+        area = diameter**2 * np.mean(accept(*cls._uniform(10**5, diameter, rng)))
+        n_darts = n_beads / np.mean(density(cls._uniform(10**5, diameter, rng)[0]))
+
+        # about two thirds of the densest packing
+        min_distance = np.sqrt(0.45 * area / max(n_darts, 1))
+
+        for _ in range(20):
+
+            cell_size = min_distance / np.sqrt(2)
+            n_cells = int(np.ceil(diameter / cell_size))
+            width = n_cells + 4
+
+            # beads per cell as x + iy, padded so neighbours are always valid
+            grid = np.full(width * width, np.nan, dtype=np.complex64)
+            kept = np.zeros(width * width, dtype=bool)
+
+            # nearby cells, nearest first as they reject most darts
+            shifts = sorted(
+                (
+                    (row, col)
+                    for row in range(-2, 3)
+                    for col in range(-2, 3)
+                    if (row, col) != (0, 0) and abs(row) + abs(col) < 4
+                ),
+                key=lambda shift: abs(shift[0]) + abs(shift[1]),
+            )
+            shifts = [(row * width + col, row, col) for row, col in shifts]
+
+            # cells overlapping the puck disk
+            rows, cols = np.divmod(np.arange(n_cells * n_cells), n_cells)
+            centres = np.hypot(rows + 0.5 - n_cells / 2, cols + 0.5 - n_cells / 2)
+            active = np.flatnonzero(centres * cell_size <= diameter / 2 + cell_size)
+            active = (rows[active] + 2) * width + cols[active] + 2
+            misses = np.zeros(active.shape[0], dtype=np.int64)
+            phases = (active // width % 3) * 3 + active % width % 3
+
+            # phases which got darts, their cells being the only ones with beads
+            thrown = np.zeros((3, 3), dtype=bool)
+
+            while active.shape[0] and np.count_nonzero(kept) < n_beads:
+
+                for phase in range(9):
+
+                    if np.count_nonzero(kept) >= n_beads:
+                        break
+
+                    darts = np.flatnonzero(phases == phase)
+                    cells = active[darts]
+
+                    dart_x = (
+                        cells % width - 2 + rng.random(darts.shape[0])
+                    ) * cell_size
+                    dart_y = (
+                        cells // width - 2 + rng.random(darts.shape[0])
+                    ) * cell_size
+                    hits = np.flatnonzero(accept(dart_x, -dart_y))
+                    positions = (dart_x[hits] - 1j * dart_y[hits]).astype(np.complex64)
+
+                    for shift, row, col in shifts:
+                        if not thrown[(phase // 3 + row) % 3, (phase + col) % 3]:
+                            continue
+                        far = ~(
+                            np.abs(grid[cells[hits] + shift] - positions) < min_distance
+                        )
+                        hits, positions = hits[far], positions[far]
+
+                    grid[cells[hits]] = positions
+                    kept[cells[hits]] = rng.random(hits.shape[0]) < density(
+                        positions.real
+                    )
+
+                    misses[darts] += 1
+                    misses[darts[hits]] = 4
+                    thrown[phase // 3, phase % 3] = True
+
+                left = misses < 4
+                active, misses, phases = active[left], misses[left], phases[left]
+
+            n_kept = np.count_nonzero(kept)
+
+            if n_kept >= n_beads:
+                beads = np.sort(
+                    rng.choice(np.flatnonzero(kept), size=n_beads, replace=False)
+                )
+                return grid[beads].real, grid[beads].imag
+
+            min_distance *= 0.9 * np.sqrt(max(n_kept, 1) / n_beads)
+
+        raise ValueError(f"Cannot lay {n_beads} beads out in the puck.")
+
+    @classmethod
+    def _uniform(cls, n_points: int, diameter: float, rng) -> Tuple:
+        """Returns positions uniformly drawn in the puck square."""
+        positions = rng.random((2, n_points)) * diameter
+        return positions[0], -positions[1]
@@ -3,9 +3,11 @@ Testing module for the slideseq_tools.synthethic_data.sequencing module.
 """
 
 import os
+import numpy as np
 import pytest
 
 from ..sequencing import Sequencing
+from ...utils.sequence import hamming, hamming_many_to_many, to_padded_matrix
 
 
 class TestSequencing:
@@ -44,3 +46,39 @@ class TestSequencing:
         sequencing = Sequencing(gff_path=gff_path, fasta_path=fasta_path, length=length)
         for _, _, _, transcript in sequencing.get_transcripts():
             assert len(transcript) == length
+
+    def test_random_sequences(self):
+        """Tests if `random_sequences` returns DNA of requested shape."""
+        matrix = Sequencing.random_sequences(1000, length=14)
+        assert matrix.shape == (1000, 14)
+        assert set(matrix.ravel().tobytes().decode()) <= set("ACGT")
+        packed = Sequencing.random_sequences(10, length=40, packed=True)
+        assert len(packed) == 10 and packed.length == 40
+
+    def test_random_sequences_min_distance(self):
+        """Tests if sequences are unique and far enough from each other."""
+        unique = Sequencing.random_sequences(200, length=4, unique=True)
+        assert len({bytes(row) for row in unique}) == 200
+
+        matrix = Sequencing.random_sequences(500, length=8, min_distance=3)
+        distances = hamming_many_to_many(matrix, matrix)
+        np.fill_diagonal(distances, 8)
+        assert distances.min() >= 3
+
+        with pytest.raises(ValueError):
+            Sequencing.random_sequences(257, length=4, unique=True)
+
+    def test_mutate(self):
+        """Tests if `mutate` changes the requested number of bases."""
+        assert Sequencing.mutate("ACGT") == "CTAG"
+        assert hamming(Sequencing.mutate("ACGTACGT", 3), "ACGTACGT") == 3
+        with pytest.raises(ValueError):
+            Sequencing.mutate("ACGN", 1)
+
+    def test_mutate_batch(self):
+        """Tests if `mutate_batch` records per-sequence substitutions."""
+        matrix, lengths = to_padded_matrix(["ACGTACGT", "ACGTAC", "ACG", ""])
+        n_bases = np.array([2, 0, 5, 1])
+        mutated, changed = Sequencing.mutate_batch(matrix, n_bases, lengths)
+        assert changed.sum(axis=1).tolist() == [2, 0, 3, 0]
+        assert np.array_equal(mutated != matrix, changed)
@@ -4,10 +4,28 @@ Testing module for the slideseq_tools.synthethic_data.slideseq module.
 
 import os
 from pathlib import Path
+import numpy as np
 import pytest
 
 import slideseq_tools
 from ..slideseq import SlideSeq
+from ...fastq import FastqReader
+from ...utils.sequence import hamming_one_to_many
+
+
+@pytest.fixture(name="genome_paths")
+def fixture_genome_paths(tmp_path):
+    """Small `GTF` and `FASTA` files."""
+    gff_path = tmp_path / "genes.gtf"
+    gff_path.write_text(
+        'chr\tena\texon\t1\t100\t.\t+\t.\tgene_id "g1";\n'
+        'chr\tena\texon\t150\t400\t.\t-\t.\tgene_id "g2";\n',
+        encoding="utf-8",
+    )
+    fasta_path = tmp_path / "genome.fa"
+    sequence = "".join(np.random.default_rng(0).choice(list("acgt"), size=420))
+    fasta_path.write_text(f">chr\n{sequence}\n", encoding="utf-8")
+    return gff_path, fasta_path
 
 
 class TestSlideSeq:
@@ -67,3 +85,71 @@ class TestSlideSeq:
         SlideSeq.write_fastq(reads1=reads1, reads2=reads2, path_prefix=path_prefix)
         assert os.path.exists(str(path_prefix) + ".R1.fastq.gz")
         assert os.path.exists(str(path_prefix) + ".R2.fastq.gz")
+
+    def test_generate_fastq(self, tmp_path, genome_paths):
+        """Tests if `generate_fastq` records are well-formed."""
+        gff_path, fasta_path = genome_paths
+        slideseq = SlideSeq(
+            tiff_path=self.tiff_path,
+            gff_path=gff_path,
+            fasta_path=fasta_path,
+            n_beads=100,
+        )
+        fastq1, fastq2 = slideseq.generate_fastq(prefix="s", n_reads=500, start=10)
+        path_prefix = tmp_path / "file"
+        SlideSeq.write_fastq_bytes(fastq1, fastq2, path_prefix=path_prefix)
+
+        (chunk1,) = FastqReader(str(path_prefix) + ".R1.fastq.gz")
+        (chunk2,) = FastqReader(str(path_prefix) + ".R2.fastq.gz")
+        assert len(chunk1) == len(chunk2) == 500
+        assert chunk1.name(0) == "s-10 Synthetic read 1 s-10"
+        assert chunk2.name(499) == "s-509 Synthetic read 2 s-509"
+        assert chunk1.lengths.max() == 43 and np.all(chunk2.lengths == 50)
+        assert np.all((chunk1.sequences == 0) == (chunk1.qualities == 0))
+        assert set(np.unique(chunk2.qualities)) == set(range(64, 74))
+
+        # complete barcodes come from the puck with up to 2 mutations
+        full = chunk1.sequences[chunk1.lengths == 43]
+        barcodes = np.hstack([full[:, :8], full[:, 26:32]])
+        for barcode in barcodes[:20]:
+            distances = hamming_one_to_many(barcode, slideseq.barcodes)
+            assert distances.min() <= 2
+
+    def test_stream_fastq(self, tmp_path, genome_paths):
+        """Tests if `stream_fastq` chunks are numbered continuously."""
+        gff_path, fasta_path = genome_paths
+        slideseq = SlideSeq(
+            tiff_path=self.tiff_path,
+            gff_path=gff_path,
+            fasta_path=fasta_path,
+            n_beads=100,
+        )
+        chunks = slideseq.stream_fastq(prefix="s", n_reads=250, chunk_size=100)
+        path_prefix = tmp_path / "file"
+        fastq1, _ = SlideSeq.write_fastq_stream(chunks, path_prefix=path_prefix)
+
+        chunks = list(FastqReader(fastq1, chunk_size=1000))
+        assert len(chunks[0]) == 250
+        assert [chunks[0].name(num).split()[0] for num in (99, 100, 249)] == [
+            "s-99",
+            "s-100",
+            "s-249",
+        ]
+
+    def test_stream_fastq_seed(self, genome_paths):
+        """Tests if seeded chunks don't depend on the order they're drawn in."""
+        gff_path, fasta_path = genome_paths
+        slideseq = SlideSeq(
+            tiff_path=self.tiff_path,
+            gff_path=gff_path,
+            fasta_path=fasta_path,
+            n_beads=100,
+            seed=42,
+        )
+        slideseq.generate_puck()
+        chunks = list(slideseq.stream_fastq(n_reads=300, chunk_size=100, keys=(1, 2)))
+        slideseq.generate_fastq(n_reads=50)
+        again = list(slideseq.stream_fastq(n_reads=300, chunk_size=100, keys=(1, 2)))
+        other = list(slideseq.stream_fastq(n_reads=300, chunk_size=100, keys=(1, 3)))
+        assert chunks == again
+        assert chunks != other
@@ -0,0 +1,115 @@
+"""
+Testing module for the slideseq_tools.synthethic_data.spatial module.
+"""
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+import tifffile
+
+import slideseq_tools
+from ..spatial import Puck
+
+
+class TestPuck:
+    """The test class associated with the Puck class."""
+
+    tiff_path = str(Path(slideseq_tools.__file__).parent / "assets/puck/puck.tif")
+
+    def test_sample_coordinates_not_existing_path(self, tmp_path):
+        """
+        Tests if `sample_coordinates` returns `FileNotFoundError` when `TIFF`
+        path doesn't exist.
+        """
+        with pytest.raises(FileNotFoundError):
+            Puck.sample_coordinates(tmp_path / "file", 10)
+
+    def test_sample_coordinates_all(self):
+        """Tests if all zero pixels are sampled when there are fewer."""
+        expected = Puck.coordinates(self.tiff_path).round().astype(np.float32)
+        dframe = Puck.sample_coordinates(self.tiff_path, 10**7, max_pixels=10**5)
+        assert dframe.dtypes.tolist() == [np.float32, np.float32]
+        assert dframe.sort_values(["x", "y"]).values.tolist() == (
+            expected.sort_values(["x", "y"]).values.tolist()
+        )
+
+    def test_sample_coordinates(self, tmp_path):
+        """Tests if beads are distinct zero pixels, drawn from the seed."""
+        img = np.ones((50, 40), dtype=np.uint8)
+        img[::3, ::2] = 0
+        path = tmp_path / "puck.tif"
+        tifffile.imwrite(path, img)
+
+        dframe = Puck.sample_coordinates(path, 100, rng=1, max_pixels=280)
+        assert dframe.shape == (100, 2)
+        assert not dframe.duplicated().any()
+        assert np.all(img[(-dframe["y"]).astype(int), dframe["x"].astype(int)] == 0)
+        assert dframe.equals(Puck.sample_coordinates(path, 100, rng=1, max_pixels=13))
+
+    @pytest.mark.parametrize(
+        "layout", [{"rowsperstrip": 7}, {"rowsperstrip": 64}, {"tile": (16, 32)}]
+    )
+    def test_sample_coordinates_compressed(self, tmp_path, layout):
+        """Tests if compressed images are sampled like uncompressed ones."""
+        img = np.ones((50, 40), dtype=np.uint8)
+        img[::3, ::2] = 0
+        path, compressed_path = tmp_path / "puck.tif", tmp_path / "compressed.tif"
+        tifffile.imwrite(path, img)
+        tifffile.imwrite(compressed_path, img, compression="zlib", **layout)
+
+        with pytest.raises(ValueError):
+            tifffile.memmap(compressed_path, mode="r")
+
+        for max_pixels in [1, 200, 10**6]:
+            dframe = Puck.sample_coordinates(
+                compressed_path, 100, rng=1, max_pixels=max_pixels
+            )
+            assert dframe.equals(Puck.sample_coordinates(path, 100, rng=1))
+
+    @pytest.mark.parametrize("method", ["jittered", "poisson"])
+    def test_layout(self, method):
+        """Tests if beads are in the puck disk, drawn from the seed."""
+        dframe = Puck.layout(5000, diameter=200, method=method, rng=1)
+        assert dframe.shape == (5000, 2)
+        assert dframe.dtypes.tolist() == [np.float32, np.float32]
+        assert np.all(np.hypot(dframe["x"] - 100, dframe["y"] + 100) <= 100.001)
+        assert dframe.equals(Puck.layout(5000, diameter=200, method=method, rng=1))
+
+    def test_layout_poisson_distance(self):
+        """Tests if Poisson-disk beads are a minimum distance apart."""
+        dframe = Puck.layout(2000, diameter=100, method="poisson", rng=1)
+        gaps = np.hypot(
+            dframe["x"].values[:, None] - dframe["x"].values,
+            dframe["y"].values[:, None] - dframe["y"].values,
+        )
+        np.fill_diagonal(gaps, np.inf)
+        # jittered beads can be much closer
+        assert gaps.min() > 0.5 * 100 / np.sqrt(2000)
+
+    @pytest.mark.parametrize("method", ["jittered", "poisson"])
+    def test_layout_gradient(self, method):
+        """Tests if there are more beads where density is higher."""
+        dframe = Puck.layout(10000, method=method, gradient=0.8, rng=1)
+        assert (dframe["x"] > 500).mean() > 0.6
+
+    @pytest.mark.parametrize("method", ["jittered", "poisson"])
+    def test_layout_mask(self, method, tmp_path):
+        """Tests if beads are only where mask pixels are zero."""
+        img = np.ones((100, 100), dtype=np.uint8)
+        img[:, :50] = 0
+        path = tmp_path / "mask.tif"
+        tifffile.imwrite(path, img)
+
+        dframe = Puck.layout(1000, diameter=100, method=method, mask_path=path)
+        assert np.all(dframe["x"] < 50)
+
+    def test_layout_errors(self, tmp_path):
+        """Tests if unknown methods and full masks raise `ValueError`."""
+        with pytest.raises(ValueError):
+            Puck.layout(10, method="hexagonal")
+
+        path = tmp_path / "mask.tif"
+        tifffile.imwrite(path, np.ones((10, 10), dtype=np.uint8))
+        with pytest.raises(ValueError):
+            Puck.layout(10, method="poisson", mask_path=path)
@@ -0,0 +1,90 @@
+"""
+Testing module for the slideseq_tools.barcode module.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ..barcode import BarcodeMatcher, read_puck
+from ..utils.sequence import hamming_many_to_many
+
+
+def _random_sequences(rng, n_seqs, length, alphabet="ACGT"):
+    """Returns random sequences as `str`."""
+    letters = rng.choice(list(alphabet), size=(n_seqs, length))
+    return ["".join(row) for row in letters]
+
+
+def _mutate(rng, sequence, n_bases):
+    """Returns sequence with `n_bases` substitutions or `N`."""
+    sequence = list(sequence)
+    for pos in rng.choice(len(sequence), size=n_bases, replace=False):
+        sequence[pos] = rng.choice([b for b in "ACGTN" if b != sequence[pos]])
+    return "".join(sequence)
+
+
+class TestBarcodeMatcher:
+    """The test class associated with the BarcodeMatcher class."""
+
+    def test_radius_too_large(self):
+        """Tests if constructor raises `ValueError` for short barcodes."""
+        with pytest.raises(ValueError):
+            BarcodeMatcher(["ACG"], radius=3)
+
+    def test_match_matches_brute_force(self):
+        """Tests if matches agree with all-vs-all distances."""
+        rng = np.random.default_rng(0)
+        whitelist = _random_sequences(rng, 2000, 14)
+        whitelist[1] = whitelist[0]
+        queries = [
+            _mutate(rng, whitelist[i], int(rng.integers(4)))
+            for i in rng.integers(2000, size=500)
+        ]
+        queries += _random_sequences(rng, 100, 14)
+
+        matcher = BarcodeMatcher(whitelist, radius=2)
+        indexes, distances, ambiguous = matcher.match(queries, chunk_size=128)
+
+        matrix = hamming_many_to_many(queries, whitelist)
+        best = matrix.min(axis=1)
+        matched = best <= 2
+
+        assert np.array_equal(distances[matched], best[matched])
+        assert np.all(distances[~matched] == -1)
+        assert np.all(indexes[~matched] == -1)
+        assert np.all(matrix[matched, indexes[matched]] == best[matched])
+        assert np.array_equal(
+            ambiguous[matched], (matrix[matched] == best[matched, None]).sum(1) > 1
+        )
+        assert matcher.match([whitelist[0]])[2][0]
+
+    def test_match_threads(self):
+        """Tests if chunks matched concurrently give the same results."""
+        rng = np.random.default_rng(1)
+        whitelist = _random_sequences(rng, 500, 12)
+        queries = [
+            _mutate(rng, whitelist[i], int(rng.integers(3)))
+            for i in rng.integers(500, size=300)
+        ]
+
+        matcher = BarcodeMatcher(whitelist, radius=1)
+        expected = matcher.match(queries, chunk_size=64)
+        results = matcher.match(queries, chunk_size=64, threads=3)
+
+        for result, values in zip(results, expected):
+            assert np.array_equal(result, values)
+
+    def test_from_puck(self, tmp_path):
+        """Tests if bead indexes are puck rows."""
+        path = tmp_path / "puck.csv"
+        puck = pd.DataFrame(
+            {"Barcode": ["AAAAAAAA", "CCCCCCCC"], "x": [0.0, 1.0], "y": [2.0, 3.0]}
+        )
+        puck.to_csv(path, header=False, index=False)
+        assert read_puck(path).equals(puck)
+        indexes, distances, _ = BarcodeMatcher.from_puck(path, radius=1).match(
+            ["CCCCCCCA"]
+        )
+        assert indexes.tolist() == [1]
+        assert distances.tolist() == [1]
@@ -0,0 +1,83 @@
+"""
+Testing module for the slideseq_tools.bgzf module.
+"""
+
+import gzip
+import struct
+import zlib
+
+import numpy as np
+import pytest
+
+from ..bgzf import (
+    BLOCK_SIZE,
+    EOF_BLOCK,
+    block_offsets,
+    open_bgzf,
+    read_gzi,
+    uncompressed_size,
+)
+
+
+def _data(n_bytes: int) -> bytes:
+    """Returns partly compressible data."""
+    rng = np.random.default_rng(0)
+    return rng.choice(np.frombuffer(b"ACGT\n", np.uint8), size=n_bytes).tobytes()
+
+
+class TestBgzf:
+    """The test class associated with the bgzf module."""
+
+    @pytest.mark.parametrize("threads", [1, 4])
+    def test_gzip_readable(self, tmp_path, threads):
+        """Tests if any `gzip` reader gets data back."""
+        path = tmp_path / "file.gz"
+        data = _data(5 * BLOCK_SIZE + 123)
+        with open_bgzf(path, "wb", threads=threads) as file_obj:
+            for start in range(0, len(data), 10000):
+                file_obj.write(data[start : start + 10000])
+        assert gzip.decompress(path.read_bytes()) == data
+        assert path.read_bytes().endswith(EOF_BLOCK)
+
+    def test_text_mode(self, tmp_path):
+        """Tests if text written is read back."""
+        path = tmp_path / "file.gz"
+        with open_bgzf(path, "wt", threads=2) as file_obj:
+            file_obj.write("@read\nACGT\n+\nIIII\n")
+        with gzip.open(path, "rt") as file_obj:
+            assert file_obj.read() == "@read\nACGT\n+\nIIII\n"
+
+    def test_offsets(self, tmp_path):
+        """Tests virtual offsets, block offsets and the gzi index."""
+        path = tmp_path / "file.gz"
+        data = _data(3 * BLOCK_SIZE)
+        with open_bgzf(path, "wb", threads=2, index=True) as file_obj:
+            file_obj.write(data[:100000])
+            virtual = file_obj.tell()
+            file_obj.write(data[100000:])
+
+        offsets = block_offsets(path)
+        assert offsets[:, 1].tolist() == [0, BLOCK_SIZE, 2 * BLOCK_SIZE]
+
+        raw = path.read_bytes()
+        decompressor = zlib.decompressobj(-15)
+        block = decompressor.decompress(raw[(virtual >> 16) + 18 :])
+        assert block[virtual & 0xFFFF :] == data[100000 : 2 * BLOCK_SIZE]
+
+        index = (tmp_path / "file.gz.gzi").read_bytes()
+        assert struct.unpack("<Q", index[:8])[0] == 2
+        assert np.frombuffer(index[8:], "<u8").reshape((-1, 2)).tolist() == (
+            offsets[1:].tolist()
+        )
+
+    @pytest.mark.parametrize("index", [False, True])
+    def test_uncompressed_size(self, tmp_path, index):
+        """Tests if the uncompressed size is read with or without index."""
+        path = tmp_path / "file.gz"
+        data = _data(3 * BLOCK_SIZE + 4567)
+        with open_bgzf(path, "wb", index=index) as file_obj:
+            file_obj.write(data)
+
+        if index:
+            assert read_gzi(f"{path}.gzi").tolist() == block_offsets(path).tolist()
+        assert uncompressed_size(path) == len(data)
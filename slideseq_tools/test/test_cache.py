@@ -0,0 +1,87 @@
+"""
+Testing module for the slideseq_tools.cache module.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ..cache import DataFrameCache
+
+
+def _dframe(n_rows: int = 10) -> pd.DataFrame:
+    """Returns a data frame with all supported column types."""
+    return pd.DataFrame(
+        {
+            "seqname": pd.Categorical(["chr1", "chr2"] * (n_rows // 2)),
+            "start": np.arange(n_rows, dtype=np.int32),
+            "gene_id": pd.Series([f"g{i}" for i in range(n_rows)]).mask(
+                np.arange(n_rows) % 3 == 0
+            ),
+        }
+    )
+
+
+class TestDataFrameCache:
+    """The test class associated with the DataFrameCache class."""
+
+    def test_round_trip(self, tmp_path):
+        """Tests if a saved data frame is loaded unchanged."""
+        cache = DataFrameCache(tmp_path / "cache")
+        dframe = _dframe()
+        cache.save("entry", dframe)
+        assert cache.load("entry").equals(dframe)
+
+    def test_missing_entry(self, tmp_path):
+        """Tests if a missing entry returns `None`."""
+        assert DataFrameCache(tmp_path).load("entry") is None
+
+    def test_key_changes_with_file(self, tmp_path):
+        """Tests if the key depends on file content and parameters."""
+        path = tmp_path / "file"
+        path.write_text("a", encoding="utf-8")
+        key = DataFrameCache.key(path, min_length=50)
+        assert key == DataFrameCache.key(path, min_length=50)
+        assert key != DataFrameCache.key(path, min_length=10)
+        path.write_text("ab", encoding="utf-8")
+        assert key != DataFrameCache.key(path, min_length=50)
+
+    def test_eviction(self, tmp_path):
+        """Tests if least recently used entries are evicted first."""
+        cache = DataFrameCache(tmp_path, max_bytes=2**40)
+        for num in range(3):
+            cache.save(f"entry{num}", _dframe(1000))
+            os.utime(tmp_path / f"entry{num}.npz", ns=(num, num))
+        cache.load("entry0")
+        cache.max_bytes = 2 * (tmp_path / "entry0.npz").stat().st_size
+        cache.save("entry3", _dframe(1000))
+        assert sorted(path.name for path in tmp_path.glob("*.npz")) == [
+            "entry0.npz",
+            "entry3.npz",
+        ]
+
+    def test_load_evicted_meanwhile(self, tmp_path, monkeypatch):
+        """Tests if an entry evicted after it's read is still returned."""
+        cache = DataFrameCache(tmp_path)
+        dframe = _dframe()
+        cache.save("entry", dframe)
+
+        def utime(path):
+            raise FileNotFoundError(path)
+
+        monkeypatch.setattr(os, "utime", utime)
+        assert cache.load("entry").equals(dframe)
+
+    def test_failed_save(self, tmp_path, monkeypatch):
+        """Tests if a failed save leaves no temporary file."""
+        cache = DataFrameCache(tmp_path)
+
+        def savez(*_, **__):
+            raise OSError("No space left on device")
+
+        monkeypatch.setattr(np, "savez", savez)
+        with pytest.raises(OSError):
+            cache.save("entry", _dframe())
+        assert not list(tmp_path.iterdir())
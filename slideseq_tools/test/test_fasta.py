@@ -0,0 +1,98 @@
+"""
+Testing module for the slideseq_tools.fasta module.
+"""
+
+import pickle
+
+import numpy as np
+import pytest
+
+from ..fasta import Fasta, build_fai, read_fai
+
+RECORDS = ">chr1 description\nACGTacgtNN\nACGTAC\n>empty\n>chr2\nGGGG\nCC\n"
+
+
+@pytest.fixture(name="fasta_path")
+def fixture_fasta_path(tmp_path):
+    """Small `FASTA` file."""
+    path = tmp_path / "genome.fa"
+    path.write_text(RECORDS, encoding="utf-8")
+    return path
+
+
+class TestFasta:
+    """The test class associated with the Fasta class."""
+
+    def test_constructor_not_existing_path(self, tmp_path):
+        """
+        Tests if constructor returns `FileNotFoundError` when `FASTA` path
+        doesn't exist.
+        """
+        with pytest.raises(FileNotFoundError):
+            Fasta(tmp_path / "file")
+
+    def test_build_fai(self, fasta_path):
+        """Tests if the index matches `samtools faidx`."""
+        fai = build_fai(fasta_path)
+        assert fai.values.tolist() == [
+            ["chr1", 16, 18, 10, 11],
+            ["empty", 0, 43, 0, 0],
+            ["chr2", 6, 49, 4, 5],
+        ]
+
+    def test_build_fai_irregular(self, tmp_path):
+        """Tests if lines of different lengths are rejected."""
+        path = tmp_path / "genome.fa"
+        path.write_text(">chr\nACG\nACGT\nA\n", encoding="utf-8")
+        with pytest.raises(ValueError):
+            build_fai(path)
+
+    def test_index_written(self, fasta_path):
+        """Tests if the index is written and read back."""
+        fasta = Fasta(fasta_path)
+        fai = read_fai(f"{fasta_path}.fai")
+        assert fai.equals(fasta.index)
+        assert Fasta(fasta_path).lengths().to_dict() == {
+            "chr1": 16,
+            "empty": 0,
+            "chr2": 6,
+        }
+
+    def test_fetch(self, fasta_path):
+        """Tests if slices are upper case and clipped to sequence ends."""
+        fasta = Fasta(fasta_path)
+        matrix, lengths = fasta.fetch(
+            ["chr1", "chr2", "empty", "chr1"], [2, 3, 0, 9], [14, 100, 5, 11]
+        )
+        assert lengths.tolist() == [12, 3, 0, 2]
+        assert matrix[0].tobytes() == b"GTACGTNNACGT"
+        assert matrix[1, :3].tobytes() == b"GCC"
+        assert not np.any(matrix[1:3, 3:])
+        assert fasta.fetch_str("chr1", 9, 11) == "NA"
+        with pytest.raises(KeyError):
+            fasta.fetch(["chr3"], [0], [1])
+
+    def test_build_fai_blank_lines(self, tmp_path):
+        """Tests if blank lines ending sequences are ignored."""
+        path = tmp_path / "genome.fa"
+        path.write_text(
+            ">chr1\nACGT\nAC\n\n>empty\n\r\n>chr2\nGGGG\nCCCC\n\n\n", encoding="utf-8"
+        )
+        assert build_fai(path).values.tolist() == [
+            ["chr1", 6, 6, 4, 5],
+            ["empty", 0, 22, 0, 0],
+            ["chr2", 8, 30, 4, 5],
+        ]
+        assert Fasta(path).fetch_str("chr2", 2, 8) == "GGCCCC"
+
+        # full last line without line break
+        path.write_text(">chr\nACG\nACG", encoding="utf-8")
+        assert build_fai(path).values.tolist() == [["chr", 6, 5, 3, 4]]
+
+    def test_empty_file(self, tmp_path):
+        """Tests if an empty file has no sequences."""
+        path = tmp_path / "genome.fa"
+        path.touch()
+        fasta = Fasta(path)
+        assert len(fasta) == 0
+        assert len(pickle.loads(pickle.dumps(fasta))) == 0
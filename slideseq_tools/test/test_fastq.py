@@ -0,0 +1,80 @@
+"""
+Testing module for the slideseq_tools.fastq module.
+"""
+
+import gzip
+
+import numpy as np
+import pytest
+
+from ..fastq import FastqReader, join_rows, read_fastq_pairs
+
+
+def _write_fastq(path, names, sequences):
+    """Writes a `gzip` compressed `FASTQ` file."""
+    with gzip.open(path, "wt") as file_obj:
+        for name, seq in zip(names, sequences):
+            file_obj.write(f"@{name}\n{seq}\n+\n{'I' * len(seq)}\n")
+
+
+class TestFastq:
+    """The test class associated with the fastq module."""
+
+    def test_reader_chunks(self, tmp_path):
+        """Tests if records are read back by chunks."""
+        path = tmp_path / "file.fastq.gz"
+        sequences = ["ACGT" * (i % 5) for i in range(25)]
+        names = [f"read{i} Synthetic read" for i in range(25)]
+        _write_fastq(path, names, sequences)
+
+        chunks = list(FastqReader(path, chunk_size=10, block_size=64))
+        assert [len(chunk) for chunk in chunks] == [10, 10, 5]
+
+        chunk = chunks[1]
+        assert chunk.name(0) == "read10 Synthetic read"
+        assert chunk.lengths.tolist() == [len(seq) for seq in sequences[10:20]]
+        assert bytes(chunk.sequences[1, : chunk.lengths[1]]) == b"ACGT"
+        assert np.all(chunk.qualities[chunk.sequences > 0] == ord("I"))
+
+    def test_reader_truncated(self, tmp_path):
+        """Tests if a truncated file raises `ValueError`."""
+        path = tmp_path / "file.fastq"
+        path.write_text("@read0\nACGT\n+\nIIII\n@read1\nACGT\n", encoding="utf-8")
+        with pytest.raises(ValueError):
+            list(FastqReader(path))
+
+    def test_reader_trailing_blank_lines(self, tmp_path):
+        """Tests if blank lines ending the file are ignored."""
+        path = tmp_path / "file.fastq"
+        path.write_text("@read0\nACGT\n+\nIIII\n\n", encoding="utf-8")
+        assert [len(chunk) for chunk in FastqReader(path)] == [1]
+
+        # empty last read followed by blank lines
+        path.write_text("@read0\nA\n+\nI\n@read1\n\n+\n\r\n\r\n\n", encoding="utf-8")
+        chunks = list(FastqReader(path, chunk_size=1, block_size=4))
+        assert [chunk.lengths.tolist() for chunk in chunks] == [[1], [0]]
+
+    def test_pairs_in_sync(self, tmp_path):
+        """Tests if mate suffixes and descriptions are ignored."""
+        fastq1, fastq2 = tmp_path / "R1.fastq.gz", tmp_path / "R2.fastq.gz"
+        _write_fastq(fastq1, [f"r{i}/1 a" for i in range(7)], ["ACGT"] * 7)
+        _write_fastq(fastq2, [f"r{i}/2" for i in range(7)], ["AC"] * 7)
+        pairs = list(read_fastq_pairs(fastq1, fastq2, chunk_size=3))
+        assert [len(chunk2) for _, chunk2 in pairs] == [3, 3, 1]
+
+    def test_pairs_out_of_sync(self, tmp_path):
+        """Tests if different read identifiers or counts raise `ValueError`."""
+        fastq1, fastq2 = tmp_path / "R1.fastq.gz", tmp_path / "R2.fastq.gz"
+        _write_fastq(fastq1, ["r0", "r1", "r2"], ["ACGT"] * 3)
+        _write_fastq(fastq2, ["r0", "r2", "r1"], ["ACGT"] * 3)
+        with pytest.raises(ValueError):
+            list(read_fastq_pairs(fastq1, fastq2))
+        _write_fastq(fastq2, ["r0", "r1"], ["ACGT"] * 2)
+        with pytest.raises(ValueError):
+            list(read_fastq_pairs(fastq1, fastq2, chunk_size=2))
+
+    def test_join_rows(self):
+        """Tests if fields are concatenated row by row."""
+        matrix = np.frombuffer(b"ACGTT\0\0\0\0", dtype=np.uint8).reshape((3, 3))
+        fields = [b"@", (matrix, [3, 2, 0]), b"\n"]
+        assert join_rows(fields, 3).tobytes() == b"@ACG\n@TT\n@\n"
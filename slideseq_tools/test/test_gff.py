@@ -2,11 +2,30 @@
 Testing module for the slideseq_tools.gff module.
 """
 
+import gzip
+
+import numpy as np
 import pytest
 
 from ..gff import GFF
 
-# pylint: disable=too-few-public-methods
+RECORDS = [
+    "#!genome-build EB2",
+    'chr\tena\tgene\t1\t100\t.\t+\t.\tgene_id "g1"; gene_name "a";',
+    'chr\tena\texon\t1\t100\t.\t+\t.\tgene_id "g1"; transcript_id "t1";',
+    'chr\tena\texon\t201\t220\t.\t-\t.\tgene_id "g2"; transcript_id "t2";',
+    'plasmid\tena\texon\t5\t404\t.\t+\t.\ttranscript_id "t3";',
+]
+
+
+@pytest.fixture(name="gtf_path")
+def fixture_gtf_path(tmp_path):
+    """Small `GTF` file."""
+    path = tmp_path / "genes.gtf"
+    path.write_text("\n".join(RECORDS) + "\n", encoding="utf-8")
+    return path
+
+
 class TestGFF:
     """The test class associated with the GFF class."""
 
@@ -18,3 +37,61 @@ class TestGFF:
         path = tmp_path / "file"
         with pytest.raises(FileNotFoundError):
             GFF(path)
+
+    def test_read_table_columns(self, gtf_path):
+        """Tests if `read_table` returns typed columns and skips comments."""
+        dframe = GFF(gtf_path).read_table()
+        assert list(dframe.columns) == [
+            "seqname",
+            "start",
+            "end",
+            "feature",
+            "strand",
+            "gene_id",
+        ]
+        assert dframe.shape[0] == 4
+        assert dframe["seqname"].dtype == "category"
+        assert dframe["start"].dtype == np.int32
+        assert dframe["end"].dtype == np.int32
+        assert dframe["gene_id"].tolist()[:3] == ["g1", "g1", "g2"]
+        assert dframe["gene_id"].isna().tolist()[3]
+
+    def test_read_table_filters(self, gtf_path):
+        """Tests if `read_table` filters by feature type and length."""
+        dframe = GFF(gtf_path).read_table(
+            features=["exon"], min_length=50, attributes=["transcript_id"]
+        )
+        assert dframe["transcript_id"].tolist() == ["t1", "t3"]
+
+    def test_read_table_gzip(self, gtf_path, tmp_path):
+        """Tests if compressed and plain files give the same table."""
+        gz_path = tmp_path / "genes.gtf.gz"
+        with gzip.open(gz_path, "wb") as file_obj:
+            file_obj.write(gtf_path.read_bytes())
+        expected = GFF(gtf_path).read_table(chunk_size=2)
+        assert GFF(gz_path).read_table(chunk_size=2).equals(expected)
+
+    def test_get_features_min_length(self, gtf_path):
+        """Tests if `get_features` only returns features long enough."""
+        features = GFF(gtf_path).get_features(min_length=50)
+        assert features == [("chr", 1, 100), ("chr", 1, 100), ("plasmid", 5, 404)]
+        assert isinstance(features[0][1], int)
+
+    def test_read_table_cache(self, gtf_path, tmp_path):
+        """Tests if cached tables are reused until the file changes."""
+        cache_dir = tmp_path / "cache"
+        expected = GFF(gtf_path, cache_dir=cache_dir).read_table()
+        assert len(list(cache_dir.glob("*.npz"))) == 1
+        assert GFF(gtf_path, cache_dir=cache_dir).read_table().equals(expected)
+        with open(gtf_path, "a", encoding="utf-8") as file_obj:
+            file_obj.write('chr\tena\texon\t1\t60\t.\t+\t.\tgene_id "g3";\n')
+        dframe = GFF(gtf_path, cache_dir=cache_dir).read_table()
+        assert dframe.shape[0] == expected.shape[0] + 1
+
+    def test_interval_index(self, gtf_path):
+        """Tests if interval index results are `read_table` row positions."""
+        gff = GFF(gtf_path)
+        dframe = gff.read_table(features=["exon"])
+        index = gff.interval_index(features=["exon"])
+        hits = index.query("chr", 210)
+        assert dframe["gene_id"].iloc[hits].tolist() == ["g2"]
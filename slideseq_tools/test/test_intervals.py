@@ -0,0 +1,55 @@
+"""
+Testing module for the slideseq_tools.intervals module.
+"""
+
+import numpy as np
+import pytest
+
+from ..intervals import IntervalIndex
+
+
+def _brute_force(features, seqname, start, end):
+    """Returns overlapping features with a linear scan."""
+    seqnames, starts, ends = features
+    return np.flatnonzero((seqnames == seqname) & (starts <= end) & (ends >= start))
+
+
+class TestIntervalIndex:
+    """The test class associated with the IntervalIndex class."""
+
+    def test_invalid_intervals(self):
+        """Tests if constructor raises `ValueError` on reversed intervals."""
+        with pytest.raises(ValueError):
+            IntervalIndex(["chr"], [10], [5])
+
+    def test_point_query(self):
+        """Tests point queries with inclusive bounds and nested features."""
+        index = IntervalIndex(
+            ["chr", "chr", "chr", "plasmid"], [1, 5, 10, 1], [100, 10, 20, 100]
+        )
+        assert index.query("chr", 10).tolist() == [0, 1, 2]
+        assert index.query("chr", 101).tolist() == []
+        assert index.query("plasmid", 1).tolist() == [3]
+        assert index.query("missing", 1).tolist() == []
+
+    def test_batch_matches_brute_force(self):
+        """Tests if batched range queries match a linear scan."""
+        rng = np.random.default_rng(0)
+        n_features = 2000
+        seqnames = rng.choice(np.array(["chr1", "chr2"]), size=n_features)
+        starts = rng.integers(1, 100000, size=n_features)
+        ends = starts + rng.geometric(0.001, size=n_features) - 1
+
+        index = IntervalIndex(seqnames, starts, ends)
+
+        query_names = rng.choice(np.array(["chr1", "chr2", "chr3"]), size=500)
+        query_starts = rng.integers(1, 100000, size=500)
+        query_ends = query_starts + rng.integers(0, 500, size=500)
+
+        offsets, indexes = index.query_batch(query_names, query_starts, query_ends)
+
+        for i in range(500):
+            expected = _brute_force(
+                (seqnames, starts, ends), query_names[i], query_starts[i], query_ends[i]
+            )
+            assert indexes[offsets[i] : offsets[i + 1]].tolist() == expected.tolist()
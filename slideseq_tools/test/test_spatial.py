@@ -0,0 +1,84 @@
+"""
+Testing module for the slideseq_tools.spatial module.
+"""
+
+import numpy as np
+import pytest
+
+from ..spatial import SpatialIndex
+
+
+@pytest.fixture(name="beads")
+def fixture_beads():
+    """Random beads, two of them at the same position."""
+    rng = np.random.default_rng(0)
+    x = rng.random(500) * 100
+    y = rng.random(500) * 50
+    x[5], y[5] = x[6], y[6]
+    return x, y
+
+
+class TestSpatialIndex:
+    """The test class associated with the SpatialIndex class."""
+
+    def test_from_puck(self, tmp_path):
+        """Tests if an index is built from a puck file."""
+        path = tmp_path / "puck.csv"
+        path.write_text("AAAA,0,0\nCCCC,3,4\nGGGG,10,0\n", encoding="utf-8")
+        index = SpatialIndex.from_puck(path)
+        offsets, indexes, distances = index.radius_batch([0], [0], 5)
+        assert offsets.tolist() == [0, 2]
+        assert indexes.tolist() == [0, 1]
+        assert distances.tolist() == [0, 5]
+
+    def test_cell_size(self):
+        """Tests if coincident beads get cells and bad sizes are rejected."""
+        for x in [[3.0], [3.0] * 1000]:
+            index = SpatialIndex(x, np.zeros(len(x)))
+            assert index.cell_size > 0
+            assert index.knn_batch([3], [0], 2)[1].tolist() == [[0, 0][: len(x)]]
+        for cell_size in [0, -1, float("nan")]:
+            with pytest.raises(ValueError):
+                SpatialIndex([0, 1], [0, 1], cell_size=cell_size)
+
+    def test_radius_batch(self, beads):
+        """Tests if radius queries match a brute force search."""
+        x, y = beads
+        index = SpatialIndex(x, y, cell_size=2.5)
+        rng = np.random.default_rng(1)
+        query_x, query_y = rng.random(100) * 120 - 10, rng.random(100) * 70 - 10
+        offsets, indexes, _ = index.radius_batch(query_x, query_y, 6.1)
+        brute = np.hypot(query_x[:, None] - x, query_y[:, None] - y) <= 6.1
+        for num in range(100):
+            expected = np.flatnonzero(brute[num]).tolist()
+            assert indexes[offsets[num] : offsets[num + 1]].tolist() == expected
+
+    def test_knn_batch(self, beads):
+        """Tests if nearest neighbours match a brute force search."""
+        x, y = beads
+        index = SpatialIndex(x, y)
+        rng = np.random.default_rng(2)
+        query_x, query_y = rng.random(100) * 300, rng.random(100) * 50
+        _, distances = index.knn_batch(query_x, query_y, 7)
+        brute = np.hypot(query_x[:, None] - x, query_y[:, None] - y)
+        assert np.allclose(distances, np.sort(brute, axis=1)[:, :7])
+        assert index.knn_batch([0], [0], 1000)[0].shape == (1, 500)
+
+    def test_neighbour_graph(self, beads):
+        """Tests if beads aren't their own neighbours."""
+        x, y = beads
+        index = SpatialIndex(x, y)
+        brute = np.hypot(x[:, None] - x, y[:, None] - y)
+        np.fill_diagonal(brute, np.inf)
+
+        offsets, indexes, distances = index.neighbour_graph(k=4)
+        assert np.all(np.diff(offsets) == 4)
+        assert not np.any(indexes == np.repeat(np.arange(500), 4))
+        assert np.allclose(distances.reshape((500, 4)), np.sort(brute)[:, :4])
+
+        offsets, indexes, _ = index.neighbour_graph(radius=3)
+        assert offsets[-1] == np.count_nonzero(brute <= 3)
+        assert 6 in indexes[offsets[5] : offsets[6]]
+
+        with pytest.raises(ValueError):
+            index.neighbour_graph()
@@ -0,0 +1,40 @@
+"""
+Random number generators of synthetic data.
+"""
+
+import numpy as np
+
+
+def as_generator(rng=None) -> np.random.Generator:
+    """\
+    Returns a NumPy random generator.
+
+    Parameters
+    ----------
+    rng
+        A `Generator`, returned as is, or a seed. A new generator seeded from
+        fresh entropy is returned if `None`.
+    """
+    if isinstance(rng, np.random.Generator):
+        return rng
+    return np.random.default_rng(rng)
+
+
+def substream(seed: int, *keys: int) -> np.random.Generator:
+    """\
+    Returns the generator of a sub-stream identified by integer keys.
+
+    Sub-streams only depend on the seed and their keys, not on the order
+    they are created in, so chunks of data drawn from them are the same
+    whichever process draws them. Sub-streams of different keys are
+    independent.
+
+    Parameters
+    ----------
+    seed
+        Root seed. Sub-streams are seeded from fresh entropy if `None`.
+    keys
+        Non-negative integers identifying the sub-stream, for instance
+        sample, file and chunk numbers.
+    """
+    return np.random.default_rng(np.random.SeedSequence(seed, spawn_key=keys))
@@ -1,7 +1,424 @@
 """
 Functions to manage DNA sequences.
+
+Sequences can be packed as 2 bits per base in `uint64` words, 32 bases per
+word, the first base in the most significant bits so that packed words sort
+like sequences. `N` bases are packed as `A` and flagged in a separate mask
+having the lowest bit of the base set.
 """
 
+import operator
+from typing import List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from slideseq_tools.utils.constants import BASES, UP_PRIMER
+
+BASES_PER_WORD = 32
+
+# lowest bit of every base in a word
+LOW_BITS = np.uint64(0x5555555555555555)
+
+# ASCII code to 2-bit code, 255 for invalid characters
+CODES = np.full(256, 255, dtype=np.uint8)
+for _code, _base in BASES.items():
+    CODES[ord(_base)] = _code
+    CODES[ord(_base.lower())] = _code
+CODES[ord("N")] = 0
+CODES[ord("n")] = 0
+
+# 2-bit code to ASCII code
+LETTERS = np.array([ord(BASES[code]) for code in sorted(BASES)], dtype=np.uint8)
+
+
+def to_byte_matrix(sequences) -> np.ndarray:
+    """\
+    Returns sequences of same length as a `uint8` matrix of ASCII codes.
+
+    Function raises a `ValueError` if sequences don't have same length.
+
+    Parameters
+    ----------
+    sequences
+        Sequences as `str` or `bytes`, or already a `uint8` matrix.
+    """
+    if isinstance(sequences, np.ndarray) and sequences.dtype == np.uint8:
+        return np.atleast_2d(sequences)
+
+    sequences = [
+        seq.encode("ascii") if isinstance(seq, str) else bytes(seq) for seq in sequences
+    ]
+
+    lengths = {len(seq) for seq in sequences}
+
+    if len(lengths) > 1:
+        raise ValueError("Sequences don't have same length.")
+
+    length = lengths.pop() if lengths else 0
+    matrix = np.frombuffer(b"".join(sequences), dtype=np.uint8)
+
+    return matrix.reshape((len(sequences), length))
+
+
+def to_padded_matrix(sequences, width: int = None) -> Tuple[np.ndarray]:
+    """\
+    Returns sequences of any length as a `uint8` matrix of ASCII codes padded
+    with zeros, and their lengths.
+
+    Parameters
+    ----------
+    sequences
+        Sequences as `str` or `bytes`.
+    width
+        Matrix width, sequences are truncated if longer. Defaults to the
+        longest sequence length.
+    """
+    sequences = [
+        seq.encode("ascii") if isinstance(seq, str) else bytes(seq) for seq in sequences
+    ]
+
+    full_lengths = np.array([len(seq) for seq in sequences], dtype=np.int64)
+    starts = np.cumsum(full_lengths) - full_lengths
+
+    if width is None:
+        width = int(full_lengths.max()) if full_lengths.shape[0] else 0
+
+    lengths = np.minimum(full_lengths, width)
+    matrix = np.zeros((len(sequences), width), dtype=np.uint8)
+
+    flat = np.frombuffer(b"".join(sequences), dtype=np.uint8)
+
+    # copy every sequence at once with a mask of valid positions
+    valid = np.arange(width) < lengths[:, None]
+    rows, cols = np.nonzero(valid)
+    matrix[rows, cols] = flat[starts[rows] + cols]
+
+    return matrix, lengths
+
+
+# pylint: disable=too-many-locals
+def locate_primer(
+    reads: np.ndarray,
+    lengths: np.ndarray = None,
+    primer: str = UP_PRIMER,
+    offset: int = 8,
+    max_shift: int = 2,
+) -> Tuple[np.ndarray]:
+    """\
+    Returns the best primer offset in every read and its number of
+    mismatches, as a tuple of arrays (`offsets`, `mismatches`).
+
+    Every offset within `max_shift` bases of the expected one is scored for
+    the whole batch at once. Primer bases past the read end are mismatches.
+    Ties are resolved in favour of the offset closest to the expected one.
+
+    Parameters
+    ----------
+    reads
+        Reads as a `uint8` matrix of ASCII codes, one row per read, padded
+        with zeros.
+    lengths
+        Read lengths. Defaults to the number of non-zero codes per read.
+    primer
+        Primer sequence.
+    offset
+        Expected primer offset.
+    max_shift
+        Maximum shift from the expected offset.
+    """
+    reads = np.atleast_2d(reads)
+    primer = np.frombuffer(primer.encode("ascii"), dtype=np.uint8)
+
+    if lengths is None:
+        lengths = np.count_nonzero(reads, axis=1)
+    lengths = np.asarray(lengths)
+
+    # reads are padded so every candidate window fits
+    width = offset + max_shift + primer.shape[0]
+    if reads.shape[1] < width:
+        padding = np.zeros((reads.shape[0], width - reads.shape[1]), np.uint8)
+        reads = np.hstack([reads, padding])
+
+    best_offsets = np.full(reads.shape[0], offset, dtype=np.int64)
+    best_mismatches = np.full(reads.shape[0], primer.shape[0] + 1, dtype=np.int64)
+
+    shifts = sorted(range(-max_shift, max_shift + 1), key=abs)
+
+    positions = np.arange(primer.shape[0])
+
+    for start in [offset + shift for shift in shifts if offset + shift >= 0]:
+
+        window = reads[:, start : start + primer.shape[0]]
+        inside = start + positions < lengths[:, None]
+        mismatches = np.count_nonzero((window != primer) | ~inside, axis=1)
+
+        better = mismatches < best_mismatches
+        best_offsets[better] = start
+        best_mismatches[better] = mismatches[better]
+
+    return best_offsets, best_mismatches
+
+
+def n_words(length: int) -> int:
+    """\
+    Returns number of `uint64` words needed to pack a sequence.
+
+    Parameters
+    ----------
+    length
+        Sequence length.
+    """
+    return -(-length // BASES_PER_WORD)
+
+
+def _shift(position: int) -> np.uint64:
+    """Returns the shift of a base position within its word."""
+    return np.uint64(2 * (BASES_PER_WORD - 1 - position % BASES_PER_WORD))
+
+
+def encode(sequences) -> Tuple[np.ndarray]:
+    """\
+    Returns sequences of same length packed as 2-bit codes.
+
+    Function returns a tuple (`codes`, `n_mask`) of `uint64` matrices with
+    one row per sequence. It raises a `ValueError` if sequences don't have
+    same length or contain other characters than `ACGTN`.
+
+    Parameters
+    ----------
+    sequences
+        Sequences as `str` or `bytes`, or a `uint8` matrix of ASCII codes.
+    """
+    matrix = to_byte_matrix(sequences)
+    n_seqs, length = matrix.shape
+
+    base_codes = CODES[matrix]
+
+    if np.any(base_codes == 255):
+        raise ValueError("Sequences contain other characters than ACGTN.")
+
+    is_n = (matrix == ord("N")) | (matrix == ord("n"))
+
+    codes = np.zeros((n_seqs, n_words(length)), dtype=np.uint64)
+    n_mask = np.zeros((n_seqs, n_words(length)), dtype=np.uint64)
+
+    for pos in range(length):
+        word = pos // BASES_PER_WORD
+        shift = _shift(pos)
+        codes[:, word] |= base_codes[:, pos].astype(np.uint64) << shift
+        n_mask[:, word] |= is_n[:, pos].astype(np.uint64) << shift
+
+    return codes, n_mask
+
+
+def unpack(codes: np.ndarray, n_mask: np.ndarray, length: int) -> np.ndarray:
+    """\
+    Returns packed sequences as a `uint8` matrix of ASCII codes.
+
+    Parameters
+    ----------
+    codes
+        Packed 2-bit codes.
+    n_mask
+        Packed `N` mask.
+    length
+        Sequence length.
+    """
+    codes = np.atleast_2d(codes)
+    n_mask = np.atleast_2d(n_mask)
+
+    matrix = np.empty((codes.shape[0], length), dtype=np.uint8)
+
+    for pos in range(length):
+        word = pos // BASES_PER_WORD
+        shift = _shift(pos)
+        matrix[:, pos] = LETTERS[(codes[:, word] >> shift) & np.uint64(3)]
+        matrix[(n_mask[:, word] >> shift) & np.uint64(1) == 1, pos] = ord("N")
+
+    return matrix
+
+
+def decode(codes: np.ndarray, n_mask: np.ndarray, length: int) -> List[str]:
+    """\
+    Returns packed sequences as a list of `str`.
+
+    Parameters
+    ----------
+    codes
+        Packed 2-bit codes.
+    n_mask
+        Packed `N` mask.
+    length
+        Sequence length.
+    """
+    matrix = unpack(codes, n_mask, length)
+
+    if length == 0:
+        return [""] * matrix.shape[0]
+
+    return matrix.view(f"S{length}").ravel().astype(f"U{length}").tolist()
+
+
+def popcount(words: np.ndarray) -> np.ndarray:
+    """\
+    Returns number of bits set in every `uint64` word.
+
+    Parameters
+    ----------
+    words
+        Array of `uint64`.
+    """
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(words)
+
+    words = np.ascontiguousarray(words, dtype=np.uint64)
+    table = np.array([bin(byte).count("1") for byte in range(256)], dtype=np.uint8)
+    bytes_ = words.view(np.uint8).reshape(words.shape + (8,))
+
+    return table[bytes_].sum(axis=-1, dtype=np.uint8)
+
+
+def _packed(sequences) -> Tuple[np.ndarray]:
+    """\
+    Returns sequences packed, unless they're `PackedSequences` or a tuple of
+    `uint64` matrices (`codes`, `n_mask`) returned by `encode`.
+    """
+    if isinstance(sequences, PackedSequences):
+        return sequences.codes, sequences.n_mask
+    if (
+        isinstance(sequences, tuple)
+        and len(sequences) == 2
+        and all(
+            isinstance(array, np.ndarray) and array.dtype == np.uint64
+            for array in sequences
+        )
+    ):
+        return sequences
+    return encode(sequences)
+
+
+def packed_distances(
+    codes1: np.ndarray,
+    n_mask1: np.ndarray,
+    codes2: np.ndarray,
+    n_mask2: np.ndarray,
+    n_matches_n: bool,
+) -> np.ndarray:
+    """\
+    Returns Hamming distances between packed sequences, broadcast against
+    each other.
+
+    Parameters
+    ----------
+    codes1
+        Packed 2-bit codes of first sequences.
+    n_mask1
+        Packed `N` mask of first sequences.
+    codes2
+        Packed 2-bit codes of second sequences.
+    n_mask2
+        Packed `N` mask of second sequences.
+    n_matches_n
+        Whether `N` matches `N`.
+    """
+    diff = codes1 ^ codes2
+    mismatches = (diff | (diff >> np.uint64(1))) & LOW_BITS
+
+    if n_matches_n:
+        mismatches |= n_mask1 ^ n_mask2
+    else:
+        mismatches |= n_mask1 | n_mask2
+
+    return popcount(mismatches).sum(axis=-1, dtype=np.int32)
+
+
+def hamming_pairwise(seqs1, seqs2, n_matches_n: bool = False) -> np.ndarray:
+    """\
+    Returns Hamming distances between sequences of two lists, element by
+    element.
+
+    By default `N` is a mismatch against any base, `N` included.
+
+    Parameters
+    ----------
+    seqs1
+        First sequences, as accepted by `encode` or already encoded.
+    seqs2
+        Second sequences, as accepted by `encode` or already encoded.
+    n_matches_n
+        Whether `N` matches `N`.
+    """
+    codes1, n_mask1 = _packed(seqs1)
+    codes2, n_mask2 = _packed(seqs2)
+
+    if codes1.shape != codes2.shape:
+        raise ValueError("Sequences don't have same length or number.")
+
+    return packed_distances(codes1, n_mask1, codes2, n_mask2, n_matches_n)
+
+
+def hamming_one_to_many(query, targets, n_matches_n: bool = False) -> np.ndarray:
+    """\
+    Returns Hamming distances between a sequence and many sequences.
+
+    Parameters
+    ----------
+    query
+        Query sequence as `str` or `bytes`.
+    targets
+        Target sequences, as accepted by `encode` or already encoded.
+    n_matches_n
+        Whether `N` matches `N`.
+    """
+    codes1, n_mask1 = encode([query])
+    codes2, n_mask2 = _packed(targets)
+
+    if codes1.shape[1] != codes2.shape[1]:
+        raise ValueError("Sequences don't have same length.")
+
+    return packed_distances(codes1, n_mask1, codes2, n_mask2, n_matches_n)
+
+
+def hamming_many_to_many(
+    queries, targets, n_matches_n: bool = False, chunk_size: int = 2**22
+) -> np.ndarray:
+    """\
+    Returns the matrix of Hamming distances between all queries (rows) and
+    all targets (columns).
+
+    Parameters
+    ----------
+    queries
+        Query sequences, as accepted by `encode` or already encoded.
+    targets
+        Target sequences, as accepted by `encode` or already encoded.
+    n_matches_n
+        Whether `N` matches `N`.
+    chunk_size
+        Maximum number of distances computed at once, bounds memory.
+    """
+    codes1, n_mask1 = _packed(queries)
+    codes2, n_mask2 = _packed(targets)
+
+    if codes1.shape[1] != codes2.shape[1]:
+        raise ValueError("Sequences don't have same length.")
+
+    distances = np.empty((codes1.shape[0], codes2.shape[0]), dtype=np.int32)
+    step = max(1, chunk_size // max(1, codes2.shape[0]))
+
+    for start in range(0, codes1.shape[0], step):
+        end = start + step
+        distances[start:end] = packed_distances(
+            codes1[start:end, None, :],
+            n_mask1[start:end, None, :],
+            codes2[None, :, :],
+            n_mask2[None, :, :],
+            n_matches_n,
+        )
+
+    return distances
+
 
 def hamming(seq1: str, seq2: str) -> int:
     """\
@@ -12,6 +429,9 @@ def hamming(seq1: str, seq2: str) -> int:
         * `TypeError` if sequences are not `str`.
         * `ValueError` if sequences don't have same length.
 
+    Characters are compared as they are, use `hamming_pairwise` for case
+    and `N` aware distances of many sequences.
+
     Parameters
     ----------
     seq1
@@ -28,10 +448,189 @@ def hamming(seq1: str, seq2: str) -> int:
     if len(seq1) != len(seq2):
         raise ValueError(f"{seq1} and {seq2} don't have same length")
 
-    distance = 0
+    return sum(map(operator.ne, seq1, seq2))
+
+
+class PackedSequences:
+    """\
+    Fixed-length DNA sequences packed as 2-bit codes.
+
+    Sequences are stored as two `uint64` matrices with one row per sequence,
+    the codes and the `N` mask (see `encode`).
+    """
+
+    codes: np.ndarray
+    n_mask: np.ndarray
+    length: int
+
+    def __init__(self, codes: np.ndarray, n_mask: np.ndarray, length: int) -> None:
+        """\
+        Constructor of PackedSequences class.
+
+        Raises a `ValueError` if length isn't positive or if codes and mask
+        shapes don't match length.
+
+        Parameters
+        ----------
+        codes
+            Packed 2-bit codes.
+        n_mask
+            Packed `N` mask.
+        length
+            Sequence length.
+        """
+        if length < 1:
+            raise ValueError(f"Sequences have {length} bases, at least 1 expected.")
+
+        codes = np.asarray(codes, dtype=np.uint64).reshape((-1, n_words(length)))
+        n_mask = np.asarray(n_mask, dtype=np.uint64).reshape((-1, n_words(length)))
+
+        if codes.shape != n_mask.shape:
+            raise ValueError("Codes and N mask don't have same shape.")
+
+        self.codes = codes
+        self.n_mask = n_mask
+        self.length = length
+
+    @classmethod
+    def encode(cls, sequences) -> "PackedSequences":
+        """\
+        Returns packed sequences of same length.
+
+        Parameters
+        ----------
+        sequences
+            Sequences as `str` or `bytes`, or a `uint8` matrix of ASCII codes.
+        """
+        matrix = to_byte_matrix(sequences)
+        return cls(*encode(matrix), length=matrix.shape[1])
+
+    @classmethod
+    def from_bytes(cls, data: bytes, length: int) -> "PackedSequences":
+        """\
+        Returns packed sequences from concatenated fixed-length sequences.
+
+        Parameters
+        ----------
+        data
+            Concatenated sequences as `bytes`.
+        length
+            Sequence length.
+        """
+        matrix = np.frombuffer(data, dtype=np.uint8)
+
+        if length == 0 or matrix.shape[0] % length != 0:
+            raise ValueError(f"Data isn't made of {length}-base sequences.")
+
+        return cls.encode(matrix.reshape((-1, length)))
+
+    @classmethod
+    def from_dataframe(
+        cls, dframe: pd.DataFrame, column: str = "Barcode"
+    ) -> "PackedSequences":
+        """\
+        Returns packed sequences of a data frame column, such as puck
+        barcodes.
+
+        Parameters
+        ----------
+        dframe
+            Data frame.
+        column
+            Column containing sequences as `str`.
+        """
+        return cls.encode(dframe[column].tolist())
+
+    def to_bytes(self) -> np.ndarray:
+        """Returns sequences as a `uint8` matrix of ASCII codes."""
+        return unpack(self.codes, self.n_mask, self.length)
+
+    def to_list(self) -> List[str]:
+        """Returns sequences as a list of `str`."""
+        return decode(self.codes, self.n_mask, self.length)
+
+    def to_series(self, name: str = "Barcode", index=None) -> pd.Series:
+        """\
+        Returns sequences as a `str` series, for example to add barcodes to a
+        puck data frame.
+
+        Parameters
+        ----------
+        name
+            Series name.
+        index
+            Series index.
+        """
+        return pd.Series(self.to_list(), name=name, index=index)
+
+    def __len__(self) -> int:
+        """Returns number of sequences."""
+        return self.codes.shape[0]
+
+    def __getitem__(self, key):
+        """Returns a sequence as `str` for an integer, packed sequences for a
+        slice, a mask or an array of indexes."""
+        if isinstance(key, (int, np.integer)):
+            return decode(self.codes[key], self.n_mask[key], self.length)[0]
+        return PackedSequences(self.codes[key], self.n_mask[key], self.length)
+
+    def _rows(self) -> np.ndarray:
+        """Returns codes and mask side by side, one row per sequence."""
+        return np.hstack([self.codes, self.n_mask])
+
+    def hashes(self) -> np.ndarray:
+        """Returns a `uint64` hash of every sequence."""
+        hashes = np.full(len(self), np.uint64(self.length), dtype=np.uint64)
+
+        # splitmix64 finalizer over every word
+        for column in self._rows().T:
+            hashes ^= column
+            hashes += np.uint64(0x9E3779B97F4A7C15)
+            hashes ^= hashes >> np.uint64(30)
+            hashes *= np.uint64(0xBF58476D1CE4E5B9)
+            hashes ^= hashes >> np.uint64(27)
+            hashes *= np.uint64(0x94D049BB133111EB)
+            hashes ^= hashes >> np.uint64(31)
+
+        return hashes
+
+    def argsort(self) -> np.ndarray:
+        """Returns indexes sorting sequences in lexicographic order. `N` sorts
+        as `A`, sequences only differing by `N` are then sorted by mask."""
+        rows = self._rows()
+        keys = [rows[:, num] for num in range(rows.shape[1] - 1, -1, -1)]
+        return np.lexsort(keys) if keys else np.arange(len(self))
+
+    def sort(self) -> "PackedSequences":
+        """Returns sequences sorted, see `argsort`."""
+        return self[self.argsort()]
+
+    def unique(self, return_inverse: bool = False, return_counts: bool = False):
+        """\
+        Returns sorted unique sequences, as `np.unique` does.
+
+        Parameters
+        ----------
+        return_inverse
+            Whether to return indexes of unique sequences for every sequence.
+        return_counts
+            Whether to return number of occurrences of unique sequences.
+        """
+        results = np.unique(
+            self._rows(),
+            axis=0,
+            return_inverse=return_inverse,
+            return_counts=return_counts,
+        )
+
+        if not return_inverse and not return_counts:
+            results = (results,)
+
+        rows = results[0]
+        width = self.codes.shape[1]
+        packed = PackedSequences(rows[:, :width], rows[:, width:], self.length)
 
-    for base1, base2 in zip(seq1, seq2):
-        if base1 != base2:
-            distance += 1
+        if len(results) == 1:
+            return packed
 
-    return distance
+        return (packed, *[result.ravel() for result in results[1:]])
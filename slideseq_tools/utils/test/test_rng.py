@@ -0,0 +1,24 @@
+"""
+Testing module for the slideseq_tools.utils.rng module.
+"""
+
+import numpy as np
+
+from ..rng import as_generator, substream
+
+
+class TestRng:
+    """The test class associated with the rng module."""
+
+    def test_as_generator(self):
+        """Tests if generators are returned as is and seeds are used."""
+        rng = np.random.default_rng(1)
+        assert as_generator(rng) is rng
+        assert as_generator(3).integers(1000) == as_generator(3).integers(1000)
+
+    def test_substream(self):
+        """Tests if sub-streams only depend on the seed and keys."""
+        first = substream(5, 1, 2).integers(2**32, size=4)
+        assert np.array_equal(first, substream(5, 1, 2).integers(2**32, size=4))
+        assert not np.array_equal(first, substream(5, 1, 3).integers(2**32, size=4))
+        assert not np.array_equal(first, substream(6, 1, 2).integers(2**32, size=4))
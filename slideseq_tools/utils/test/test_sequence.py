@@ -0,0 +1,144 @@
+"""
+Testing module for the slideseq_tools.utils.sequence module.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ..sequence import (
+    PackedSequences,
+    decode,
+    encode,
+    hamming,
+    hamming_many_to_many,
+    hamming_one_to_many,
+    hamming_pairwise,
+)
+
+
+def _random_sequences(rng, n_seqs, length, alphabet="ACGTN"):
+    """Returns random sequences as `str`."""
+    letters = rng.choice(list(alphabet), size=(n_seqs, length))
+    return ["".join(row) for row in letters]
+
+
+def _naive(seq1, seq2, n_matches_n=False):
+    """Returns Hamming distance computed base by base."""
+    return sum(
+        base1 != base2 or (not n_matches_n and base1 == "N")
+        for base1, base2 in zip(seq1, seq2)
+    )
+
+
+def _sort_key(seq):
+    """Returns the sort key of a packed sequence."""
+    return seq.replace("N", "A"), tuple(base == "N" for base in seq)
+
+
+class TestSequence:
+    """The test class associated with the sequence functions."""
+
+    def test_hamming_errors(self):
+        """Tests if `hamming` raises on improper input."""
+        with pytest.raises(TypeError):
+            hamming("ACGT", 1)
+        with pytest.raises(ValueError):
+            hamming("ACGT", "ACG")
+
+    def test_hamming(self):
+        """Tests if `hamming` returns base by base distance."""
+        assert hamming("", "") == 0
+        assert hamming("ACGTN", "ACGTN") == 0
+        assert hamming("ACGTN", "TCGAA") == 3
+
+    def test_hamming_characters(self):
+        """Tests if `hamming` compares any characters, case included."""
+        assert hamming("ACGU", "ACGT") == 1
+        assert hamming("acgt", "ACGT") == 4
+        assert hamming("NN", "NN") == 0
+
+    def test_tuple_of_strings(self):
+        """Tests if a tuple of sequences isn't taken as encoded sequences."""
+        seqs = ("ACGT", "ACGA")
+        assert hamming_pairwise(seqs, ("ACGT", "TCGA")).tolist() == [0, 1]
+        assert hamming_one_to_many("ACGT", seqs).tolist() == [0, 1]
+        assert hamming_many_to_many(seqs, encode(seqs)).tolist() == [[0, 1], [1, 0]]
+
+    def test_encode_decode(self):
+        """Tests if sequences longer than a word are decoded unchanged."""
+        seqs = _random_sequences(np.random.default_rng(0), 20, 70)
+        codes, n_mask = encode(seqs)
+        assert codes.shape == (20, 3)
+        assert decode(codes, n_mask, 70) == seqs
+
+    def test_packed_order(self):
+        """Tests if packed words sort like sequences."""
+        seqs = _random_sequences(np.random.default_rng(0), 100, 14, "ACGT")
+        codes, _ = encode(seqs)
+        assert [seqs[i] for i in np.argsort(codes[:, 0])] == sorted(seqs)
+
+    def test_distances_match_naive(self):
+        """Tests batched distances against a base by base comparison."""
+        rng = np.random.default_rng(0)
+        queries = _random_sequences(rng, 30, 40)
+        targets = _random_sequences(rng, 50, 40)
+
+        matrix = hamming_many_to_many(queries, targets, chunk_size=64)
+        for i, query in enumerate(queries):
+            assert matrix[i].tolist() == [_naive(query, t) for t in targets]
+
+        assert hamming_one_to_many(queries[0], encode(targets)).tolist() == [
+            _naive(queries[0], t) for t in targets
+        ]
+        assert hamming_pairwise(queries, targets[:30], n_matches_n=True).tolist() == [
+            _naive(q, t, n_matches_n=True) for q, t in zip(queries, targets)
+        ]
+
+
+class TestPackedSequences:
+    """The test class associated with the PackedSequences class."""
+
+    def test_round_trip(self):
+        """Tests if sequences are converted back unchanged."""
+        seqs = _random_sequences(np.random.default_rng(0), 50, 40)
+        packed = PackedSequences.encode(seqs)
+        assert len(packed) == 50
+        assert packed.to_list() == seqs
+        assert packed[3] == seqs[3]
+        assert packed[10:20].to_list() == seqs[10:20]
+        from_bytes = PackedSequences.from_bytes("".join(seqs).encode(), 40)
+        assert np.array_equal(from_bytes.to_bytes(), packed.to_bytes())
+
+    def test_empty_sequences(self):
+        """Tests if sequences without bases raise `ValueError`."""
+        with pytest.raises(ValueError):
+            PackedSequences(np.empty((2, 0)), np.empty((2, 0)), 0)
+        with pytest.raises(ValueError):
+            PackedSequences.encode(["", ""])
+
+    def test_dataframe(self):
+        """Tests conversion to and from a puck data frame."""
+        puck = pd.DataFrame({"Barcode": ["ACGT", "TTNA"], "x": [0.0, 1.0]})
+        packed = PackedSequences.from_dataframe(puck)
+        assert packed.to_series().equals(puck["Barcode"])
+
+    def test_sort_unique_hash(self):
+        """Tests if sorting, grouping and hashing agree with `str`."""
+        rng = np.random.default_rng(0)
+        seqs = _random_sequences(rng, 500, 3)
+        packed = PackedSequences.encode(seqs)
+
+        assert packed.sort().to_list() == sorted(seqs, key=_sort_key)
+
+        uniques, inverse, counts = packed.unique(
+            return_inverse=True, return_counts=True
+        )
+        assert uniques.to_list() == packed.sort().unique().to_list()
+        assert sorted(uniques.to_list(), key=_sort_key) == uniques.to_list()
+        assert [uniques[i] for i in inverse] == seqs
+        assert counts.tolist() == [seqs.count(seq) for seq in uniques.to_list()]
+
+        hashes = packed.hashes()
+        assert len(set(hashes.tolist())) == len(uniques)
+        assert np.array_equal(hashes, PackedSequences.encode(seqs).hashes())